@@ -5,54 +5,58 @@ from datetime import datetime
 import os
 import logging
 
-from utils.rate_limiter import rate_limiter, extract_domain
+from utils.dedup import NearDuplicateIndex, canonicalize_url
+from utils.domain_reputation import domain_reputation
+from utils.embeddings import get_embedding_service
+from utils.hedged_fetch import fetch_first_n
+from utils.http_cache import CacheRunStats
+from utils.page_fetcher import fetch_page
+from utils.passage_retrieval import format_passages, passages_by_source, retrieve_passages
+from utils.search_cache import search_cache
+from utils.rate_limiter import extract_domain
+from utils.relevance_filter import RelevanceFilter
+from utils.saturation import NoveltyTracker
+from utils.source_ranker import rank_sources
 
 logger = logging.getLogger(__name__)
 
 class RealDeepResearcher:
     """Gerçek web araması yapan deep research sistemi"""
     
-    def __init__(self, model_name, model_source, websocket):
+    def __init__(self, model_name, model_source, websocket, target_sources=12, analysis_mode="summaries"):
         self.model_name = model_name
         self.model_source = model_source
         self.websocket = websocket
         self.search_results = []
-        
-        # Güvenilir kaynak listeleri
-        self.trusted_domains = {
-            'high': [
-                'arxiv.org', 'nature.com', 'science.org', 'pubmed.ncbi.nlm.nih.gov',
-                'ieee.org', 'acm.org', 'academic.oup.com', 'springer.com',
-                'cambridge.org', 'mit.edu', 'stanford.edu', 'harvard.edu',
-                'openai.com', 'deepmind.com', 'anthropic.com', 'microsoft.com',
-                'google.com', 'apple.com', 'nvidia.com', 'meta.com',
-                'techcrunch.com', 'arstechnica.com', 'wired.com', 'zdnet.com',
-                'reuters.com', 'bbc.com', 'cnn.com', 'nytimes.com',
-                'github.com', 'stackoverflow.com', 'medium.com', 'substack.com',
-                'huggingface.co', 'kaggle.com', 'paperswithcode.com',
-                'who.int', 'cdc.gov', 'nasa.gov', 'fda.gov', 'sec.gov'
-            ],
-            'medium': [
-                'wikipedia.org', 'reddit.com', 'quora.com', 'forbes.com',
-                'businessinsider.com', 'theverge.com', 'engadget.com',
-                'venturebeat.com', 'techrepublic.com', 'pcmag.com',
-                'blog.google.com', 'engineering.fb.com', 'blogs.microsoft.com',
-                'aws.amazon.com', 'cloud.google.com', 'azure.microsoft.com'
-            ],
-            'low': [
-                'blog.', 'wordpress.com', 'blogspot.com', 'tumblr.com',
-                'yahoo.com', 'answers.com', 'ehow.com'
-            ]
-        }
-        
-        # Güvensiz/spam domain'ler
-        self.untrusted_domains = [
-            'clickbait.com', 'spam.com', 'fake-news.com', 'ads.com',
-            'affiliate.com', 'referral.com', 'promotion.com'
-        ]
-    
+        # Analiz edilecek kullanılabilir kaynak sayısı (yavaş siteler yerine sıradaki aday indirilir).
+        # Adaylar önce sıralandığı için 20 yerine daha az kaynak yeterli.
+        self.target_sources = target_sources
+        # Kalıcı sayfa önbelleği isabet sayaçları (her araştırmada sıfırlanır)
+        self.page_stats = CacheRunStats()
+        # Alaka kontrolü: önce BM25, sonra embedding; LLM sadece kararsız sonuçlar için
+        self.embeddings = get_embedding_service(model_source)
+        self.relevance_filter = RelevanceFilter(embeddings=self.embeddings)
+        # "summaries": her kaynak için ayrı LLM özeti; "passages": tüm sayfalardan en ilgili
+        # pasajlar seçilir, kaynak başına LLM çağrısı yapılmaz
+        self.analysis_mode = analysis_mode
+        # Pasaj modunda sayfanın daha büyük kısmı tutulur (seçimi retrieval yapar)
+        self.page_chars = 12000 if analysis_mode == "passages" else 3000
+
     async def evaluate_source_reliability(self, url, title, content_sample, topic):
         """Model ile kaynak güvenilirliği değerlendirir"""
+        domain = extract_domain(url)
+        
+        # Bilinen alan adları için LLM'e sorulmaz
+        known = domain_reputation.lookup(domain)
+        if known:
+            return known.score, f"Bilinen alan adı: {known.matched} ({known.tier})"
+        
+        # Bilinmeyen alan adı bugün zaten değerlendirildiyse tekrar sorulmaz
+        # (yalnızca puan saklanır; gerekçe o günkü sayfa ve konuya aitti)
+        cached = await domain_reputation.aget_llm_score(domain)
+        if cached is not None:
+            return cached, f"Alan adı bugün değerlendirildi: {domain} ({cached}/100)"
+        
         try:
             from datetime import datetime
             current_date = datetime.now().strftime("%Y-%m-%d")
@@ -145,6 +149,8 @@ Sebep: [tarih + konu türü + tarafsızlık + kalite değerlendirmesi]
                     reason = line.split(':', 1)[1].strip()
             
             full_reason = f"Tarih: {source_date} | Tür: {topic_type} | Tarafsızlık: {neutrality} | {reason}"
+            if reason != "Değerlendirme yapılamadı":
+                await domain_reputation.aset_llm_score(domain, reliability_score)
             return reliability_score, full_reason
             
         except Exception as e:
@@ -191,6 +197,15 @@ Tarafsızlık: [Tüm kaynaklar tarafsız mı?]
             logger.error(f"Conflicting information detection failed: {e}")
             return "Karşılaştırma analizi yapılamadı"
     
+    async def estimate_llm_calls(self, url):
+        """Bir kaynağın analizinin gerektireceği LLM çağrısı sayısı (erken durdurma raporu için)"""
+        # Özet + spesifik veri çıkarma; pasaj modunda kaynak başına çağrı yok
+        calls = 0 if self.analysis_mode == "passages" else 2
+        domain = extract_domain(url)
+        if not domain_reputation.lookup(domain) and await domain_reputation.aget_llm_score(domain) is None:
+            calls += 1
+        return calls
+    
     async def extract_specific_data(self, content, topic):
         """İçerikten spesifik sayısal verileri çıkarır"""
         try:
@@ -365,20 +380,25 @@ Karşılaştırmalar: [oranlar ve trendler]
     async def search_web(self, query, max_results=12):
         """Web araması yapar - Google öncelikli, Tavily fallback"""
         try:
+            lang = self.detect_language(query)
+
             # Google search ile başla
             try:
                 import asyncio
                 import concurrent.futures
                 from googlesearch import search
                 
-                def sync_search():
-                    return list(search(query, num_results=max_results, lang=self.detect_language(query)))
-                
-                # Run sync search in thread pool
-                with concurrent.futures.ThreadPoolExecutor() as executor:
-                    search_results = await asyncio.get_event_loop().run_in_executor(
-                        executor, sync_search
-                    )
+                search_results = await search_cache.aget(query, provider="google", lang=lang, max_results=max_results)
+                if search_results is None:
+                    def sync_search():
+                        return list(search(query, num_results=max_results, lang=lang))
+                    
+                    # Run sync search in thread pool
+                    with concurrent.futures.ThreadPoolExecutor() as executor:
+                        search_results = await asyncio.get_event_loop().run_in_executor(
+                            executor, sync_search
+                        )
+                    await search_cache.aset(query, search_results, provider="google", lang=lang, max_results=max_results)
                 
                 results = []
                 for i, url in enumerate(search_results):
@@ -440,37 +460,11 @@ Karşılaştırmalar: [oranlar ve trendler]
                 "message": f"📖 {title[:50]}... sayfası okunuyor"
             })
             
-            async with aiohttp.ClientSession() as session:
-                await rate_limiter.wait(extract_domain(url))
-                async with session.get(url, timeout=10) as response:
-                    if response.status == 200:
-                        html = await response.text()
-                        
-                        # Basit HTML temizleme
-                        try:
-                            from bs4 import BeautifulSoup
-                            soup = BeautifulSoup(html, 'html.parser')
-                        except ImportError:
-                            # BeautifulSoup yoksa basit text extract
-                            import re
-                            # HTML taglerini kaldır
-                            text = re.sub('<[^<]+?>', '', html)
-                            return text[:3000]
-                        
-                        # Script ve style etiketlerini kaldır
-                        for script in soup(["script", "style"]):
-                            script.decompose()
-                        
-                        # Text'i al
-                        text = soup.get_text()
-                        
-                        # Satırları temizle
-                        lines = (line.strip() for line in text.splitlines())
-                        chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-                        text = ' '.join(chunk for chunk in chunks if chunk)
-                        
-                        # İlk 3000 karakteri al
-                        return text[:3000]
+            # Önbellekte taze kopya varsa indirilmez, eskiyse koşullu GET ile doğrulanır.
+            # Menü, çerez bandı vb. atılarak ana içerik çıkarılır; ilk page_chars karakter.
+            page = await fetch_page(url, timeout=10, stats=self.page_stats)
+            if page:
+                return page.text[:self.page_chars]
             
         except Exception as e:
             logger.error(f"Content extraction error for {url}: {e}")
@@ -545,6 +539,9 @@ Eğer içerik konuyla alakalı ise EVET, alakasız ise HAYIR.
     async def research_topic(self, topic):
         """Gerçek deep research yapar"""
         
+        self.page_stats = CacheRunStats()
+        self.relevance_filter.stats.clear()
+        
         await self.websocket.send_json({
             "type": "progress", 
             "step": 0.05, 
@@ -675,40 +672,108 @@ SADECE ARAMA TERİMLERİNİ VER:
         
         # 2. Web araması yap
         all_search_results = []
+        seen_urls = set()
         
         for i, query in enumerate(search_queries):
             results = await self.search_web(query, max_results=8)
             
+            # Aynı sayfanın http/https, utm_*, AMP kopyaları tekrar değerlendirilmez
+            unique_results = []
+            for position, result in enumerate(results):
+                result['rank'] = position
+                canonical = canonicalize_url(result['url'])
+                if canonical in seen_urls:
+                    continue
+                seen_urls.add(canonical)
+                unique_results.append(result)
+            
             # Sonuçları filtrele - sadece ilgili olanları al
-            filtered_results = []
-            for result in results:
-                if await self.check_relevance(topic, result):
-                    filtered_results.append(result)
+            filtered_results = await self.relevance_filter.filter(
+                unique_results,
+                topic,
+                search_queries,
+                llm_check=lambda result: self.check_relevance(topic, result),
+            )
             
             all_search_results.extend(filtered_results)
             await asyncio.sleep(1)  # Rate limiting
         
-        # 3. İçerikleri analiz et
+        logger.info(f"Relevance decisions: {dict(self.relevance_filter.stats)}")
+        
+        # 3. İçerikleri paralel indir: ilk N kullanılabilir kaynak, takılan siteler için yedek aday
+        await self.websocket.send_json({
+            "type": "progress", 
+            "step": 0.3, 
+            "message": f"📥 {self.target_sources} kaynak paralel indiriliyor..."
+        })
+        
+        # Adaylar alan adı güvenilirliği, konu örtüşmesi, güncellik ve arama sırasına göre
+        # sıralanır; benzer kaynaklar (aynı site, aynı kelimeler) geriye itilir (MMR)
+        candidates = rank_sources(
+            [result for result in all_search_results if result['url']],
+            topic,
+            search_queries,
+            domain_score=domain_reputation.prior,
+        )
+        duplicates = NearDuplicateIndex()
+        
+        async def fetch_unique(result):
+            content = await self.extract_content_from_url(result['url'], result['title'])
+            # Ayna siteler ve aynı makalenin kopyaları LLM analizine girmeden elenir
+            if content and duplicates.add(result['url'], content):
+                logger.info(f"Near-duplicate content skipped: {result['url']}")
+                return ""
+            return content
+        
+        fetched = await fetch_first_n(candidates, fetch_unique, target=self.target_sources)
+        
+        # 4. İçerikleri analiz et
         research_data = []
+        # Son kaynaklar art arda yeni bilgi getirmiyorsa kalanlar analiz edilmez
+        novelty = NoveltyTracker()
+        saturation_note = ""
         
-        for i, result in enumerate(all_search_results[:20]):  # İlk 20 sonuç
+        for i, (result, content) in enumerate(fetched):
+            if novelty.saturated:
+                skipped = [skipped_result for skipped_result, _ in fetched[i:]]
+                saved_calls = sum(await asyncio.gather(
+                    *(self.estimate_llm_calls(skipped_result['url']) for skipped_result in skipped)
+                ))
+                saturation_note = f" Bilgi doygunluğu: {len(skipped)} kaynak atlandı, ~{saved_calls} LLM çağrısı tasarruf edildi."
+                logger.info(f"Stopping analysis early: {novelty.stop_reason}; skipped {len(skipped)} sources, ~{saved_calls} LLM calls saved")
+                await self.websocket.send_json({
+                    "type": "message",
+                    "message": f"⏹️ Son {novelty.patience} kaynak yeni bilgi getirmedi, kalan {len(skipped)} kaynak atlanıyor"
+                })
+                break
+            novelty.observe(content)
+            
             # Kullanıcıya hangi siteyi incelediğini göster
             await self.websocket.send_json({
                 "type": "message", 
                 "message": f"{i+1}. {result['url']} - İnceleniyor..."
             })
             
-            # İçerik çek
-            if result['url']:
-                content = await self.extract_content_from_url(result['url'], result['title'])
-                result['content'] = content
-                
-                # Kaynak güvenilirliğini değerlendir
-                reliability_score, reason = await self.evaluate_source_reliability(
-                    result['url'], result['title'], content, topic
-                )
-                result['reliability_score'] = reliability_score
-                result['reliability_reason'] = reason
+            result['content'] = content
+            
+            # Kaynak güvenilirliğini değerlendir
+            reliability_score, reason = await self.evaluate_source_reliability(
+                result['url'], result['title'], content, topic
+            )
+            result['reliability_score'] = reliability_score
+            result['reliability_reason'] = reason
+            
+            # Pasaj modunda kaynak başına özet yok; içerik sonra retrieval ile seçilir
+            if self.analysis_mode == "passages" and content:
+                research_data.append({
+                    'source': result['title'],
+                    'url': result['url'],
+                    'analysis': '',
+                    'content': content,
+                    'reliability_score': result.get('reliability_score', 50),
+                    'reliability_reason': result.get('reliability_reason', 'Bilinmiyor')
+                })
+                continue
             
             # Model ile analiz et
             if result.get('content') or result.get('body'):
@@ -800,14 +865,40 @@ Sadece konuyla ilgili bilgileri özetle, kaynak adını da belirt.
             "message": "\n🤖 Rapor hazırlanıyor...\n"
         })
         
+        passages = []
+        if self.analysis_mode == "passages" and filtered_research_data:
+            # Tüm kaynakların pasajları arasından konuya en yakın ve birbirini tekrarlamayanlar
+            passages = await retrieve_passages(
+                filtered_research_data, topic, k=16, embeddings=self.embeddings, queries=search_queries
+            )
+            # Çelişki analizi kaynak bazında çalıştığı için seçilen pasajlar kaynağa yazılır
+            for index, selected in passages_by_source(passages).items():
+                filtered_research_data[index]['analysis'] = "\n".join(passage.text for passage in selected)
+            if not passages:
+                # Hiç pasaj seçilemediyse (konuyla kelime ortaklığı yok, embedding sunucusu kapalı)
+                # rapor boş analizlerle değil sayfa içeriğinin başıyla yazılır
+                for item in filtered_research_data:
+                    item['analysis'] = item['content'][:2000]
+            await self.websocket.send_json({
+                "type": "message",
+                "message": f"🧩 {len(filtered_research_data)} kaynaktan {len(passages)} ilgili pasaj seçildi"
+            })
+        
         # Çelişkili bilgileri tespit et
         conflicting_info = await self.detect_conflicting_information(filtered_research_data, topic)
         
-        # Tüm analiz sonuçlarını birleştir - güvenilirlik skoru ile
-        combined_research = "\n\n".join([
-            f"**Kaynak: {item['source']}** (Güvenilirlik: {item['reliability_score']}/100)\nURL: {item['url']}\nGüvenilirlik Notu: {item['reliability_reason']}\n{item['analysis']}"
-            for item in filtered_research_data
-        ])
+        if passages:
+            # Pasajlar kaynak adı, URL ve güvenilirlik skoru ile numaralandırılır
+            combined_research = format_passages(
+                passages,
+                lambda passage: f"(Güvenilirlik: {filtered_research_data[passage.source_index]['reliability_score']}/100)"
+            )
+        else:
+            # Tüm analiz sonuçlarını birleştir - güvenilirlik skoru ile
+            combined_research = "\n\n".join([
+                f"**Kaynak: {item['source']}** (Güvenilirlik: {item['reliability_score']}/100)\nURL: {item['url']}\nGüvenilirlik Notu: {item['reliability_reason']}\n{item['analysis']}"
+                for item in filtered_research_data
+            ])
         
         # Kaynak listesini de ekle
         source_list = "\n".join([
@@ -983,9 +1074,14 @@ GÜVEN: Yüksek güvenilirlik skorlu kaynakları öncelendir, düşük skorlu ka
         except Exception as e:
             final_report += f"\n\n**Not:** Dosya kaydetme hatası: {str(e)}"
         
+        logger.info(f"Page cache hit rate: {self.page_stats.summary()}")
+        logger.info(f"Source novelty: {novelty.summary()}")
+        
         await self.websocket.send_json({
             "type": "message", 
-            "message": "🎉 Araştırma tamamlandı! Kaynaklar txt dosyasına kaydedildi."
+            "message": f"🎉 Araştırma tamamlandı! Kaynaklar txt dosyasına kaydedildi. "
+                       f"(Sayfa önbelleği isabeti: %{self.page_stats.hit_rate * 100:.0f})"
+                       f"{saturation_note}"
         })
         
         return final_report
\ No newline at end of file
@@ -12,7 +12,12 @@ sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 from real_deep_research import RealDeepResearcher
 from smart_multilingual_research import SmartMultilingualResearcher
 from utils.research_cache import research_cache
+from utils.fetch_client import fetch_client
+from utils.http_cache import http_cache
+from utils.parse_pool import parse_pool
+from utils.rate_limiter import rate_limiter
 from utils.exporter import to_markdown, to_html
+from utils.passage_retrieval import ANALYSIS_MODES
 import asyncio
 import logging
 
@@ -22,6 +27,16 @@ logger = logging.getLogger(__name__)
 
 app = FastAPI()
 
+
+@app.on_event("shutdown")
+async def close_fetch_client():
+    """Paylaşılan HTTP oturumunu ve HTML ayrıştırma havuzunu kapatır, öğrenilen hız limitlerini ve sayfa erişim zamanlarını kaydeder."""
+    await fetch_client.close()
+    parse_pool.shutdown()
+    rate_limiter.save()
+    http_cache.flush()
+
+
 # Lokal model test fonksiyonları
 async def test_lm_studio():
     """LM Studio'nun çalışıp çalışmadığını test eder"""
@@ -308,7 +323,8 @@ async def research_http(request: ResearchRequest):
     """
     try:
         # Check cache first
-        cached = research_cache.get(request.topic)
+        cache_options = {"engine": "deep_researcher", "max_sources": researcher.max_sources}
+        cached = research_cache.get(request.topic, cache_options)
         if cached:
             logger.info(f"HTTP cache hit for topic: {request.topic}")
             return cached
@@ -317,7 +333,7 @@ async def research_http(request: ResearchRequest):
         result = {"status": "success", "answer": answer}
 
         # Cache the result
-        research_cache.set(request.topic, result)
+        research_cache.set(request.topic, result, cache_options)
 
         return result
     except Exception as e:
@@ -395,15 +411,26 @@ async def research_websocket(websocket: WebSocket):
             await websocket.send_json({"type": "progress", "step": 0, "message": "🌐 Akıllı çok dilli araştırma başlıyor..."})
 
             # Yeni akıllı çok dilli sistem kullan
+            # İstemci analiz edilecek kaynak sayısını seçebilir (varsayılan: 8)
+            researcher_options = {}
+            if isinstance(request.get("max_sources"), int) and request["max_sources"] > 0:
+                researcher_options["target_sources"] = request["max_sources"]
+            # "passages": kaynak başına LLM özeti yerine en ilgili pasajlar rapora girer
+            if request.get("analysis_mode") in ANALYSIS_MODES:
+                researcher_options["analysis_mode"] = request["analysis_mode"]
+
             researcher = SmartMultilingualResearcher(
                 model_name=model_name,
                 model_source=model_source,
-                websocket=websocket
+                websocket=websocket,
+                **researcher_options
             )
 
             try:
                 # Check cache first
-                cached = research_cache.get(topic)
+                # Aynı konu farklı analiz modu veya kaynak sayısıyla ayrı önbelleklenir
+                cache_options = {"analysis_mode": researcher.analysis_mode, "max_sources": researcher.target_sources}
+                cached = research_cache.get(topic, cache_options)
                 if cached:
                     logger.info(f"Cache hit for topic: {topic}")
                     await websocket.send_json({"type": "progress", "step": 1.0, "message": "Cache'den sonuc bulundu!"})
@@ -420,7 +447,7 @@ async def research_websocket(websocket: WebSocket):
                 answer = await researcher.run_research(topic)
 
                 # Cache the result
-                research_cache.set(topic, {"answer": answer, "status": "success"})
+                research_cache.set(topic, {"answer": answer, "status": "success"}, cache_options)
 
                 await websocket.send_json({"type": "result", "data": answer})
                 
@@ -445,12 +472,18 @@ async def research_websocket(websocket: WebSocket):
             logger.info("WebSocket connection closed.")
 
 @app.get("/export/{fmt}")
-async def export_research(fmt: str, topic: str = Query(..., description="Research topic to export")):
+async def export_research(
+    fmt: str,
+    topic: str = Query(..., description="Research topic to export"),
+    analysis_mode: str = Query("summaries", description="Analysis mode the research ran with"),
+    max_sources: int = Query(8, description="Number of sources the research ran with"),
+):
     """Export a cached research result as Markdown or HTML.
 
-    ``fmt`` must be ``"markdown"`` or ``"html"``.
+    ``fmt`` must be ``"markdown"`` or ``"html"``.  ``analysis_mode`` and
+    ``max_sources`` select the run, as results are cached per options.
     """
-    cached = research_cache.get(topic)
+    cached = research_cache.get(topic, {"analysis_mode": analysis_mode, "max_sources": max_sources})
     if cached is None:
         return PlainTextResponse(
             f"No cached result found for topic: {topic}", status_code=404
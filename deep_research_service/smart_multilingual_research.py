@@ -8,7 +8,18 @@ import re
 from typing import List, Dict, Any
 import time
 
-from utils.rate_limiter import rate_limiter, extract_domain
+from utils.rate_limiter import extract_domain
+from utils.search_cache import search_cache
+from utils.source_ranker import rank_sources
+from utils.page_cache import PageCache
+from utils.dedup import NearDuplicateIndex, dedupe_urls
+from utils.domain_reputation import domain_reputation
+from utils.hedged_fetch import fetch_first_n
+from utils.http_cache import CacheRunStats
+from utils.page_fetcher import fetch_page
+from utils.embeddings import get_embedding_service
+from utils.passage_retrieval import format_passages, passages_by_source, retrieve_passages
+from utils.saturation import NoveltyTracker
 
 logger = logging.getLogger(__name__)
 
@@ -22,13 +33,26 @@ class SmartMultilingualResearcher:
     - Kapsamlı rapor oluşturma
     """
     
-    def __init__(self, model_name, model_source, websocket):
+    def __init__(self, model_name, model_source, websocket, page_cache=None, target_sources=8, analysis_mode="summaries"):
         self.model_name = model_name
         self.model_source = model_source
         self.websocket = websocket
         self.search_results = []
         self.research_data = []
         self.query_language = "auto"
+        # Arama aşamasında indirilen sayfalar içerik analizinde tekrar indirilmez.
+        # Çalıştırmalar arası paylaşım için utils.page_cache.shared_page_cache verilebilir.
+        self.page_cache = page_cache if page_cache is not None else PageCache()
+        # Kalıcı sayfa önbelleği isabet sayaçları (her araştırmada sıfırlanır)
+        self.page_stats = CacheRunStats()
+        # Analiz edilecek kullanılabilir kaynak sayısı (yavaş siteler yerine sıradaki aday indirilir)
+        self.target_sources = target_sources
+        # "summaries": her kaynak için ayrı LLM özeti; "passages": tüm sayfalardan en ilgili
+        # pasajlar seçilir, kaynak başına LLM çağrısı yapılmaz
+        self.analysis_mode = analysis_mode
+        self.embeddings = get_embedding_service(model_source)
+        # Pasaj modunda sayfanın daha büyük kısmı tutulur (seçimi retrieval yapar)
+        self.page_chars = 12000 if analysis_mode == "passages" else 4000
         
     async def call_local_model(self, prompt, system_prompt="", max_tokens=3000):
         """Lokal modeli asenkron olarak çağırır - Ollama ve LM Studio desteği"""
@@ -299,6 +323,24 @@ Write only the queries, one per line, no explanations.
             logger.error(f"Query generation error: {e}")
             return [topic]
 
+    async def _describe_google_hit(self, url):
+        """Google sonucunu indirip başlık ve meta açıklamasını çıkarır"""
+        try:
+            # Kalıcı önbellekten geçer; metin içerik analizinde tekrar kullanılır
+            page = await fetch_page(url, timeout=5, stats=self.page_stats)
+            if page is None:
+                return None
+            self.page_cache.put(url, page.text)
+            
+            return {
+                'title': page.title or url,
+                'body': page.description,
+                'href': url,
+                'source': 'Google'
+            }
+        except Exception:
+            return None
+
     async def search_web_advanced(self, query, max_results=5):
         """Gelişmiş web araması - Google ve DuckDuckGo hibrit"""
         try:
@@ -309,78 +351,64 @@ Write only the queries, one per line, no explanations.
             })
             
             import asyncio
-            import concurrent.futures
             
-            def sync_search():
-                results = []
-                
-                # Önce Google'ı dene
+            cached_results = await search_cache.aget(
+                query, provider="google+duckduckgo", lang="en", max_results=max_results
+            )
+            if cached_results is not None:
+                return cached_results
+            
+            def sync_google_search():
                 try:
                     from googlesearch import search as google_search
-                    import requests
-                    from bs4 import BeautifulSoup
-                    
-                    google_urls = list(google_search(query, num_results=max_results, lang='en'))
+                    return list(google_search(query, num_results=max_results, lang='en'))[:max_results]
+                except ImportError:
+                    return []
+            
+            def sync_ddg_search(needed):
+                results = []
+                try:
+                    from duckduckgo_search import DDGS
+                    ddgs = DDGS()
+                    ddg_results = list(ddgs.text(query, max_results=max_results, region='us-en'))
                     
-                    for url in google_urls[:max_results]:
-                        try:
-                            response = requests.get(url, timeout=5, headers={
-                                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-                            })
-                            soup = BeautifulSoup(response.text, 'html.parser')
-                            title = soup.find('title')
-                            title_text = title.text if title else url
-                            
-                            meta_desc = soup.find('meta', attrs={'name': 'description'})
-                            description = meta_desc.get('content', '') if meta_desc else ''
+                    for result in ddg_results:
+                        if len(results) >= needed:
+                            break
                             
-                            results.append({
-                                'title': title_text,
-                                'body': description,
-                                'href': url,
-                                'source': 'Google'
-                            })
-                        except:
+                        title = result.get('title', '').lower()
+                        body = result.get('body', '').lower()
+                        url = result.get('href', '').lower()
+                        
+                        # Çince karakterleri filtrele
+                        chinese_pattern = r'[\u4e00-\u9fff]'
+                        if (re.search(chinese_pattern, title) or 
+                            re.search(chinese_pattern, body) or
+                            any(site in url for site in ['zhihu.com', 'baidu.com', 'weibo.com'])):
                             continue
-                            
-                except ImportError:
-                    pass
-                
-                # Google yetersizse DuckDuckGo ekle
-                if len(results) < max_results:
-                    try:
-                        from duckduckgo_search import DDGS
-                        ddgs = DDGS()
-                        ddg_results = list(ddgs.text(query, max_results=max_results, region='us-en'))
                         
-                        for result in ddg_results:
-                            if len(results) >= max_results:
-                                break
-                                
-                            title = result.get('title', '').lower()
-                            body = result.get('body', '').lower()
-                            url = result.get('href', '').lower()
-                            
-                            # Çince karakterleri filtrele
-                            chinese_pattern = r'[\u4e00-\u9fff]'
-                            if (re.search(chinese_pattern, title) or 
-                                re.search(chinese_pattern, body) or
-                                any(site in url for site in ['zhihu.com', 'baidu.com', 'weibo.com'])):
-                                continue
-                            
-                            result['source'] = 'DuckDuckGo'
-                            results.append(result)
-                    except:
-                        pass
-                
+                        result['source'] = 'DuckDuckGo'
+                        results.append(result)
+                except:
+                    pass
                 return results
             
-            # Sync search'ü thread pool'da çalıştır
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                search_results = await asyncio.get_event_loop().run_in_executor(
-                    executor, sync_search
+            loop = asyncio.get_running_loop()
+            
+            # Önce Google'ı dene - sayfalar paylaşılan istemciyle paralel indirilir
+            google_urls = await loop.run_in_executor(None, sync_google_search)
+            described = await asyncio.gather(*(self._describe_google_hit(url) for url in google_urls))
+            search_results = [result for result in described if result]
+            
+            # Google yetersizse DuckDuckGo ekle
+            if len(search_results) < max_results:
+                search_results.extend(
+                    await loop.run_in_executor(None, sync_ddg_search, max_results - len(search_results))
                 )
             
+            await search_cache.aset(
+                query, search_results, provider="google+duckduckgo", lang="en", max_results=max_results
+            )
             return search_results
             
         except Exception as e:
@@ -396,36 +424,16 @@ Write only the queries, one per line, no explanations.
                 "message": f"📖 İçerik analiz ediliyor: {title[:40]}..."
             })
             
-            async with aiohttp.ClientSession() as session:
-                await rate_limiter.wait(extract_domain(url))
-                async with session.get(url, timeout=15) as response:
-                    if response.status == 200:
-                        html = await response.text()
-                        
-                        # HTML temizleme
-                        try:
-                            from bs4 import BeautifulSoup
-                            soup = BeautifulSoup(html, 'html.parser')
-                            
-                            # Script ve style etiketlerini kaldır
-                            for script in soup(["script", "style", "nav", "footer", "header"]):
-                                script.decompose()
-                            
-                            # Text'i al
-                            text = soup.get_text()
-                            
-                            # Satırları temizle
-                            lines = (line.strip() for line in text.splitlines())
-                            chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-                            clean_text = ' '.join(chunk for chunk in chunks if chunk)
-                            
-                            return clean_text[:4000]  # İlk 4000 karakter
-                            
-                        except ImportError:
-                            # BeautifulSoup yoksa basit text extract
-                            import re
-                            text = re.sub('<[^<]+?>', '', html)
-                            return text[:4000]
+            # Arama aşamasında zaten indirildiyse tekrar indirme
+            text = self.page_cache.get(url)
+            if text is not None:
+                return text[:self.page_chars]
+            
+            # Kalıcı önbellek: taze kopya doğrudan, eskisi koşullu GET ile
+            page = await fetch_page(url, timeout=15, stats=self.page_stats)
+            if page is None:
+                return ""
+            return page.text[:self.page_chars]
             
         except Exception as e:
             logger.error(f"Content extraction error for {url}: {e}")
@@ -433,6 +441,29 @@ Write only the queries, one per line, no explanations.
 
     async def evaluate_source_reliability(self, source_data):
         """Kaynak güvenilirliğini AI ile değerlendirir"""
+        domain = extract_domain(source_data.get('href', ''))
+        
+        # Bilinen alan adları için LLM'e sorulmaz (indeks 0-100, burada 1-10 ölçeği)
+        known = domain_reputation.lookup(domain)
+        if known:
+            score = max(1, int(known.score / 10 + 0.5))
+            return {
+                'score': score,
+                'evaluation': f"Bilinen alan adı: {known.matched} ({known.tier})",
+                'reliable': score >= 6
+            }
+        
+        # Bilinmeyen alan adı bugün zaten değerlendirildiyse tekrar sorulmaz
+        # (yalnızca puan saklanır; gerekçe o günkü sayfaya aitti)
+        cached = await domain_reputation.aget_llm_score(domain)
+        if cached is not None:
+            score = max(1, int(cached / 10 + 0.5))
+            return {
+                'score': score,
+                'evaluation': f"Alan adı bugün değerlendirildi: {domain} ({score}/10)",
+                'reliable': score >= 6
+            }
+        
         try:
             prompt = f"""
 Bu web kaynağının güvenilirliğini 1-10 arasında puanla:
@@ -460,6 +491,8 @@ Format: "Puan: X/10 - Gerekçe"
             # Puanı çıkar
             score_match = re.search(r'(\d+)/10', evaluation)
             score = int(score_match.group(1)) if score_match else 5
+            if score_match:
+                await domain_reputation.aset_llm_score(domain, score * 10)
             
             return {
                 'score': score,
@@ -471,6 +504,15 @@ Format: "Puan: X/10 - Gerekçe"
             logger.error(f"Source evaluation error: {e}")
             return {'score': 5, 'evaluation': 'Değerlendirilemedi', 'reliable': True}
 
+    async def estimate_llm_calls(self, url):
+        """Bir kaynağın analizinin gerektireceği LLM çağrısı sayısı (erken durdurma raporu için)"""
+        # Özet; pasaj modunda kaynak başına çağrı yok
+        calls = 0 if self.analysis_mode == "passages" else 1
+        domain = extract_domain(url)
+        if not domain_reputation.lookup(domain) and await domain_reputation.aget_llm_score(domain) is None:
+            calls += 1
+        return calls
+
     async def iterative_research_analysis(self, topic, research_data):
         """İteratif araştırma analizi - eksik alanları tespit eder"""
         try:
@@ -526,6 +568,7 @@ Sadece en önemli 2-3 eksik alanı belirt.
         """Ana araştırma fonksiyonu - tüm süreci yönetir"""
         try:
             start_time = time.time()
+            self.page_stats = CacheRunStats()
             
             await self.websocket.send_json({
                 "type": "progress", 
@@ -549,29 +592,78 @@ Sadece en önemli 2-3 eksik alanı belirt.
                 })
                 
                 results = await self.search_web_advanced(query, max_results=4)
+                for position, result in enumerate(results):
+                    result['rank'] = position
                 all_results.extend(results)
                 
                 await asyncio.sleep(1)  # Rate limiting
             
-            # 4. İçerik analizi
+            # Aynı sayfanın http/https, utm_*, AMP kopyaları tek sonuca indirilir
+            all_results = dedupe_urls(all_results, lambda result: result['href'])
+            
+            # En umut verici ve birbirinden farklı kaynaklar öne alınır (konu örtüşmesi, güncellik, MMR)
+            all_results = rank_sources(
+                all_results,
+                topic,
+                queries,
+                url_of=lambda result: result['href'],
+                domain_score=domain_reputation.prior,
+            )
+            
+            # 4. İçerikleri paralel indir: ilk N kullanılabilir kaynak, takılan siteler için yedek aday
+            duplicates = NearDuplicateIndex()
+            
+            async def fetch_unique(result):
+                content = await self.extract_and_analyze_content(result['href'], result['title'])
+                # Ayna siteler ve aynı makalenin kopyaları LLM analizine girmeden elenir
+                if content and duplicates.add(result['href'], content):
+                    logger.info(f"Near-duplicate content skipped: {result['href']}")
+                    return ""
+                return content
+            
+            fetched = await fetch_first_n(all_results, fetch_unique, target=self.target_sources)
+            
+            # 5. İçerik analizi
             research_data = []
-            for i, result in enumerate(all_results[:10]):  # İlk 10 sonuç
+            # Son kaynaklar art arda yeni bilgi getirmiyorsa kalanlar analiz edilmez
+            novelty = NoveltyTracker()
+            saturation_note = ""
+            for i, (result, content) in enumerate(fetched):
+                if novelty.saturated:
+                    skipped = [skipped_result for skipped_result, _ in fetched[i:]]
+                    saved_calls = sum(await asyncio.gather(
+                        *(self.estimate_llm_calls(skipped_result['href']) for skipped_result in skipped)
+                    ))
+                    saturation_note = f", bilgi doygunluğu: {len(skipped)} kaynak atlandı, ~{saved_calls} LLM çağrısı tasarruf"
+                    logger.info(f"Stopping analysis early: {novelty.stop_reason}; skipped {len(skipped)} sources, ~{saved_calls} LLM calls saved")
+                    break
+                novelty.observe(content)
+                
                 await self.websocket.send_json({
                     "type": "progress", 
                     "step": 0.5 + (i * 0.03), 
                     "message": f"📊 Kaynak analizi: {result['title'][:30]}..."
                 })
                 
-                # İçerik çek
-                content = await self.extract_and_analyze_content(result['href'], result['title'])
                 result['content'] = content
                 
                 # Güvenilirlik değerlendir
                 reliability = await self.evaluate_source_reliability(result)
                 result['reliability'] = reliability
                 
+                # Pasaj modunda kaynak başına özet yok; içerik sonra retrieval ile seçilir
+                if self.analysis_mode == "passages" and reliability['reliable'] and content:
+                    research_data.append({
+                        'source': result['title'],
+                        'url': result['href'],
+                        'analysis': '',
+                        'content': content,
+                        'reliability_score': reliability['score'],
+                        'search_source': result.get('source', 'Unknown')
+                    })
+                
                 # Sadece güvenilir kaynakları al
-                if reliability['reliable'] and content:
+                elif reliability['reliable'] and content:
                     analysis_prompt = f"""
 Bu web kaynağındaki bilgileri '{topic}' konusu için özetle:
 
@@ -596,26 +688,50 @@ Sadece konuyla ilgili önemli bilgileri özetle.
                             'search_source': result.get('source', 'Unknown')
                         })
             
-            # 5. Eksiklik analizi (opsiyonel)
+            passages = []
+            if self.analysis_mode == "passages" and research_data:
+                # Tüm kaynakların pasajları arasından konuya en yakın ve birbirini tekrarlamayanlar
+                passages = await retrieve_passages(
+                    research_data, topic, k=16, embeddings=self.embeddings, queries=queries
+                )
+                # Eksiklik analizi kaynak bazında çalıştığı için seçilen pasajlar kaynağa yazılır
+                for index, selected in passages_by_source(passages).items():
+                    research_data[index]['analysis'] = "\n".join(passage.text for passage in selected)
+                if not passages:
+                    # Hiç pasaj seçilemediyse (konuyla kelime ortaklığı yok, embedding sunucusu kapalı)
+                    # rapor boş analizlerle değil sayfa içeriğinin başıyla yazılır
+                    for item in research_data:
+                        item['analysis'] = item['content'][:2000]
+                await self.websocket.send_json({
+                    "type": "progress",
+                    "step": 0.65,
+                    "message": f"🧩 {len(research_data)} kaynaktan {len(passages)} ilgili pasaj seçildi"
+                })
+            
+            # 6. Eksiklik analizi (opsiyonel)
             gaps = await self.iterative_research_analysis(topic, research_data)
             
-            # 6. Final rapor
+            # 7. Final rapor
             await self.websocket.send_json({
                 "type": "progress", 
                 "step": 0.9, 
                 "message": "📝 Kapsamlı araştırma raporu hazırlanıyor..."
             })
             
-            report = await self.generate_comprehensive_report(topic, research_data, language, gaps)
+            report = await self.generate_comprehensive_report(topic, research_data, language, gaps, passages)
             
-            # 7. Performans metrikleri
+            # 8. Performans metrikleri
             end_time = time.time()
             duration = end_time - start_time
+            logger.info(f"Page cache stats: {self.page_cache.stats()}")
+            logger.info(f"Persistent page cache hit rate: {self.page_stats.summary()}")
+            logger.info(f"Source novelty: {novelty.summary()}")
             
             await self.websocket.send_json({
                 "type": "progress", 
                 "step": 1.0, 
-                "message": f"✅ Araştırma tamamlandı! ({duration:.1f}s, {len(research_data)} kaynak)"
+                "message": f"✅ Araştırma tamamlandı! ({duration:.1f}s, {len(research_data)} kaynak, "
+                           f"sayfa önbelleği isabeti %{self.page_stats.hit_rate * 100:.0f}{saturation_note})"
             })
             
             return report
@@ -624,14 +740,21 @@ Sadece konuyla ilgili önemli bilgileri özetle.
             logger.error(f"Research process error: {e}")
             return f"Araştırma hatası: {str(e)}"
 
-    async def generate_comprehensive_report(self, topic, research_data, language, gaps):
+    async def generate_comprehensive_report(self, topic, research_data, language, gaps, passages=None):
         """Kapsamlı araştırma raporu oluşturur"""
         try:
-            # Araştırma verilerini birleştir
-            combined_research = "\n\n".join([
-                f"**Kaynak: {item['source']}** (Güvenilirlik: {item['reliability_score']}/10)\nURL: {item['url']}\nAraştırma Motoru: {item['search_source']}\n{item['analysis']}"
-                for item in research_data
-            ])
+            if passages:
+                # Seçilen pasajlar kaynak adı, URL ve güvenilirlik skoru ile numaralandırılır
+                combined_research = format_passages(
+                    passages,
+                    lambda passage: f"(Güvenilirlik: {research_data[passage.source_index]['reliability_score']}/10)"
+                )
+            else:
+                # Araştırma verilerini birleştir
+                combined_research = "\n\n".join([
+                    f"**Kaynak: {item['source']}** (Güvenilirlik: {item['reliability_score']}/10)\nURL: {item['url']}\nAraştırma Motoru: {item['search_source']}\n{item['analysis']}"
+                    for item in research_data
+                ])
             
             # Eksiklik bilgisi
             gaps_text = "\n".join([f"- {gap}" for gap in gaps]) if gaps else "Kapsamlı araştırma tamamlandı."
@@ -13,6 +13,14 @@ class ResearchPlan(BaseModel):
         description="A list of search queries to thoroughly research the topic")
 
 
+class ResearchEvaluation(BaseModel):
+    queries: list[str] = Field(
+        description="A list of follow-up search queries that address the remaining information gaps")
+    covered_subtopics: list[str] = Field(
+        default_factory=list,
+        description="Short names of the subtopics the search results already cover")
+
+
 class SourceList(BaseModel):
     sources: list[int] = Field(
         description="A list of source numbers from the search results")
@@ -86,7 +94,33 @@ class DeepResearchResults(SearchResults):
     def __add__(self, other):
         return DeepResearchResults(results=self.results + other.results)
 
+    def to_dict(self) -> dict:
+        """Compact, JSON-serialisable form used by the result store."""
+        return {
+            "results": [
+                [r.title, r.link, r.content, r.raw_content, r.filtered_raw_content] for r in self.results
+            ]
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "DeepResearchResults":
+        return cls(
+            results=[
+                DeepResearchResult(
+                    title=title, link=link, content=content, raw_content=raw_content, filtered_raw_content=filtered
+                )
+                for title, link, content, raw_content, filtered in data["results"]
+            ]
+        )
+
     def dedup(self):
+        """Drop results whose link canonicalises to an earlier one or whose content is a near-duplicate."""
+        # The shared dedup helpers live in the service root; fall back to exact links without them
+        try:
+            from utils.dedup import NearDuplicateIndex  # type: ignore
+        except ImportError:
+            NearDuplicateIndex = None  # type: ignore
+
         def deduplicate_by_link(results):
             seen_links = set()
             unique_results = []
@@ -98,4 +132,16 @@ class DeepResearchResults(SearchResults):
 
             return unique_results
 
-        return DeepResearchResults(results=deduplicate_by_link(self.results))
+        def deduplicate_by_content(results):
+            index = NearDuplicateIndex()
+            unique_results = []
+
+            for result in results:
+                if index.add(result.link, result.raw_content or result.content) is None:
+                    unique_results.append(result)
+
+            return unique_results
+
+        if NearDuplicateIndex is None:
+            return DeepResearchResults(results=deduplicate_by_link(self.results))
+        return DeepResearchResults(results=deduplicate_by_content(self.results))
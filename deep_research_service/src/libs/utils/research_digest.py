@@ -0,0 +1,104 @@
+"""Rolling research-state digest for DeepResearcher's iteration loop.
+
+Evaluating research completeness with ``str(results)`` of everything found
+so far makes every iteration's prompt longer than the last, so the total
+prompt size grows quadratically with the number of iterations.  The digest
+keeps a compressed view of the results already evaluated instead: a short
+extractive note per result plus the subtopics the evaluator reported as
+covered.  Each evaluation then only sees the digest and the new results,
+and the digest is updated incrementally afterwards.
+"""
+
+import re
+from dataclasses import dataclass
+
+from libs.utils.data_types import DeepResearchResults
+
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# Length of the note kept per result
+DEFAULT_NOTE_CHARS = 240
+# Above this size older entries are listed by title only
+DEFAULT_MAX_CHARS = 12000
+
+
+@dataclass
+class DigestEntry:
+    title: str
+    link: str
+    note: str
+
+
+def compress_text(text: str, max_chars: int = DEFAULT_NOTE_CHARS) -> str:
+    """Leading sentences of *text* that fit into *max_chars*."""
+    text = _WHITESPACE_RE.sub(" ", text or "").strip()
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars]
+    boundaries = [match.start() for match in _SENTENCE_END_RE.finditer(cut)]
+    if boundaries and boundaries[-1] > max_chars // 3:
+        return cut[: boundaries[-1]]
+    return cut.rsplit(" ", 1)[0] + "..."
+
+
+class ResearchDigest:
+    """Compressed, incrementally updated summary of the results evaluated so far."""
+
+    def __init__(self, note_chars: int = DEFAULT_NOTE_CHARS, max_chars: int = DEFAULT_MAX_CHARS):
+        """
+        Args:
+            note_chars: Length of the note kept per result.
+            max_chars:  Soft size limit of the rendered digest; beyond it the
+                        oldest entries lose their notes.
+        """
+        self.note_chars = note_chars
+        self.max_chars = max_chars
+        self.entries: list[DigestEntry] = []
+        self.covered_subtopics: list[str] = []
+        self._links: set[str] = set()
+
+    def new_results(self, results: DeepResearchResults) -> DeepResearchResults:
+        """The part of *results* that is not in the digest yet."""
+        return DeepResearchResults(results=[result for result in results.results if result.link not in self._links])
+
+    def add_results(self, results: DeepResearchResults) -> None:
+        """Add a short note for each result not in the digest yet."""
+        for result in results.results:
+            if result.link in self._links:
+                continue
+            self._links.add(result.link)
+            text = result.filtered_raw_content or result.content or result.raw_content or ""
+            self.entries.append(DigestEntry(title=result.title, link=result.link, note=compress_text(text, self.note_chars)))
+
+    def add_subtopics(self, subtopics: list[str]) -> None:
+        """Merge subtopics the evaluator reported as covered."""
+        known = {subtopic.casefold() for subtopic in self.covered_subtopics}
+        for subtopic in subtopics:
+            subtopic = subtopic.strip()
+            if subtopic and subtopic.casefold() not in known:
+                known.add(subtopic.casefold())
+                self.covered_subtopics.append(subtopic)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __str__(self) -> str:
+        if not self.entries:
+            return "No results evaluated yet."
+
+        lines = [f"- [{entry.title}]({entry.link}): {entry.note}" for entry in self.entries]
+        # Keep the newest notes; older entries shrink to title and link
+        size = sum(len(line) + 1 for line in lines)
+        for i, entry in enumerate(self.entries):
+            if size <= self.max_chars:
+                break
+            short = f"- [{entry.title}]({entry.link})"
+            size -= len(lines[i]) - len(short)
+            lines[i] = short
+
+        covered = "\n".join(f"- {subtopic}" for subtopic in self.covered_subtopics) or "- (none reported yet)"
+        return (
+            f"Covered subtopics:\n{covered}\n\n"
+            f"Results already evaluated ({len(self.entries)}):\n" + "\n".join(lines)
+        )
@@ -0,0 +1,284 @@
+"""Indexed on-disk store for DeepResearcher search results.
+
+All cached queries live in one SQLite database running in WAL mode, so
+readers never wait on writers and no per-entry lock files are needed.
+Results are stored as zlib-compressed JSON (see
+``DeepResearchResults.to_dict``) and the store is kept under a byte budget
+by evicting the least recently used entries.  Reads do not write: the
+access times they produce are buffered and written in one batch by
+``flush``, by the next ``set``, or once enough of them have piled up.
+
+Per-source LLM summaries live in a second table keyed by URL, a hash of
+the page content and the research topic, so a page is summarised again
+only when it changes or is read for a different topic.  That table has its
+own byte budget and is evicted the same way.
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+
+from libs.utils.data_types import DeepResearchResults
+
+logger = logging.getLogger(__name__)
+
+# 256 MB of compressed results
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+# 64 MB of compressed summaries
+DEFAULT_MAX_SUMMARY_BYTES = 64 * 1024 * 1024
+# Buffered access times are written once this many have accumulated
+_ACCESS_FLUSH_SIZE = 64
+
+# Key column of each table, for access-time updates and eviction
+_KEY_COLUMNS = {"results": "query_hash", "summaries": "summary_key"}
+
+
+class ResultStore:
+    """SQLite (WAL) store mapping search queries to ``DeepResearchResults``."""
+
+    def __init__(
+        self,
+        db_path: str | Path,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        max_summary_bytes: int = DEFAULT_MAX_SUMMARY_BYTES,
+    ):
+        """
+        Args:
+            db_path:           Path to the SQLite database file.
+            max_bytes:         Upper bound for the total size of stored payloads.
+            max_summary_bytes: Upper bound for the total size of stored summaries.
+        """
+        self.db_path = str(db_path)
+        self.max_bytes = max_bytes
+        self.max_summary_bytes = max_summary_bytes
+        self._lock = threading.Lock()
+        # (table, key) -> last read time, not yet written
+        self._pending_access: dict[tuple[str, str], float] = {}
+        self._ensure_table()
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _ensure_table(self) -> None:
+        conn = self._connect()
+        try:
+            # WAL is persistent, so setting it once at creation is enough
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS results (
+                    query_hash   TEXT PRIMARY KEY,
+                    query        TEXT NOT NULL,
+                    payload      BLOB NOT NULL,
+                    size         INTEGER NOT NULL,
+                    created_at   REAL NOT NULL,
+                    accessed_at  REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_results_accessed ON results (accessed_at)")
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(summaries)")}
+            if columns and "accessed_at" not in columns:
+                # Summaries written before the size budget existed; it is only a cache
+                conn.execute("DROP TABLE summaries")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS summaries (
+                    summary_key  TEXT PRIMARY KEY,
+                    link         TEXT NOT NULL,
+                    summary      BLOB NOT NULL,
+                    size         INTEGER NOT NULL,
+                    created_at   REAL NOT NULL,
+                    accessed_at  REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_summaries_accessed ON summaries (accessed_at)")
+            conn.commit()
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _hash_query(query: str) -> str:
+        return hashlib.sha256(query.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def summary_key(link: str, content: str, topic: str) -> str:
+        """Cache key of a summary: URL, SHA-256 of the summarised content and topic."""
+        content_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()
+        return hashlib.sha256(f"{link}\0{content_hash}\0{topic}".encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _encode(results: DeepResearchResults) -> bytes:
+        raw = json.dumps(results.to_dict(), ensure_ascii=False, separators=(",", ":"))
+        return zlib.compress(raw.encode("utf-8"), 6)
+
+    @staticmethod
+    def _decode(payload: bytes) -> DeepResearchResults:
+        return DeepResearchResults.from_dict(json.loads(zlib.decompress(payload)))
+
+    def _record_access(self, table: str, keys: list[str]) -> None:
+        """Buffer the read time of *keys*; writes the buffer once it is large enough."""
+        now = time.time()
+        with self._lock:
+            for key in keys:
+                self._pending_access[(table, key)] = now
+            flush = len(self._pending_access) >= _ACCESS_FLUSH_SIZE
+        if flush:
+            self.flush()
+
+    def _write_access_times(self, conn: sqlite3.Connection) -> None:
+        """Write the buffered access times (caller holds ``_lock``)."""
+        for table, key_column in _KEY_COLUMNS.items():
+            rows = [(accessed_at, key) for (t, key), accessed_at in self._pending_access.items() if t == table]
+            if rows:
+                conn.executemany(f"UPDATE {table} SET accessed_at = ? WHERE {key_column} = ?", rows)
+        self._pending_access.clear()
+
+    def _evict(self, conn: sqlite3.Connection, table: str = "results") -> None:
+        """Drop the least recently used rows of *table* until it fits its byte budget."""
+        key_column = _KEY_COLUMNS[table]
+        max_bytes = self.max_bytes if table == "results" else self.max_summary_bytes
+        total = conn.execute(f"SELECT COALESCE(SUM(size), 0) FROM {table}").fetchone()[0]
+        if total <= max_bytes:
+            return
+
+        excess = total - max_bytes
+        freed = 0
+        victims = []
+        for key, size in conn.execute(f"SELECT {key_column}, size FROM {table} ORDER BY accessed_at"):
+            victims.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        conn.executemany(f"DELETE FROM {table} WHERE {key_column} = ?", victims)
+        logger.info(f"Result store evicted {len(victims)} {table} entries ({freed} bytes)")
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def get_many(self, queries: list[str]) -> dict[str, DeepResearchResults]:
+        """Return cached results for every query that has an entry, in one lookup."""
+        if not queries:
+            return {}
+
+        hashes = {self._hash_query(q): q for q in queries}
+        placeholders = ",".join("?" * len(hashes))
+        found: dict[str, DeepResearchResults] = {}
+
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                f"SELECT query_hash, payload FROM results WHERE query_hash IN ({placeholders})",
+                list(hashes),
+            ).fetchall()
+        finally:
+            conn.close()
+
+        for query_hash, payload in rows:
+            try:
+                found[hashes[query_hash]] = self._decode(payload)
+            except Exception as e:
+                logger.warning(f"Corrupt result store entry for query '{hashes[query_hash]}': {e}")
+
+        if rows:
+            self._record_access("results", [query_hash for query_hash, _ in rows])
+        return found
+
+    def get(self, query: str) -> DeepResearchResults | None:
+        return self.get_many([query]).get(query)
+
+    def set(self, query: str, results: DeepResearchResults) -> None:
+        """Store *results* for *query*, evicting old entries if over budget."""
+        payload = self._encode(results)
+        now = time.time()
+
+        with self._lock:
+            conn = self._connect()
+            try:
+                self._write_access_times(conn)
+                conn.execute(
+                    """
+                    INSERT OR REPLACE INTO results (query_hash, query, payload, size, created_at, accessed_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    """,
+                    (self._hash_query(query), query, payload, len(payload), now, now),
+                )
+                self._evict(conn)
+                conn.commit()
+            finally:
+                conn.close()
+
+    def get_summaries(self, keys: list[str]) -> dict[str, str]:
+        """Return the cached summaries for the given summary keys, in one lookup."""
+        if not keys:
+            return {}
+
+        placeholders = ",".join("?" * len(keys))
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                f"SELECT summary_key, summary FROM summaries WHERE summary_key IN ({placeholders})", list(keys)
+            ).fetchall()
+        finally:
+            conn.close()
+
+        if rows:
+            self._record_access("summaries", [key for key, _ in rows])
+        return {key: zlib.decompress(summary).decode("utf-8") for key, summary in rows}
+
+    def set_summary(self, key: str, link: str, summary: str) -> None:
+        """Store *summary* under *key*, evicting old summaries if over budget."""
+        payload = zlib.compress(summary.encode("utf-8"), 6)
+        now = time.time()
+
+        with self._lock:
+            conn = self._connect()
+            try:
+                self._write_access_times(conn)
+                conn.execute(
+                    """
+                    INSERT OR REPLACE INTO summaries (summary_key, link, summary, size, created_at, accessed_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    """,
+                    (key, link, payload, len(payload), now, now),
+                )
+                self._evict(conn, "summaries")
+                conn.commit()
+            finally:
+                conn.close()
+
+    def flush(self) -> None:
+        """Write access times buffered by ``get_many`` and ``get_summaries``."""
+        with self._lock:
+            if not self._pending_access:
+                return
+            conn = self._connect()
+            try:
+                self._write_access_times(conn)
+                conn.commit()
+            finally:
+                conn.close()
+
+    def clear(self) -> None:
+        with self._lock:
+            conn = self._connect()
+            try:
+                conn.execute("DELETE FROM results")
+                conn.execute("DELETE FROM summaries")
+                conn.commit()
+            finally:
+                conn.close()
+            self._pending_access.clear()
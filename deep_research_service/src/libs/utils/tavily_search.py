@@ -1,6 +1,9 @@
 import asyncio
+import logging
 import os
-from dataclasses import dataclass
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
 from typing import Optional
 
 # Tavily istemcisi opsiyonel olarak içe aktarılır
@@ -13,13 +16,45 @@ except ImportError:  # Paket kurulu değilse
 # Google tabanlı arama için gerekli bağımlılıkları opsiyonel içe aktar
 try:
     from googlesearch import search as google_search  # type: ignore
-    from bs4 import BeautifulSoup  # type: ignore
     import requests  # type: ignore
+    from requests.adapters import HTTPAdapter  # type: ignore
 except ImportError:
     google_search = None  # type: ignore
-    BeautifulSoup = None  # type: ignore
     requests = None  # type: ignore
 
+# Paylaşılan arama önbelleği ve HTML çıkarıcı servis kökünde yaşar; src/ tek başına çalıştırıldığında bulunmayabilir
+try:
+    from utils.search_cache import search_cache  # type: ignore
+    from utils.html_extractor import extract as extract_html  # type: ignore
+except ImportError:
+    search_cache = None  # type: ignore
+    extract_html = None  # type: ignore
+
+# Asenkron fallback paylaşılan fetch istemcisini (bağlantı havuzu, hız limiti, robots.txt) kullanır
+try:
+    from utils.page_fetcher import fetch_page  # type: ignore
+except ImportError:
+    fetch_page = None  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+# Google fallback'inde aynı anda indirilen sayfa sayısı
+FALLBACK_CONCURRENCY = 8
+# search_many ile aynı anda çalışan sorgu sayısı
+BATCH_CONCURRENCY = 4
+
+_FALLBACK_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (compatible; LocoDex-DeepSearch/1.0)',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': 'gzip, deflate',
+    'DNT': '1',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1'
+}
+_MAX_PAGE_BYTES = 10 * 1024 * 1024  # 10MB
+_MAX_RAW_CHARS = 50000  # 50KB
+
 
 @dataclass(frozen=True, kw_only=True)
 class SearchResult:
@@ -56,6 +91,19 @@ class SearchResults:
         return self.__str__(short=True)
 
 
+def _results_to_cache(results: "SearchResults") -> list[dict]:
+    return [asdict(result) for result in results.results]
+
+
+def _results_from_cache(items: list[dict]) -> "SearchResults":
+    return SearchResults(results=[SearchResult(**item) for item in items])
+
+
+def _cache_provider(provider: str, max_results: int, include_raw: bool) -> str:
+    # Farklı sonuç sayısı / raw içerik tercihleri ayrı girişler olarak tutulur
+    return f"{provider}:{max_results}:{int(include_raw)}"
+
+
 def extract_tavily_results(response) -> SearchResults:
     """Extract key information from Tavily search results."""
     results = []
@@ -78,70 +126,119 @@ class FallbackSearchError(RuntimeError):
     """Tavily ve Google bağımlılıkları olmadığında fırlatılır."""
 
 
+# requests.Session thread-safe değildir: her indirme thread'i kendi oturumunu tutar.
+# Thread'ler aramalar arasında yaşasın (bağlantılar yeniden kullanılsın) diye havuz da modül genelindedir.
+_thread_state = threading.local()
+_fallback_pool: Optional[ThreadPoolExecutor] = None
+_fallback_pool_lock = threading.Lock()
+
+
+def _get_http_session():
+    """Senkron fallback için çağıran thread'e ait, bağlantı havuzlu requests oturumu."""
+    session = getattr(_thread_state, "session", None)
+    if session is None:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=FALLBACK_CONCURRENCY, pool_maxsize=FALLBACK_CONCURRENCY)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers.update(_FALLBACK_HEADERS)
+        session.max_redirects = 3
+        _thread_state.session = session
+    return session
+
+
+def _get_fallback_pool() -> ThreadPoolExecutor:
+    """Senkron fallback'in sayfa indirme havuzu (en fazla FALLBACK_CONCURRENCY thread)."""
+    global _fallback_pool
+    with _fallback_pool_lock:
+        if _fallback_pool is None:
+            _fallback_pool = ThreadPoolExecutor(max_workers=FALLBACK_CONCURRENCY, thread_name_prefix="tavily-fallback")
+        return _fallback_pool
+
+
+def _page_result(url: str, title: str, text: str) -> SearchResult:
+    raw_content = text
+    # Content length limit
+    if len(raw_content) > _MAX_RAW_CHARS:
+        raw_content = raw_content[:_MAX_RAW_CHARS] + "...[truncated]"
+    content = (raw_content[:500] + "...") if len(raw_content) > 500 else raw_content
+    return SearchResult(title=title or url, link=url, content=content, raw_content=raw_content)
+
+
+def _fetch_fallback_page(url: str) -> Optional[SearchResult]:
+    """Tek sayfayı thread'in oturumuyla indirir ve çıkarır; başarısızsa None döner."""
+    try:
+        resp = _get_http_session().get(url, timeout=10, allow_redirects=True, stream=False, verify=True)
+        resp.raise_for_status()
+
+        # Content length validation
+        if len(resp.content) > _MAX_PAGE_BYTES:
+            raise Exception("Content too large")
+
+        # Content type validation
+        content_type = resp.headers.get('content-type', '').lower()
+        if not any(ct in content_type for ct in ['text/html', 'text/plain', 'application/xml']):
+            raise Exception("Invalid content type")
+
+        # Script, iframe, gömülü nesneler ve sayfa iskeleti atılır
+        page = extract_html(resp.text)
+        return _page_result(url, page.title, page.text)
+    except Exception as e:
+        # Log security-related errors but continue
+        logger.warning(f"Skipping URL {url}: {str(e)[:100]}")
+        return None
+
+
 def _google_fallback_search(query: str, max_results: int = 3, include_raw: bool = True) -> "SearchResults":
     """Tavily kullanılamadığında basit Google araması gerçekleştirir.
 
+    Sayfalar paylaşılan thread havuzunda, thread başına bir oturumla paralel indirilir (en fazla FALLBACK_CONCURRENCY).
     Gerekli paketler eksikse 'FallbackSearchError' fırlatır. Hiç sonuç dönmezse de aynı hata fırlatılır.
     """
 
-    if google_search is None or requests is None or BeautifulSoup is None:
+    if google_search is None or requests is None or extract_html is None:
         raise FallbackSearchError(
-            "Google tabanlı arama için gerekli bağımlılıklar yüklü değil (googlesearch-python, requests, beautifulsoup4)."
+            "Google tabanlı arama için gerekli bağımlılıklar yüklü değil (googlesearch-python, requests, utils.html_extractor)."
         )
 
-    results_list: list[SearchResult] = []
+    urls = list(google_search(query, num_results=max_results))
+
+    if include_raw and urls:
+        results_list = [result for result in _get_fallback_pool().map(_fetch_fallback_page, urls) if result is not None]
+    else:
+        results_list = [SearchResult(title=url, link=url, content="") for url in urls]
+
+    if not results_list:
+        raise FallbackSearchError("Google araması hiçbir sonuç döndürmedi veya tüm istekler başarısız oldu.")
+
+    return SearchResults(results=results_list)
 
-    for url in google_search(query, num_results=max_results):
-        try:
-            # İçeriği çek ve özetle
-            title = url
-            raw_content: Optional[str] = None
-            content = ""
-
-            if include_raw:
-                # Security headers and user agent
-                headers = {
-                    'User-Agent': 'Mozilla/5.0 (compatible; LocoDex-DeepSearch/1.0)',
-                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-                    'Accept-Language': 'en-US,en;q=0.5',
-                    'Accept-Encoding': 'gzip, deflate',
-                    'DNT': '1',
-                    'Connection': 'keep-alive',
-                    'Upgrade-Insecure-Requests': '1'
-                }
-                resp = requests.get(url, timeout=10, headers=headers, allow_redirects=True, 
-                                  max_redirects=3, stream=False, verify=True)
-                resp.raise_for_status()
-                
-                # Content length validation
-                if len(resp.content) > 10 * 1024 * 1024:  # 10MB limit
-                    raise Exception("Content too large")
-                
-                # Content type validation
-                content_type = resp.headers.get('content-type', '').lower()
-                if not any(ct in content_type for ct in ['text/html', 'text/plain', 'application/xml']):
-                    raise Exception("Invalid content type")
-                
-                soup = BeautifulSoup(resp.content, "html.parser")
-                
-                # Remove potentially dangerous elements
-                for tag in soup(["script", "style", "iframe", "object", "embed"]):
-                    tag.decompose()
-                
-                title = soup.title.string.strip() if soup.title and soup.title.string else url
-                raw_content = soup.get_text(separator="\n", strip=True)
-                
-                # Content length limit
-                if len(raw_content) > 50000:  # 50KB limit
-                    raw_content = raw_content[:50000] + "...[truncated]"
-                
-                content = (raw_content[:500] + "...") if len(raw_content) > 500 else raw_content
-
-            results_list.append(SearchResult(title=title, link=url, content=content, raw_content=raw_content))
-        except Exception as e:
-            # Log security-related errors but continue
-            print(f"Skipping URL {url}: {str(e)[:100]}")
-            continue
+
+async def _agoogle_fallback_search(query: str, max_results: int = 3, include_raw: bool = True) -> "SearchResults":
+    """Google fallback'inin asenkron sürümü: sayfalar paylaşılan fetch istemcisiyle eşzamanlı indirilir."""
+
+    loop = asyncio.get_running_loop()
+    if google_search is None or fetch_page is None or not include_raw:
+        # Paylaşılan istemci yoksa (src/ tek başına) senkron sürüm thread havuzunda çalışır
+        return await loop.run_in_executor(None, _google_fallback_search, query, max_results, include_raw)
+
+    urls = await loop.run_in_executor(None, lambda: list(google_search(query, num_results=max_results)))
+    semaphore = asyncio.Semaphore(FALLBACK_CONCURRENCY)
+
+    async def fetch(url: str) -> Optional[SearchResult]:
+        async with semaphore:
+            try:
+                # Önbellek, hız limiti, içerik türü ve boyut bütçesi (fetch_client varsayılanı) fetch_page içinde;
+                # HTML süreç havuzunda çıkarılır
+                page = await fetch_page(url, timeout=10)
+                if page is None:
+                    raise Exception("Non-200 response")
+                return _page_result(url, page.title, page.text)
+            except Exception as e:
+                logger.warning(f"Skipping URL {url}: {str(e)[:100]}")
+                return None
+
+    results_list = [result for result in await asyncio.gather(*(fetch(url) for url in urls)) if result is not None]
 
     if not results_list:
         raise FallbackSearchError("Google araması hiçbir sonuç döndürmedi veya tüm istekler başarısız oldu.")
@@ -152,6 +249,37 @@ def _google_fallback_search(query: str, max_results: int = 3, include_raw: bool
 # ------------------ Tavily araması (opsiyonel) -----------------------------
 
 
+# Tavily istemcileri her çağrıda yeniden oluşturulmaz; API anahtarı başına tek istemci
+_tavily_clients: dict = {}
+
+
+def _get_tavily_client(api_key: str, use_async: bool = False):
+    key = (api_key, use_async)
+    if key not in _tavily_clients:
+        _tavily_clients[key] = AsyncTavilyClient(api_key) if use_async else TavilyClient(api_key)
+    return _tavily_clients[key]
+
+
+def _get_cached(query: str, provider: str) -> Optional["SearchResults"]:
+    cached = search_cache.get(query, provider=provider, lang="any") if search_cache else None
+    return _results_from_cache(cached) if cached is not None else None
+
+
+def _set_cached(query: str, provider: str, results: "SearchResults") -> None:
+    if search_cache:
+        search_cache.set(query, _results_to_cache(results), provider=provider, lang="any")
+
+
+async def _aget_cached(query: str, provider: str) -> Optional["SearchResults"]:
+    cached = await search_cache.aget(query, provider=provider, lang="any") if search_cache else None
+    return _results_from_cache(cached) if cached is not None else None
+
+
+async def _aset_cached(query: str, provider: str, results: "SearchResults") -> None:
+    if search_cache:
+        await search_cache.aset(query, _results_to_cache(results), provider=provider, lang="any")
+
+
 def tavily_search(query: str, max_results: int = 3, include_raw: bool = True) -> "SearchResults":
     """Önce Tavily ardından Google fallback ile arama yapar."""
 
@@ -159,21 +287,32 @@ def tavily_search(query: str, max_results: int = 3, include_raw: bool = True) ->
 
     # Tavily tercihli
     if api_key and TavilyClient is not None:
+        provider = _cache_provider("tavily", max_results, include_raw)
+        cached = _get_cached(query, provider)
+        if cached is not None:
+            return cached
         try:
-            client = TavilyClient(api_key)
-            resp = client.search(
+            resp = _get_tavily_client(api_key).search(
                 query=query,
                 search_depth="basic",
                 max_results=max_results,
                 include_raw_content=include_raw,
             )
-            return extract_tavily_results(resp)
+            results = extract_tavily_results(resp)
+            _set_cached(query, provider, results)
+            return results
         except Exception:
             # Tavily başarısızsa Google'a geç
             pass
 
     # Fallback
-    return _google_fallback_search(query, max_results=max_results, include_raw=include_raw)
+    provider = _cache_provider("google-fallback", max_results, include_raw)
+    cached = _get_cached(query, provider)
+    if cached is not None:
+        return cached
+    results = _google_fallback_search(query, max_results=max_results, include_raw=include_raw)
+    _set_cached(query, provider, results)
+    return results
 
 
 async def atavily_search_results(query: str, max_results: int = 3, include_raw: bool = True) -> "SearchResults":
@@ -182,24 +321,55 @@ async def atavily_search_results(query: str, max_results: int = 3, include_raw:
     api_key = os.getenv("TAVILY_API_KEY")
 
     if api_key and AsyncTavilyClient is not None:
+        provider = _cache_provider("tavily", max_results, include_raw)
+        cached = await _aget_cached(query, provider)
+        if cached is not None:
+            return cached
         try:
-            client = AsyncTavilyClient(api_key)
-            resp = await client.search(
+            resp = await _get_tavily_client(api_key, use_async=True).search(
                 query=query,
                 search_depth="basic",
                 max_results=max_results,
                 include_raw_content=include_raw,
             )
-            return extract_tavily_results(resp)
+            results = extract_tavily_results(resp)
+            await _aset_cached(query, provider, results)
+            return results
         except Exception:
             # Tavily'de hata olursa fallback'e geç
             pass
 
-    # Senkron fallback'i çalıştır (bloklayıcı olabilir; küçük istekler için yeterli)
-    loop = asyncio.get_running_loop()
-    return await loop.run_in_executor(
-        None, _google_fallback_search, query, max_results, include_raw
-    )
+    provider = _cache_provider("google-fallback", max_results, include_raw)
+    cached = await _aget_cached(query, provider)
+    if cached is not None:
+        return cached
+
+    results = await _agoogle_fallback_search(query, max_results=max_results, include_raw=include_raw)
+    await _aset_cached(query, provider, results)
+    return results
+
+
+async def atavily_search_many(
+    queries: list[str], max_results: int = 3, include_raw: bool = True, concurrency: int = BATCH_CONCURRENCY
+) -> dict[str, "SearchResults"]:
+    """Birden çok sorguyu tek çağrıda, en fazla *concurrency* tanesi aynı anda olacak şekilde arar.
+
+    Sonuç bulunamayan sorgular boş SearchResults ile döner.
+    """
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(query: str) -> "SearchResults":
+        async with semaphore:
+            try:
+                return await atavily_search_results(query, max_results=max_results, include_raw=include_raw)
+            except FallbackSearchError as e:
+                logger.warning(f"No results for query {query!r}: {e}")
+                return SearchResults(results=[])
+
+    unique_queries = list(dict.fromkeys(queries))
+    results = await asyncio.gather(*(run(query) for query in unique_queries))
+    return dict(zip(unique_queries, results))
 
 
 if __name__ == "__main__":
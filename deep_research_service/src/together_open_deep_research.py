@@ -1,30 +1,41 @@
 import asyncio
-import hashlib
 import json
 import os
-import pickle
 import re
-from contextlib import contextmanager
+from dataclasses import replace
 from pathlib import Path
 from typing import Callable, List
 
 import yaml
 from dotenv import load_dotenv
-from filelock import FileLock
-from libs.utils.data_types import DeepResearchResult, DeepResearchResults, ResearchPlan, SourceList, UserCommunication
+from libs.utils.data_types import (
+    DeepResearchResult,
+    DeepResearchResults,
+    ResearchEvaluation,
+    ResearchPlan,
+    SourceList,
+    UserCommunication,
+)
 from libs.utils.generation import generate_pdf, save_and_generate_html
 from libs.utils.llms import asingle_shot_llm_call
 from libs.utils.log import AgentLogger
 from libs.utils.podcast import generate_podcast_audio, generate_podcast_script, get_base64_audio, save_podcast_to_disk
+from libs.utils.research_digest import ResearchDigest
+from libs.utils.result_store import ResultStore
 
-# Additional dependencies for search and parsing
-import requests
-from bs4 import BeautifulSoup
+# Additional dependencies for search
 from googlesearch import search
 
+# Shared service utilities; the service root (parent of src/) must be on the path, as it is for server.py
+from utils.dedup import canonicalize_url
+from utils.page_fetcher import fetch_page
+from utils.search_cache import search_cache
+
 logging = AgentLogger("together.open_deep_research")
 
 TIME_LIMIT_MULTIPLIER = 5
+# Page text beyond this is not sent to the summarizer
+MAX_SUMMARY_INPUT_CHARS = 30000
 
 
 class DeepResearcher:
@@ -46,6 +57,11 @@ class DeepResearcher:
         use_cache: bool = False,
         observer: Callable | None = None,
         model: str | None = None, # Add model parameter
+        filter_batch_size: int = 10,
+        max_concurrent_filters: int = 4,
+        max_concurrent_summaries: int = 8,
+        max_concurrent_fetches: int = 16,
+        max_fetches_per_query: int = 5,
     ):
         self.budget = budget
         self.current_spending = 0
@@ -55,6 +71,23 @@ class DeepResearcher:
         self.max_completion_tokens = max_completion_tokens
         self.user_timeout = user_timeout
         self.interactive = interactive
+        # filter_results ranks results in batches of this size, at most this many at a time
+        self.filter_batch_size = filter_batch_size
+        self.max_concurrent_filters = max_concurrent_filters
+        # summarize_results runs at most this many summarization calls at a time
+        self.max_concurrent_summaries = max_concurrent_summaries
+        # Summaries by (URL, content hash, topic); persisted in the result store when caching is on
+        self._summaries: dict[str, str] = {}
+        # Pages fetched during the current run by canonical URL (None: fetch failed), so a URL
+        # returned by several queries or iterations is downloaded and parsed only once
+        self._seen_pages: dict[str, DeepResearchResult | None] = {}
+        # Fetches in flight by canonical URL; a second query asking for the same page awaits the first fetch
+        self._pending_pages: dict[str, asyncio.Task] = {}
+        # Page downloads across all parallel queries (semaphore created on the running loop), and per query
+        self.max_concurrent_fetches = max_concurrent_fetches
+        self._fetch_semaphore: asyncio.Semaphore | None = None
+        self._fetch_loop: asyncio.AbstractEventLoop | None = None
+        self.max_fetches_per_query = max_fetches_per_query
 
         if model:
             self.planning_model = model
@@ -78,9 +111,7 @@ class DeepResearcher:
         if self.use_cache:
             self.cache_dir = Path(cache_dir) if cache_dir else Path.home() / ".open_deep_research_cache"
             self.cache_dir.mkdir(parents=True, exist_ok=True)
-            # Create a locks directory for the file locks
-            self.locks_dir = self.cache_dir / ".locks"
-            self.locks_dir.mkdir(parents=True, exist_ok=True)
+            self.result_store = ResultStore(self.cache_dir / "search_results.db")
 
         with open(os.path.join(os.path.dirname(__file__), "prompts.yaml"), "r") as f:
             self.prompts = yaml.safe_load(f)
@@ -91,6 +122,8 @@ class DeepResearcher:
         """Main method to conduct research on a topic"""
 
         self.observer(0, "Starting research")
+        self._seen_pages = {}
+        self._pending_pages = {}
 
         # Step 0: Clarify the research topic
         if self.interactive:
@@ -121,6 +154,10 @@ class DeepResearcher:
         self.observer(0.3, "Initial search complete")
 
         # Step 3: Conduct iterative research within budget
+        # The evaluator sees a compressed digest of earlier results plus only the new ones,
+        # so its prompt does not grow with every iteration
+        digest = ResearchDigest()
+        new_results = results
         total_iterations = self.budget - self.current_spending
         for iteration in range(self.current_spending, self.budget):
             current_iteration = iteration - self.current_spending + 1
@@ -128,7 +165,7 @@ class DeepResearcher:
             self.observer(progress, f"Conducting research iteration {current_iteration}/{total_iterations}")
 
             # Evaluate if more research is needed
-            additional_queries = await self.evaluate_research_completeness(clarified_topic, results, all_queries)
+            additional_queries = await self.evaluate_research_completeness(clarified_topic, new_results, all_queries, digest)
 
             # Filter out empty strings and check if any queries remain
             additional_queries = [q for q in additional_queries if q]
@@ -155,15 +192,25 @@ class DeepResearcher:
         logging.info(f"Generating final answer for topic: {clarified_topic}")
         results = results.dedup()
         logging.info(f"Deduplication complete, kept {len(results.results)} results")
+        # Filtering ranks page prefixes; only the kept sources are summarized
         filtered_results, sources = await self.filter_results(clarified_topic, results)
         logging.info(f"LLM Filtering complete, kept {len(filtered_results.results)} results")
-        self.observer(0.8, f"Results filtered: kept {len(filtered_results.results)} sources")
+        self.observer(0.75, f"Results filtered: kept {len(filtered_results.results)} sources")
+        self.observer(0.8, f"Summarizing {len(filtered_results.results)} sources")
+        filtered_results = await self.summarize_results(clarified_topic, filtered_results)
 
         if self.debug_file_path:
             with open(self.debug_file_path, "w") as f:
                 f.write(f"{results}\n\n\n\n{filtered_results}")
                 logging.info(f"Debug file (web search results and sources) saved to {self.debug_file_path}")
 
+        if self.use_cache:
+            # Access times buffered by this run's cache reads
+            try:
+                await asyncio.get_running_loop().run_in_executor(None, self.result_store.flush)
+            except Exception as e:
+                logging.warning(f"Failed to flush result store access times: {e}")
+
         # Generate final answer
         self.observer(0.9, "Generating final research report")
         while True:
@@ -256,73 +303,44 @@ class DeepResearcher:
 
         return plan["queries"]
 
-    def _get_cache_path(self, query: str) -> Path:
-        """Generate a cache file path for a given query using its hash"""
-        query_hash = hashlib.md5(query.encode()).hexdigest()
-        return self.cache_dir / f"tavily_{query_hash}.pkl"
-
-    def _get_lock_path(self, cache_path: Path) -> Path:
-        """Generate a lock file path for a given cache file"""
-        return self.locks_dir / f"{cache_path.name}.lock"
-
-    @contextmanager
-    def _cache_lock(self, query: str):
-        """Context manager for thread-safe cache operations"""
-        cache_path = self._get_cache_path(query)
-        lock_path = self._get_lock_path(cache_path)
-        lock = FileLock(str(lock_path))
-        try:
-            with lock:
-                yield cache_path
-        finally:
-            # Clean up lock file if it's stale
-            if lock_path.exists() and not lock.is_locked:
-                try:
-                    lock_path.unlink()
-                except FileNotFoundError:
-                    pass
-
-    def _save_to_cache(self, query: str, results: DeepResearchResults):
-        """Save search results to cache in a thread-safe manner"""
+    async def _save_to_cache(self, query: str, results: DeepResearchResults):
+        """Save search results to the result store (SQLite runs in the default executor)"""
         if not self.use_cache:
             return
 
-        with self._cache_lock(query) as cache_path:
-            with open(cache_path, "wb") as f:
-                pickle.dump(results, f)
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, self.result_store.set, query, results)
+        except Exception as e:
+            logging.warning(f"Failed to save cache for query '{query}': {e}")
 
-    def _load_from_cache(self, query: str) -> DeepResearchResults | None:
-        """Load search results from cache if they exist in a thread-safe manner"""
+    async def _load_many_from_cache(self, queries: List[str]) -> dict[str, DeepResearchResults]:
+        """Load cached search results for all queries in a single lookup (in the default executor)"""
         if not self.use_cache:
-            return None
+            return {}
 
         try:
-            with self._cache_lock(query) as cache_path:
-                if cache_path.exists():
-                    with open(cache_path, "rb") as f:
-                        return pickle.load(f)
+            return await asyncio.get_running_loop().run_in_executor(None, self.result_store.get_many, queries)
         except Exception as e:
-            logging.warning(f"Failed to load cache for query '{query}': {e}")
-        return None
+            logging.warning(f"Failed to load cache for queries {queries}: {e}")
+        return {}
 
     async def search_all_queries(self, queries: List[str]) -> DeepResearchResults:
-        """Execute searches for all queries in parallel, using thread-safe cache"""
-        tasks = []
-        cached_results = []
+        """Execute searches for all queries in parallel, using the result store"""
+        cached = await self._load_many_from_cache(queries)
         results_list = []
+        tasks = []
 
         for query in queries:
-            # Try to load from cache first if caching is enabled
-            cached_result = self._load_from_cache(query)
-            if cached_result is not None:
+            if query in cached:
                 logging.info(f"Using cached results for query: {query}")
-                cached_results.append(cached_result)
+                results_list.append(cached[query])
+                # Pages of cached queries are not fetched again by live ones
+                for result in cached[query].results:
+                    self._seen_pages.setdefault(canonicalize_url(result.link), result)
             else:
                 # If not in cache, create search task
                 tasks.append(self._search_and_cache(query))
 
-        results_list.extend(cached_results)
-
         # Execute remaining searches in parallel
         if tasks:
             res_list = await asyncio.gather(*tasks)
@@ -338,7 +356,7 @@ class DeepResearcher:
     async def _search_and_cache(self, query: str) -> DeepResearchResults:
         """Perform a search and cache the results"""
         results = await self._search_engine_call(query)
-        self._save_to_cache(query, results)
+        await self._save_to_cache(query, results)
         return results
 
     async def _search_engine_call(self, query: str) -> DeepResearchResults:
@@ -354,46 +372,92 @@ class DeepResearcher:
         except Exception:
             pass
 
-        search_results = search(query, num_results=10)
+        search_results = await search_cache.aget(query, provider="google", lang="en", max_results=10)
+        if search_results is None:
+            # googlesearch is blocking; run it in the default executor so parallel queries overlap
+            loop = asyncio.get_running_loop()
+            search_results = await loop.run_in_executor(None, lambda: list(search(query, num_results=10)))
+            logging.info("Google Search Called.")
+            await search_cache.aset(query, search_results, provider="google", lang="en", max_results=10)
+        else:
+            logging.info(f"Using cached Google results for query: {query}")
 
-        logging.info("Google Search Called.")
+        # Pages are fetched concurrently: at most max_fetches_per_query for this query and
+        # max_concurrent_fetches across all queries searched in parallel
+        query_semaphore = asyncio.Semaphore(self.max_fetches_per_query)
 
-        formatted_results = []
-        for url in search_results:
-            # Her URL denemesi öncesi bildir
-            try:
-                self.observer("browse", f"🌐 Site ziyaret ediliyor: {url}")
-            except Exception:
-                pass
+        async def fetch_bounded(url: str) -> DeepResearchResult | None:
+            async with query_semaphore:
+                return await self._fetch_result(url)
 
-            try:
-                response = requests.get(url, timeout=5)
-                soup = BeautifulSoup(response.content, 'html.parser')
-                title = soup.title.string if soup.title else "No Title Found"
-                # A simple way to get text, can be improved
-                raw_content = soup.get_text(separator='\n', strip=True)
-
-                # Summarization logic would go here. For now, we use a snippet.
-                content_snippet = (raw_content[:500] + '...') if len(raw_content) > 500 else raw_content
-
-                formatted_results.append(
-                    DeepResearchResult(
-                        title=title,
-                        link=url,
-                        content=content_snippet,
-                        raw_content=raw_content,
-                        filtered_raw_content=content_snippet, # Placeholder
-                    )
-                )
-            except Exception as e:
-                logging.warning(f"Failed to fetch or parse {url}: {e}")
-                try:
-                    self.observer("error", f"⚠️  Hata: {url} -> {e}")
-                except Exception:
-                    pass
+        fetched = await asyncio.gather(*(fetch_bounded(url) for url in search_results))
+        formatted_results = [result for result in fetched if result is not None]
 
         return DeepResearchResults(results=formatted_results)
 
+    async def _fetch_result(self, url: str) -> DeepResearchResult | None:
+        """Fetch and parse *url* once per run; returns None when the page could not be fetched"""
+        # Bu çalıştırmada zaten indirilen (veya indirilemeyen) sayfa tekrar indirilmez
+        canonical = canonicalize_url(url)
+        if canonical in self._seen_pages:
+            logging.info(f"Reusing already fetched page: {url}")
+            return self._seen_pages[canonical]
+        if canonical in self._pending_pages:
+            logging.info(f"Waiting for page fetched by another query: {url}")
+            return await asyncio.shield(self._pending_pages[canonical])
+
+        task = asyncio.ensure_future(self._download_result(url))
+        self._pending_pages[canonical] = task
+        try:
+            result = await asyncio.shield(task)
+        finally:
+            self._pending_pages.pop(canonical, None)
+        self._seen_pages[canonical] = result
+        return result
+
+    def _get_fetch_semaphore(self) -> asyncio.Semaphore:
+        # A semaphore is bound to the loop it is first used on
+        loop = asyncio.get_running_loop()
+        if self._fetch_semaphore is None or self._fetch_loop is not loop:
+            self._fetch_semaphore = asyncio.Semaphore(self.max_concurrent_fetches)
+            self._fetch_loop = loop
+        return self._fetch_semaphore
+
+    async def _download_result(self, url: str) -> DeepResearchResult | None:
+        # Her URL denemesi öncesi bildir
+        try:
+            self.observer("browse", f"🌐 Site ziyaret ediliyor: {url}")
+        except Exception:
+            pass
+
+        try:
+            async with self._get_fetch_semaphore():
+                # Shared fetch client (rate limits, robots.txt) and page cache; parsing runs in the parse pool
+                page = await fetch_page(url, timeout=5)
+            if page is None:
+                raise ValueError("non-200 response")
+
+            title = page.title or "No Title Found"
+            raw_content = page.text
+
+            # Until summarize_results replaces it, the refined content is the page prefix
+            content_snippet = (raw_content[:500] + '...') if len(raw_content) > 500 else raw_content
+
+            return DeepResearchResult(
+                title=title,
+                link=url,
+                content=content_snippet,
+                raw_content=raw_content,
+                filtered_raw_content=content_snippet, # Placeholder
+            )
+        except Exception as e:
+            logging.warning(f"Failed to fetch or parse {url}: {e}")
+            try:
+                self.observer("error", f"⚠️  Hata: {url} -> {e}")
+            except Exception:
+                pass
+            return None
+
     async def _summarize_content_async(self, raw_content: str, query: str, prompt: str) -> str:
         """Summarize content asynchronously using the LLM"""
         logging.info("Summarizing content asynchronously using the LLM")
@@ -406,24 +470,90 @@ class DeepResearcher:
 
         return result
 
-    async def evaluate_research_completeness(self, topic: str, results: DeepResearchResults, queries: List[str]) -> list[str]:
+    async def summarize_results(self, topic: str, results: DeepResearchResults) -> DeepResearchResults:
+        """
+        Replace each result's filtered_raw_content (a page prefix) with an LLM summary of the page for the topic.
+        Summaries run concurrently, bounded by max_concurrent_summaries, and are cached per (URL, content hash, topic).
+        """
+        inputs = [(result, (result.raw_content or "")[:MAX_SUMMARY_INPUT_CHARS]) for result in results.results]
+        keys = [ResultStore.summary_key(result.link, raw_content, topic) for result, raw_content in inputs]
+
+        loop = asyncio.get_running_loop()
+        missing = [key for key in keys if key not in self._summaries]
+        if missing and self.use_cache:
+            try:
+                self._summaries.update(await loop.run_in_executor(None, self.result_store.get_summaries, missing))
+            except Exception as e:
+                logging.warning(f"Failed to load cached summaries: {e}")
+
+        semaphore = asyncio.Semaphore(self.max_concurrent_summaries)
+        summarized = 0
+
+        async def summarize(result: DeepResearchResult, raw_content: str, key: str) -> DeepResearchResult:
+            nonlocal summarized
+            if not raw_content:
+                return result
+            if key not in self._summaries:
+                async with semaphore:
+                    try:
+                        summary = await self._summarize_content_async(
+                            raw_content, topic, self.prompts["raw_content_summarizer_prompt"]
+                        )
+                    except Exception as e:
+                        # Without a summary the page prefix stays in place
+                        logging.warning(f"Failed to summarize {result.link}: {e}")
+                        return result
+                if not summary:
+                    return result
+                summarized += 1
+                self._summaries[key] = summary
+                if self.use_cache:
+                    try:
+                        await loop.run_in_executor(None, self.result_store.set_summary, key, result.link, summary)
+                    except Exception as e:
+                        logging.warning(f"Failed to cache summary for {result.link}: {e}")
+            return replace(result, filtered_raw_content=self._summaries[key])
+
+        summarized_results = await asyncio.gather(
+            *(summarize(result, raw_content, key) for (result, raw_content), key in zip(inputs, keys))
+        )
+        logging.info(f"Summarized {summarized} sources, {len(keys) - summarized} from cache or skipped")
+        return DeepResearchResults(results=list(summarized_results))
+
+    async def evaluate_research_completeness(
+        self, topic: str, results: DeepResearchResults, queries: List[str], digest: ResearchDigest | None = None
+    ) -> list[str]:
         """
         Evaluate if the current search results are sufficient or if more research is needed.
         Returns an empty list if research is complete, or a list of additional queries if more research is needed.
+
+        With a digest, *results* are only the results found since the last evaluation; earlier ones are
+        represented by the digest, which is updated with the new results afterwards.
         """
 
-        # Format the search results for the LLM
-        formatted_results = str(results)
         EVALUATION_PROMPT = self.prompts["evaluation_prompt"]
 
+        if digest is None:
+            # Format the search results for the LLM
+            message = (
+                f"<Research Topic>{topic}</Research Topic>\n\n"
+                f"<Search Queries Used>{queries}</Search Queries Used>\n\n"
+                f"<Current Search Results>{results}</Current Search Results>"
+            )
+        else:
+            results = digest.new_results(results)
+            message = (
+                f"<Research Topic>{topic}</Research Topic>\n\n"
+                f"<Search Queries Used>{queries}</Search Queries Used>\n\n"
+                f"<Research Digest>{digest}</Research Digest>\n\n"
+                f"<New Search Results>{results}</New Search Results>"
+            )
+        logging.info(f"Evaluation prompt size: {len(message)} characters")
+
         evaluation = await asingle_shot_llm_call(
             model=self.planning_model,
             system_prompt=EVALUATION_PROMPT,
-            message=(
-                f"<Research Topic>{topic}</Research Topic>\n\n"
-                f"<Search Queries Used>{queries}</Search Queries Used>\n\n"
-                f"<Current Search Results>{formatted_results}</Current Search Results>"
-            ),
+            message=message,
         )
 
         logging.info(f"Evaluation: {evaluation}")
@@ -434,14 +564,89 @@ class DeepResearcher:
             model=self.json_model,
             system_prompt=EVALUATION_PARSING_PROMPT,
             message=f"Evaluation to be parsed: {evaluation}",
-            response_format={"type": "json_object", "schema": ResearchPlan.model_json_schema()},
+            response_format={"type": "json_object", "schema": ResearchEvaluation.model_json_schema()},
         )
 
         evaluation = json.loads(response_json)
+
+        if digest is not None:
+            digest.add_results(results)
+            digest.add_subtopics(evaluation.get("covered_subtopics", []))
+
         return evaluation["queries"]
 
     async def filter_results(self, topic: str, results: DeepResearchResults) -> tuple[DeepResearchResults, SourceList]:
-        """Filter the search results based on the research plan"""
+        """Filter the search results based on the research plan
+
+        Results are filtered in batches of ``filter_batch_size`` in parallel (map); each batch is numbered
+        from 1 for its own prompt and the kept numbers are mapped back to global ones. The survivors of all
+        batches are then ranked against each other in one more call (reduce), so the final order is a global
+        ranking rather than a merge of per-batch ones. ``sources`` holds the 1-based positions in *results*
+        of the returned results, in the same order.
+        """
+
+        batches = [
+            results.results[start : start + self.filter_batch_size]
+            for start in range(0, len(results.results), self.filter_batch_size)
+        ]
+        semaphore = asyncio.Semaphore(self.max_concurrent_filters)
+
+        async def filter_batch(offset: int, batch: list[DeepResearchResult]) -> list[int]:
+            async with semaphore:
+                try:
+                    kept = await self._filter_batch(topic, DeepResearchResults(results=batch))
+                except Exception as e:
+                    # A failed batch keeps its results in their original order rather than losing them
+                    logging.warning(f"Filtering batch at {offset + 1} failed, keeping it unranked: {e}")
+                    kept = list(range(1, len(batch) + 1))
+            return [offset + number for number in kept]
+
+        rankings = await asyncio.gather(
+            *(filter_batch(index * self.filter_batch_size, batch) for index, batch in enumerate(batches))
+        )
+        logging.info(f"Filtered {len(results.results)} results in {len(batches)} batches")
+
+        # Round-robin merge: first-ranked result of every batch, then the second-ranked ones, ...
+        sources = [
+            ranking[rank]
+            for rank in range(max((len(ranking) for ranking in rankings), default=0))
+            for ranking in rankings
+            if rank < len(ranking)
+        ]
+
+        if len(batches) > 1 and len(sources) > 1:
+            sources = await self._rerank_survivors(topic, results, sources)
+
+        logging.info(f"Filtered sources: {sources}")
+
+        if self.max_sources != -1:
+            sources = sources[: self.max_sources]
+
+        # Filter the results based on the source list
+        filtered_results = [results.results[i - 1] for i in sources]
+
+        return DeepResearchResults(results=filtered_results), sources
+
+    async def _rerank_survivors(self, topic: str, results: DeepResearchResults, sources: list[int]) -> list[int]:
+        """Rank the batch survivors against each other; returns the same global numbers, best first
+
+        The batches have already dropped the irrelevant results, so survivors the reduce call leaves out are
+        kept after the ranked ones instead of being dropped a second time. If the call fails the round-robin
+        order in *sources* is kept.
+        """
+
+        survivors = DeepResearchResults(results=[results.results[i - 1] for i in sources])
+        try:
+            ranked = await self._filter_batch(topic, survivors)
+        except Exception as e:
+            logging.warning(f"Global re-ranking of {len(sources)} filtered results failed, keeping batch order: {e}")
+            return sources
+
+        reranked = [sources[number - 1] for number in ranked]
+        return reranked + [i for i in sources if i not in reranked]
+
+    async def _filter_batch(self, topic: str, results: DeepResearchResults) -> list[int]:
+        """Rank one batch of results; returns the kept 1-based numbers within the batch, best first"""
 
         # Format the search results for the LLM, without the raw content
         formatted_results = str(results)
@@ -470,17 +675,12 @@ class DeepResearcher:
             response_format={"type": "json_object", "schema": SourceList.model_json_schema()},
         )
 
-        sources = json.loads(response_json)["sources"]
-
-        logging.info(f"Filtered sources: {sources}")
-
-        if self.max_sources != -1:
-            sources = sources[: self.max_sources]
-
-        # Filter the results based on the source list
-        filtered_results = [results.results[i - 1] for i in sources if i - 1 < len(results.results)]
-
-        return DeepResearchResults(results=filtered_results), sources
+        # Numbers outside the batch or repeated by the model are dropped
+        kept = []
+        for number in json.loads(response_json)["sources"]:
+            if 1 <= number <= len(results.results) and number not in kept:
+                kept.append(number)
+        return kept
 
     async def generate_research_answer(self, topic: str, results: DeepResearchResults, remove_thinking_tags: bool = False):
         """
@@ -1,10 +1,15 @@
 import os
+import sys
 
 import gradio as gr
 
 from libs.utils.generation import generate_html
 from libs.utils.llms import generate_toc_image
 from libs.utils.podcast import full_podcast_generation
+
+# Shared service utilities (utils/) live in the service root, one level above src/
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 from together_open_deep_research import DeepResearcher
 
 
@@ -0,0 +1,30 @@
+import os
+import sys
+
+import pytest
+
+from utils import embeddings
+from utils.domain_reputation import domain_reputation
+from utils.http_cache import http_cache
+from utils.rate_limiter import rate_limiter
+from utils.search_cache import search_cache
+
+# Modules under src/ are imported the same way server.py does it
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+
+@pytest.fixture(autouse=True)
+def isolated_databases(tmp_path, monkeypatch):
+    """Point the module-level singletons at throwaway databases under *tmp_path*."""
+    monkeypatch.setattr(http_cache, "db_path", str(tmp_path / "http_cache.db"))
+    monkeypatch.setattr(http_cache, "_initialised", False)
+    monkeypatch.setattr(http_cache, "_total_bytes", 0)
+    monkeypatch.setattr(http_cache, "_pending_access", {})
+    monkeypatch.setattr(rate_limiter, "db_path", str(tmp_path / "rate_limits.db"))
+    monkeypatch.setattr(rate_limiter, "_loaded", False)
+    monkeypatch.setattr(search_cache, "db_path", str(tmp_path / "search_cache.db"))
+    monkeypatch.setattr(search_cache, "_initialised", False)
+    monkeypatch.setattr(embeddings, "_DEFAULT_DB_PATH", str(tmp_path / "embeddings.db"))
+    monkeypatch.setattr(embeddings, "_services", {})
+    monkeypatch.setattr(domain_reputation, "db_path", str(tmp_path / "domain_reputation.db"))
+    monkeypatch.setattr(domain_reputation, "_initialised", False)
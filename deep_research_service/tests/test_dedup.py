@@ -0,0 +1,32 @@
+import random
+
+from utils.dedup import NearDuplicateIndex, canonicalize_url, hamming_distance, simhash
+
+
+def test_tracking_parameters_are_dropped():
+    assert canonicalize_url("http://www.example.com/a/?utm_source=x&fbclid=1&b=2#top") == "https://example.com/a?b=2"
+
+
+def test_content_parameters_are_kept():
+    assert canonicalize_url("https://github.com/o/r/blob/main/x?ref=v1.2").endswith("?ref=v1.2")
+    assert canonicalize_url("https://example.com/post?share=1") != canonicalize_url("https://example.com/post")
+
+
+def test_amp_suffix_only_removed_when_a_path_remains():
+    assert canonicalize_url("https://example.com/news/story/amp/") == "https://example.com/news/story"
+    assert canonicalize_url("https://example.com/a.amp.html") == "https://example.com/a.html"
+    assert canonicalize_url("https://example.com/amp") == "https://example.com/amp"
+
+
+def test_near_duplicate_texts():
+    rng = random.Random(0)
+    words = [f"w{rng.randint(0, 3000)}" for _ in range(3000)]
+    edited = list(words)
+    edited[1500] = "changed"
+    other = [f"w{rng.randint(0, 3000)}" for _ in range(3000)]
+
+    assert hamming_distance(simhash(" ".join(words)), simhash(" ".join(edited))) <= 6
+    index = NearDuplicateIndex()
+    assert not index.add("a", " ".join(words))
+    assert index.add("b", " ".join(edited))
+    assert not index.add("c", " ".join(other))
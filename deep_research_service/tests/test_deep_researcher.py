@@ -0,0 +1,83 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("litellm")
+pytest.importorskip("googlesearch")
+
+from libs.utils.data_types import DeepResearchResult, DeepResearchResults  # noqa: E402
+from together_open_deep_research import DeepResearcher  # noqa: E402
+
+
+def result(relevance: int) -> DeepResearchResult:
+    return DeepResearchResult(
+        title=f"r{relevance}",
+        link=f"https://{relevance}.example/",
+        content="",
+        filtered_raw_content="",
+    )
+
+
+def test_filter_results_ranks_batch_survivors_globally():
+    # Each batch drops its least relevant result; every call ranks what it gets by relevance
+    async def fake_filter_batch(topic, results):
+        ranked = sorted(range(1, len(results.results) + 1), key=lambda n: -int(results.results[n - 1].title[1:]))
+        return ranked if len(results.results) > 3 else ranked[:-1]
+
+    researcher = DeepResearcher(filter_batch_size=3, max_sources=4)
+    researcher._filter_batch = fake_filter_batch
+    relevances = [1, 2, 3, 10, 11, 12, 20, 21, 22]
+    results = DeepResearchResults(results=[result(r) for r in relevances])
+
+    filtered, sources = asyncio.run(researcher.filter_results("topic", results))
+
+    assert [r.title for r in filtered.results] == ["r22", "r21", "r12", "r11"]
+    assert [results.results[i - 1] for i in sources] == filtered.results
+
+
+def test_fetch_semaphore_follows_the_running_loop():
+    researcher = DeepResearcher(max_concurrent_fetches=1)
+
+    async def contend():
+        async def hold():
+            async with researcher._get_fetch_semaphore():
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(hold(), hold())
+        return researcher._get_fetch_semaphore()
+
+    # A semaphore with waiters cannot be shared across loops; each run gets its own
+    first = asyncio.run(contend())
+    second = asyncio.run(contend())
+    assert first is not second
+
+
+def test_summaries_are_cached_across_runs(tmp_path):
+    calls = []
+
+    async def fake_summarize(raw_content, topic, prompt):
+        calls.append(raw_content)
+        return f"summary of {raw_content}"
+
+    def researcher():
+        deep = DeepResearcher(use_cache=True, cache_dir=str(tmp_path))
+        deep._summarize_content_async = fake_summarize
+        return deep
+
+    pages = DeepResearchResults(
+        results=[
+            DeepResearchResult(title="a", link="https://a.example/", content="", raw_content="page a",
+                               filtered_raw_content="page a"),
+            DeepResearchResult(title="b", link="https://b.example/", content="", raw_content="page b",
+                               filtered_raw_content="page b"),
+        ]
+    )
+
+    first = asyncio.run(researcher().summarize_results("topic", pages))
+    # A new researcher reads the summaries from the result store; another topic is summarised again
+    second = asyncio.run(researcher().summarize_results("topic", pages))
+    asyncio.run(researcher().summarize_results("other topic", pages))
+
+    assert [r.filtered_raw_content for r in first.results] == ["summary of page a", "summary of page b"]
+    assert second == first
+    assert sorted(calls) == ["page a", "page a", "page b", "page b"]
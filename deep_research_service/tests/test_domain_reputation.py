@@ -0,0 +1,22 @@
+import asyncio
+import os
+
+from utils.domain_reputation import DomainReputation
+
+
+def test_blog_hosts_are_not_scored_by_prefix():
+    index = DomainReputation.from_file()
+    assert index.lookup("blog.example.com") is None
+    assert index.lookup("blog.google.com").tier == "medium"
+
+
+def test_only_the_score_is_cached_in_a_database_created_on_first_use(tmp_path):
+    db_path = tmp_path / "scores.db"
+    index = DomainReputation.from_file(db_path=str(db_path))
+    assert not os.path.exists(db_path)
+
+    async def round_trip():
+        await index.aset_llm_score("Example.com", 70)
+        return await index.aget_llm_score("example.com"), await index.aget_llm_score("other.com")
+
+    assert asyncio.run(round_trip()) == (70, None)
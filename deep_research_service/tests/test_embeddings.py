@@ -0,0 +1,26 @@
+import asyncio
+import os
+
+import numpy as np
+
+from utils.embeddings import EmbeddingService
+
+
+def test_vectors_are_cached_in_a_database_created_on_first_use(tmp_path):
+    db_path = tmp_path / "embeddings.db"
+    service = EmbeddingService(db_path=str(db_path))
+    assert not os.path.exists(db_path)
+
+    requested = []
+
+    async def fake_request(session, texts):
+        requested.extend(texts)
+        return [[float(len(text)), 1.0] for text in texts]
+
+    service._request = fake_request
+    first = asyncio.run(service.embed(["bora", "bora bora"]))
+    second = asyncio.run(service.embed(["bora bora", "bora"]))
+
+    assert requested == ["bora", "bora bora"]
+    assert os.path.exists(db_path)
+    np.testing.assert_allclose(second, first[::-1], atol=1e-3)
@@ -0,0 +1,75 @@
+import asyncio
+
+from aiohttp import web
+
+from utils.fetch_client import FetchClient
+
+PAGE = b"<html><body>" + b"x" * 200_000 + b"</body></html>"
+
+
+async def page(request):
+    return web.Response(body=PAGE, content_type="text/html")
+
+
+async def missing(request):
+    return web.Response(status=404, body=b"not here", content_type="text/html")
+
+
+async def serve():
+    app = web.Application()
+    app.router.add_get("/", page)
+    app.router.add_get("/missing", missing)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+def test_body_stops_at_the_byte_budget():
+    client = FetchClient()
+
+    async def fetch_all():
+        runner, base = await serve()
+        try:
+            capped = await client.fetch(f"{base}/", rate_limit=False, max_bytes=50_000)
+            full = await client.fetch(f"{base}/", rate_limit=False, max_bytes=len(PAGE))
+            not_found = await client.fetch(f"{base}/missing", rate_limit=False)
+            return capped, full, not_found
+        finally:
+            await client.close()
+            await runner.cleanup()
+
+    capped, full, not_found = asyncio.run(fetch_all())
+    assert capped.ok and capped.truncated and capped.body == PAGE[:50_000]
+    assert full.body == PAGE and not full.truncated
+    assert not_found.status == 404 and not_found.body == b""
+
+
+def test_one_session_per_loop_reused_until_closed():
+    client = FetchClient()
+
+    async def sessions_of_one_run():
+        runner, base = await serve()
+        try:
+            await client.fetch(f"{base}/", rate_limit=False)
+            first = await client._get_session()
+            await client.fetch(f"{base}/", rate_limit=False)
+            return first, await client._get_session()
+        finally:
+            await runner.cleanup()
+
+    first, again = asyncio.run(sessions_of_one_run())
+    assert first is again
+
+    async def session_of_next_run():
+        session = await client._get_session()
+        await client.close()
+        return session
+
+    # The next loop gets its own session; the one of the closed loop is let go
+    second = asyncio.run(session_of_next_run())
+    assert second is not first
+    assert first.closed and second.closed
+    assert client._sessions == {}
@@ -0,0 +1,52 @@
+import asyncio
+import time
+
+from utils.hedged_fetch import LatencyTracker, fetch_first_n
+
+
+def test_hedge_starts_after_the_deadline_and_the_loser_is_cancelled():
+    tracker = LatencyTracker(default_deadline=0.1, min_deadline=0.05)
+    started: dict[str, float] = {}
+    cancelled = []
+
+    async def fetch(name):
+        started[name] = time.monotonic()
+        try:
+            await asyncio.sleep(5.0 if name == "slow" else 0.01)
+        except asyncio.CancelledError:
+            cancelled.append(name)
+            raise
+        return f"content of {name}"
+
+    async def main():
+        begin = time.monotonic()
+        fetched = await fetch_first_n(["slow", "fast", "unused"], fetch, target=1, tracker=tracker)
+        return fetched, begin, time.monotonic() - begin
+
+    fetched, begin, elapsed = asyncio.run(main())
+
+    assert fetched == [("fast", "content of fast")]
+    # The hedge waited for the deadline, and nothing beyond it was started
+    assert 0.08 < started["fast"] - begin < 0.3
+    assert "unused" not in started
+    assert cancelled == ["slow"]
+    assert elapsed < 1.0
+
+
+def test_failed_fetch_is_replaced_immediately():
+    tracker = LatencyTracker(default_deadline=5.0)
+
+    async def fetch(name):
+        if name == "broken":
+            raise OSError("connection reset")
+        await asyncio.sleep(0.01)
+        return name
+
+    async def main():
+        begin = time.monotonic()
+        fetched = await fetch_first_n(["broken", "good"], fetch, target=1, tracker=tracker)
+        return fetched, time.monotonic() - begin
+
+    fetched, elapsed = asyncio.run(main())
+    assert fetched == [("good", "good")]
+    assert elapsed < 1.0
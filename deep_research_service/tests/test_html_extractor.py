@@ -0,0 +1,52 @@
+import pytest
+
+from utils.html_extractor import available_backends, extract
+
+PARAGRAPH = "<p>" + "This paragraph carries the actual article content with plenty of words in it. " * 4 + "</p>"
+ARTICLE = PARAGRAPH * 4
+BACKENDS = [name for name in available_backends() if name != "regex"]
+
+
+def page(body: str) -> str:
+    return f"<html><head><title>Test</title></head><body>{body}</body></html>"
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("body", [
+    f'<div class="site has-sidebar"><main>{ARTICLE}</main><div class="sidebar"><a href="/">Home</a></div></div>',
+    f'<form id="aspnetForm"><div>{ARTICLE}</div></form>',
+    f'<div class="post-body js-share-tracking">{ARTICLE}</div>',
+    f'<main class="commentary-article">{ARTICLE}</main><div class="comments">First!</div>',
+], ids=["has-sidebar", "aspnet-form", "js-share-tracking", "commentary-article"])
+def test_content_containers_are_kept(backend, body):
+    text = extract(page(body), backend=backend).text
+    assert "actual article content" in text
+    assert len(text) > 1000
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_boilerplate_tokens_are_dropped(backend):
+    body = (
+        '<div class="cookie-banner">We use cookies to improve your experience on this website today.</div>'
+        '<div class="share_buttons">Share this on every social network you have ever heard of.</div>'
+        f"<article>{ARTICLE}</article>"
+        '<div id="sidebar">Popular posts and other unrelated links live in this sidebar.</div>'
+    )
+    text = extract(page(body), backend=backend).text
+    assert "actual article content" in text
+    for noise in ("cookies", "social network", "sidebar"):
+        assert noise not in text
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_main_element_is_never_pruned(backend):
+    # Its own class and an ancestor's id look like boilerplate
+    body = f'<div id="related-wrapper"><main class="widget">{ARTICLE}</main></div>'
+    assert "actual article content" in extract(page(body), backend=backend).text
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_fallback_uses_body_before_pruning(backend):
+    # No paragraph blocks, and the only container looks like a widget
+    text = "Plain text without paragraph markup that still is the whole page content. " * 6
+    assert "whole page content" in extract(page(f'<div class="widget">{text}</div>'), backend=backend).text
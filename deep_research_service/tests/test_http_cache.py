@@ -0,0 +1,58 @@
+import os
+import sqlite3
+
+from utils.html_extractor import ExtractedPage
+from utils.http_cache import HttpPageCache
+
+
+def page(text: str) -> ExtractedPage:
+    return ExtractedPage(title="t", description="d", text=text, backend="test")
+
+
+def blob_count(cache: HttpPageCache) -> int:
+    return cache.stats()["unique_contents"]
+
+
+def test_replacing_a_page_drops_only_its_orphaned_blob(tmp_path):
+    cache = HttpPageCache(db_path=str(tmp_path / "cache.db"))
+    cache.put("https://a.example/", page("shared article text"))
+    cache.put("https://b.example/", page("shared article text"))
+    cache.put("https://c.example/", page("first version"))
+    assert blob_count(cache) == 2
+
+    # The shared blob stays while b still references it
+    cache.put("https://a.example/", page("a rewritten"))
+    assert blob_count(cache) == 3
+    cache.put("https://c.example/", page("second version"))
+    assert blob_count(cache) == 3
+    assert cache.get("https://c.example/").page.text == "second version"
+    assert cache._total_bytes == cache.stats()["bytes"]
+
+
+def test_get_defers_the_access_time_write(tmp_path):
+    path = str(tmp_path / "cache.db")
+    cache = HttpPageCache(db_path=path)
+    cache.put("https://a.example/", page("text"))
+    before = sqlite3.connect(path).execute("SELECT accessed_at FROM pages").fetchone()[0]
+
+    assert cache.get("https://a.example/") is not None
+    assert sqlite3.connect(path).execute("SELECT accessed_at FROM pages").fetchone()[0] == before
+    cache.flush()
+    assert sqlite3.connect(path).execute("SELECT accessed_at FROM pages").fetchone()[0] > before
+
+
+def test_eviction_keeps_recently_read_pages(tmp_path):
+    cache = HttpPageCache(db_path=str(tmp_path / "cache.db"))
+    texts = {f"https://{i}.example/": os.urandom(2000).hex() for i in range(4)}
+    for url, text in texts.items():
+        cache.put(url, page(text))
+    cache.max_bytes = cache.stats()["bytes"]
+
+    # The oldest page was just read, so the second one is the LRU victim
+    assert cache.get("https://0.example/") is not None
+    cache.put("https://new.example/", page(os.urandom(2000).hex()))
+
+    assert cache.get("https://0.example/") is not None
+    assert cache.get("https://1.example/") is None
+    assert cache.stats()["bytes"] <= cache.max_bytes
+    assert cache._total_bytes == cache.stats()["bytes"]
@@ -0,0 +1,153 @@
+import asyncio
+import sqlite3
+import time
+
+from utils import rate_limiter as rate_limiter_module
+from utils.rate_limiter import DomainRateLimiter
+
+
+def test_shared_workers_split_one_budget(tmp_path):
+    path = str(tmp_path / "rates.db")
+    first = DomainRateLimiter(default_delay=1.0, db_path=path, shared=True)
+    second = DomainRateLimiter(default_delay=1.0, db_path=path, shared=True)
+
+    waits = [first.reserve("example.com"), second.reserve("example.com"), first.reserve("example.com")]
+    assert waits[0] == 0
+    assert 0.9 < waits[1] <= 1.0
+    assert 1.9 < waits[2] <= 2.0
+
+
+def test_shared_wait_does_not_block_the_event_loop(tmp_path, monkeypatch):
+    monkeypatch.setattr(rate_limiter_module, "_BUSY_TIMEOUT", 0.3)
+    path = str(tmp_path / "rates.db")
+    limiter = DomainRateLimiter(default_delay=0.5, db_path=path, shared=True)
+    limiter._ensure_loaded()
+
+    # Another worker holds the write lock
+    blocker = sqlite3.connect(path, isolation_level=None)
+    blocker.execute("BEGIN IMMEDIATE")
+
+    async def main():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        started = time.monotonic()
+        await limiter.wait("example.com")
+        elapsed = time.monotonic() - started
+        task.cancel()
+        return ticks, elapsed
+
+    ticks, elapsed = asyncio.run(main())
+    blocker.execute("ROLLBACK")
+    # The busy reservation fell back to the local bucket after the short timeout
+    assert elapsed < 1.0
+    assert ticks >= 10
+    assert "example.com" in limiter._next_slot
+
+
+def test_save_keeps_another_workers_crawl_delay(tmp_path):
+    path = str(tmp_path / "rates.db")
+    first = DomainRateLimiter(db_path=path)
+    second = DomainRateLimiter(db_path=path)
+
+    first.set_crawl_delay("example.com", 10)
+    first.save()
+    # The second worker marks robots.txt as checked before reading it
+    second.set_crawl_delay("example.com", None)
+    second.save()
+
+    assert DomainRateLimiter(db_path=path).delay_for("example.com") == 10
+
+
+def test_needs_robots_loads_shared_state_off_the_loop(tmp_path, monkeypatch):
+    limiter = DomainRateLimiter(db_path=str(tmp_path / "rates.db"), shared=True)
+    load = limiter._load
+
+    def slow_load(domain=None):
+        time.sleep(0.3)
+        load(domain)
+
+    monkeypatch.setattr(limiter, "_load", slow_load)
+
+    async def main():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        needed = await limiter.needs_robots("example.com")
+        task.cancel()
+        return needed, ticks
+
+    needed, ticks = asyncio.run(main())
+    assert needed
+    assert ticks >= 10
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_domains_have_independent_buckets(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter_module.time, "monotonic", clock)
+    limiter = DomainRateLimiter(default_delay=2.0)
+
+    assert limiter.reserve("a.example") == 0
+    assert limiter.reserve("a.example") == 2.0
+    # A queue on a.example does not push back b.example
+    assert limiter.reserve("b.example") == 0
+    assert limiter.reserve("b.example") == 2.0
+    clock.now += 1.5
+    assert limiter.reserve("a.example") == 2.5
+
+
+def test_waits_for_different_domains_overlap():
+    limiter = DomainRateLimiter(default_delay=0.2, min_delay=0.2)
+
+    async def main():
+        started = time.monotonic()
+        await asyncio.gather(*(limiter.wait(domain) for domain in ["a.example", "b.example", "c.example"] * 2))
+        return time.monotonic() - started
+
+    # Each domain waits one delay for its second request, all at the same time
+    assert 0.15 < asyncio.run(main()) < 0.35
+
+
+def test_backs_off_on_throttling_and_speeds_up_after_fast_responses(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter_module.time, "monotonic", clock)
+    limiter = DomainRateLimiter(default_delay=1.0, min_delay=0.2, max_delay=60.0)
+
+    limiter.record_response("example.com", 429)
+    assert limiter.delay_for("example.com") == 2.0
+    limiter.record_response("example.com", 503, retry_after=30)
+    assert limiter.delay_for("example.com") == 30.0
+    # Retry-After also holds back the next slot
+    assert limiter.reserve("example.com") == 30.0
+
+    # Slow or failed responses change nothing
+    limiter.record_response("example.com", 200, latency=5.0)
+    limiter.record_response("example.com", 404, latency=0.1)
+    assert limiter.delay_for("example.com") == 30.0
+
+    # Fast successes raise the rate additively (0.2 req/s each) down to min_delay
+    limiter.record_response("example.com", 200, latency=0.1)
+    assert abs(limiter.delay_for("example.com") - 1 / (1 / 30 + 0.2)) < 1e-9
+    for _ in range(50):
+        limiter.record_response("example.com", 200, latency=0.1)
+    assert limiter.delay_for("example.com") == 0.2
@@ -0,0 +1,50 @@
+import asyncio
+
+from utils.relevance_filter import RelevanceFilter
+
+
+class NoEmbeddings:
+    """Embedding server that is down: every undecided result goes to the LLM."""
+
+    async def embed(self, texts):
+        return None
+
+
+def result(title: str) -> dict:
+    return {"title": title, "body": "", "url": "https://example.com/"}
+
+
+def test_one_word_query_does_not_accept_on_lexical_score_alone():
+    relevance = RelevanceFilter(embeddings=NoEmbeddings())
+
+    async def reject(result):
+        return False
+
+    decisions = asyncio.run(relevance.decide([result("python snake care guide")], "python", llm_check=reject))
+    assert [(d.stage, d.relevant) for d in decisions] == [("llm", False)]
+
+    decisions = asyncio.run(
+        relevance.decide([result("python asyncio tutorial")], "python asyncio", llm_check=reject)
+    )
+    assert [(d.stage, d.relevant) for d in decisions] == [("lexical", True)]
+
+
+def test_llm_checks_run_concurrently_up_to_the_limit():
+    relevance = RelevanceFilter(embeddings=NoEmbeddings(), max_concurrent_llm=3)
+    running = 0
+    peak = 0
+
+    async def check(result):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return result["title"].endswith("0")
+
+    results = [result(f"unrelated page {i}") for i in range(7)]
+    relevant = asyncio.run(relevance.filter(results, "quantum error correction", llm_check=check))
+
+    assert peak == 3
+    assert relevant == [results[0]]
+    assert relevance.llm_calls() == 7
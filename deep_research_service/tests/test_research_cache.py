@@ -0,0 +1,11 @@
+from utils.research_cache import ResearchCache
+
+
+def test_results_are_cached_per_analysis_mode_and_source_count(tmp_path):
+    cache = ResearchCache(db_path=str(tmp_path / "research.db"))
+    options = {"analysis_mode": "summaries", "max_sources": 8}
+    cache.set("Quantum computing", {"answer": "a"}, options)
+
+    assert cache.get("quantum computing ", {"max_sources": 8, "analysis_mode": "summaries"}) == {"answer": "a"}
+    assert cache.get("quantum computing", {"analysis_mode": "passages", "max_sources": 8}) is None
+    assert cache.get("quantum computing", {"analysis_mode": "summaries", "max_sources": 12}) is None
@@ -0,0 +1,68 @@
+import os
+import sqlite3
+
+import pytest
+
+pytest.importorskip("pydantic")
+
+from libs.utils.data_types import DeepResearchResult, DeepResearchResults  # noqa: E402
+from libs.utils.result_store import ResultStore  # noqa: E402
+
+
+def results(text: str) -> DeepResearchResults:
+    return DeepResearchResults(
+        results=[DeepResearchResult(title="t", link="https://a.example/", content=text, filtered_raw_content=text)]
+    )
+
+
+def accessed_at(path: str, table: str) -> list[float]:
+    return [row[0] for row in sqlite3.connect(path).execute(f"SELECT accessed_at FROM {table} ORDER BY rowid")]
+
+
+def test_results_and_summaries_round_trip(tmp_path):
+    store = ResultStore(tmp_path / "store.db")
+    store.set("bora bora", results("an island"))
+    key = ResultStore.summary_key("https://a.example/", "an island", "islands")
+    store.set_summary(key, "https://a.example/", "a short summary")
+
+    assert store.get("bora bora") == results("an island")
+    assert store.get_many(["bora bora", "tahiti"]) == {"bora bora": results("an island")}
+    assert store.get_summaries([key, "missing"]) == {key: "a short summary"}
+
+
+def test_reads_defer_the_access_time_write(tmp_path):
+    path = str(tmp_path / "store.db")
+    store = ResultStore(path)
+    store.set("bora bora", results("an island"))
+    before = accessed_at(path, "results")
+
+    assert store.get("bora bora") is not None
+    assert accessed_at(path, "results") == before
+    store.flush()
+    assert accessed_at(path, "results")[0] > before[0]
+
+
+def test_eviction_keeps_recently_read_entries(tmp_path):
+    store = ResultStore(tmp_path / "store.db")
+    texts = {f"query {i}": os.urandom(2000).hex() for i in range(4)}
+    for query, text in texts.items():
+        store.set(query, results(text))
+    # Room for the four entries plus a little, but not for a fifth
+    store.max_bytes = sum(len(store._encode(results(text))) for text in texts.values()) + 100
+
+    # query 0 is the oldest write but the most recent read; the next write must evict query 1
+    store.get("query 0")
+    store.set("query 4", results(os.urandom(2000).hex()))
+
+    assert set(store.get_many(list(texts) + ["query 4"])) == {"query 0", "query 2", "query 3", "query 4"}
+
+
+def test_summaries_are_capped_separately(tmp_path):
+    store = ResultStore(tmp_path / "store.db", max_summary_bytes=10_000)
+    keys = [ResultStore.summary_key(f"https://{i}.example/", "text", "topic") for i in range(3)]
+    for i, key in enumerate(keys):
+        store.set_summary(key, f"https://{i}.example/", os.urandom(4000).hex())
+    store.set("bora bora", results(os.urandom(3000).hex()))
+
+    assert set(store.get_summaries(keys)) == set(keys[1:])
+    assert store.get("bora bora") is not None
@@ -0,0 +1,65 @@
+from utils.saturation import NoveltyTracker
+
+# Facts every article about the topic repeats
+CORE = [
+    "Solid-state batteries replace the liquid electrolyte of a lithium-ion cell with a solid electrolyte made of ceramic, sulfide or polymer.",
+    "The solid electrolyte does not burn, so solid-state batteries are safer than lithium-ion batteries.",
+    "A solid electrolyte allows a lithium metal anode, which raises the energy density of the battery.",
+    "Toyota plans to produce solid-state batteries for electric vehicles around 2027 or 2028.",
+    "Toyota claims a range of about 1,000 km and charging from 10 to 80 percent in ten minutes.",
+    "QuantumScape, Solid Power, Samsung SDI and CATL are also developing solid-state batteries.",
+    "Manufacturing cost is still the main obstacle for solid-state batteries.",
+    "Lithium dendrites can grow through the solid electrolyte at high charging rates.",
+    "Contact between the solid electrolyte and the electrodes degrades as the electrodes expand and contract during cycling.",
+    "Sulfide electrolytes conduct lithium ions well but react with moisture, so production needs dry rooms.",
+]
+# Each outlet's own framing: words no other page uses
+FRAMING = [
+    "Speaking at the company's technical workshop in Shizuoka, engineers showed prototype cells on a test bench; journalists were not allowed to photograph the equipment.",
+    "In an interview last month, a spokesperson described the programme as one of the firm's most important bets of the decade, while observers remain cautious.",
+    "This explainer is part of our series on clean energy technology; readers who want a broader introduction can start with our guide and glossary.",
+    "The announcement pushed shares of several suppliers higher on the Tokyo and Seoul exchanges, and some brokers upgraded their ratings.",
+    "Our newsletter subscribers asked whether they should delay buying an electric car; our advice is that waiting rarely makes financial sense for a household.",
+    "Researchers at universities in Germany, Korea and the United States continue to publish papers, and a conference in Berlin reported record attendance.",
+    "Japan's economy ministry has set aside subsidies for domestic production, and similar programmes exist in the European Union.",
+    "Most experts agree the transition will be gradual, with expensive flagship models first and mainstream cars following later in the decade.",
+]
+# Sources on different subtopics
+DIVERSE = [
+    "Sodium-ion batteries use sodium instead of lithium as the charge carrier. Sodium is abundant and cheap, and sodium-ion cells can use aluminium current collectors on both electrodes. CATL launched its first sodium-ion battery in 2021 with 160 Wh/kg. Sodium-ion cells keep about 90 percent of their capacity at minus 20 degrees and suit city cars, two-wheelers and stationary storage.",
+    "Battery recycling recovers lithium, nickel, cobalt and manganese from black mass, the shredded electrode material. Hydrometallurgical recycling dissolves black mass in acids; pyrometallurgical smelting loses lithium in the slag. The European Union requires recycled content from 2031: 16 percent cobalt, 6 percent lithium and 6 percent nickel. Redwood Materials and Li-Cycle are large recyclers.",
+    "Lithium iron phosphate cathodes contain no nickel or cobalt, which makes LFP cells cheaper. LFP cells tolerate more than 3,000 charge cycles and resist thermal runaway. LFP energy density is 160 to 200 Wh/kg, but cell-to-pack designs such as the BYD Blade recover space. Tesla uses LFP cells in standard-range cars, and LMFP adds manganese to raise the voltage.",
+    "Silicon anodes store about ten times more lithium per gram than graphite anodes. Silicon swells by up to 300 percent, cracking particles, so Sila, Group14 and Amprius use nanostructured silicon or silicon-carbon composites. Most silicon anodes today blend a few percent of silicon oxide into graphite, and prelithiation compensates for lithium lost in early cycles.",
+    "Grid batteries shift solar power from midday to the evening peak; California installed more than 10 gigawatts by 2024. Grid batteries also provide frequency regulation within milliseconds. For longer storage durations, flow batteries and iron-air batteries from Form Energy are developed, because lithium-ion storage becomes expensive beyond eight hours.",
+    "Battery management systems estimate state of charge and state of health. Coulomb counting drifts, so battery management systems correct it with open-circuit voltage and Kalman filter estimates. Cell balancing keeps cells of a series string at similar charge; passive balancing burns energy in resistors, active balancing moves charge between cells. Wireless battery management removes wiring harnesses.",
+]
+
+
+def related_sources() -> list[str]:
+    return [" ".join([FRAMING[i]] + [CORE[(i + j) % len(CORE)] for j in range(7)]) for i in range(len(FRAMING))]
+
+
+def test_related_sources_saturate():
+    tracker = NoveltyTracker()
+    stopped_after = None
+    for number, text in enumerate(related_sources(), 1):
+        tracker.observe(text)
+        if tracker.saturated:
+            stopped_after = number
+            break
+    assert stopped_after is not None, tracker.summary()
+    assert stopped_after <= 5
+
+
+def test_diverse_sources_do_not_saturate():
+    tracker = NoveltyTracker()
+    for text in DIVERSE:
+        tracker.observe(text)
+    assert not tracker.saturated, tracker.summary()
+    assert min(tracker.history) > 0.3
+
+
+def test_empty_text_is_ignored():
+    tracker = NoveltyTracker()
+    assert tracker.observe("") is None
+    assert tracker.history == []
@@ -0,0 +1,46 @@
+import asyncio
+import os
+
+from utils.search_cache import SearchCache, classify_query, normalize_query
+
+
+def test_normalize_query_keeps_word_order_and_repeats():
+    assert normalize_query("Python  asyncio Tutorial?") == normalize_query("python asyncio tutorial")
+    assert normalize_query("ＰＹＴＨＯＮ") == "python"
+    assert normalize_query("rust vs python") != normalize_query("python vs rust")
+    assert normalize_query("bora bora") == "bora bora"
+
+
+def test_classify_query():
+    assert classify_query("latest AI news") == "news"
+    assert classify_query("Apple stock price") == "news"
+    assert classify_query("What is quantum computing?") == "definitional"
+    assert classify_query("how to update a SQL row") == "general"
+    assert classify_query("current density in semiconductors") == "general"
+
+
+def test_word_order_gets_separate_entries(tmp_path):
+    cache = SearchCache(db_path=str(tmp_path / "search.db"))
+    cache.set("rust vs python", [{"url": "a"}], provider="google", lang="en")
+    assert cache.get("Rust vs. Python", provider="google", lang="en") == [{"url": "a"}]
+    assert cache.get("python vs rust", provider="google", lang="en") is None
+
+
+def test_max_results_gets_separate_entries(tmp_path):
+    cache = SearchCache(db_path=str(tmp_path / "search.db"))
+    cache.set("bora bora", [{"url": "a"}], provider="google", lang="en", max_results=1)
+    assert cache.get("bora bora", provider="google", lang="en", max_results=1) == [{"url": "a"}]
+    assert cache.get("bora bora", provider="google", lang="en", max_results=10) is None
+
+
+def test_database_is_created_on_first_use(tmp_path):
+    db_path = tmp_path / "search.db"
+    cache = SearchCache(db_path=str(db_path))
+    assert not os.path.exists(db_path)
+
+    async def round_trip():
+        await cache.aset("bora bora", [{"url": "a"}], provider="google", max_results=5)
+        return await cache.aget("bora bora", provider="google", max_results=5)
+
+    assert asyncio.run(round_trip()) == [{"url": "a"}]
+    assert os.path.exists(db_path)
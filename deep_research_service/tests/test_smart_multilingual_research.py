@@ -0,0 +1,48 @@
+import asyncio
+
+from aiohttp import web
+
+from smart_multilingual_research import SmartMultilingualResearcher
+from utils.fetch_client import fetch_client
+
+ARTICLE = (
+    "<html><head><title>Bora Bora</title>"
+    '<meta name="description" content="An island in French Polynesia"></head>'
+    "<body><article>" + "<p>" + "Bora Bora is an island in the Leeward group. " * 10 + "</p>" * 5
+    + "</article></body></html>"
+)
+
+
+async def article(request):
+    return web.Response(text=ARTICLE, content_type="text/html")
+
+
+async def serve_article():
+    app = web.Application()
+    app.router.add_get("/", article)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}/"
+
+
+def test_second_describe_of_a_url_is_a_cache_hit():
+    async def describe_twice():
+        runner, url = await serve_article()
+        try:
+            researcher = SmartMultilingualResearcher("model", "Ollama", websocket=None)
+            first = await researcher._describe_google_hit(url)
+            second = await researcher._describe_google_hit(url)
+            return researcher, first, second
+        finally:
+            await fetch_client.close()
+            await runner.cleanup()
+
+    researcher, first, second = asyncio.run(describe_twice())
+    assert first["title"] == "Bora Bora"
+    assert first["body"] == "An island in French Polynesia"
+    assert second == first
+    assert (researcher.page_stats.misses, researcher.page_stats.hits) == (1, 1)
+    assert researcher.page_cache.get(first["href"]).startswith("Bora Bora is an island")
@@ -0,0 +1,207 @@
+"""
+URL canonicalisation and near-duplicate page detection.
+
+Search engines happily return the same article several times: over http
+and https, with ``utm_*`` tracking parameters, as an AMP copy, or on a
+mirror / syndication site.  Each copy would otherwise be downloaded and
+sent through the LLM.
+
+* ``canonicalize_url`` maps such URL variants onto one key.
+* ``simhash`` fingerprints extracted text (word 3-gram shingles of the
+  first few thousand words, 64 bits); near-identical texts differ in only
+  a few bits.  The bit weights are summed with NumPy, so a long page takes
+  a few milliseconds.
+* ``NearDuplicateIndex`` remembers fingerprints and answers "have we seen
+  (almost) this text before?" using band buckets, so a lookup does not scan
+  every stored fingerprint.
+
+Usage:
+    from utils.dedup import canonicalize_url, NearDuplicateIndex
+
+    index = NearDuplicateIndex()
+    if index.add(url, page_text):
+        ...  # near-duplicate of a page already kept, skip it
+"""
+
+import hashlib
+import re
+import logging
+from urllib.parse import parse_qsl, unquote, urlencode, urlsplit, urlunsplit
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Known tracking parameters that never change the page content.  Generic
+# names like ``ref`` or ``share`` are kept: GitHub's ``?ref=v1.2`` selects a tag.
+_TRACKING_PARAMS = frozenset((
+    "gclid", "gclsrc", "dclid", "fbclid", "msclkid", "yclid", "igshid", "mc_cid", "mc_eid",
+    "_ga", "_gl", "ref_src", "ref_url", "spm", "cmpid", "amp_js_v", "usqp",
+))
+_TRACKING_PREFIXES = ("utm_", "pk_", "hsa_", "vero_")
+
+_HOST_PREFIXES = ("www.", "m.", "amp.", "mobile.")
+_AMP_PATH_RE = re.compile(r"(/amp/?$|/amp(?=/)|\.amp(?=\.html?$|$))", re.IGNORECASE)
+_MULTI_SLASH_RE = re.compile(r"/{2,}")
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+_SIMHASH_BITS = 64
+_BIT_SHIFTS = np.arange(_SIMHASH_BITS, dtype=np.uint64)
+# Only the start of a page is fingerprinted; copies of one article agree there
+_MAX_WORDS = 5000
+# Fingerprints this close (in bits) count as the same text
+_DEFAULT_MAX_DISTANCE = 6
+# Texts with fewer shingles are too short for a meaningful fingerprint
+_MIN_SHINGLES = 20
+
+
+def canonicalize_url(url: str) -> str:
+    """Normalise *url* so that trivially different links compare equal.
+
+    Lower-cases scheme and host, treats http as https, drops ``www.``/``m.``/
+    ``amp.`` host prefixes, default ports, fragments, known tracking
+    parameters and AMP path markers (when a non-AMP path remains), sorts the remaining query parameters and strips the
+    trailing slash.  Google ``/url?q=`` redirect links are unwrapped.
+    """
+    if not url:
+        return url
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return url
+
+    host = (parts.hostname or "").lower()
+    if not host:
+        return url
+
+    # Google redirect wrapper: /url?q=<target>
+    if host.endswith("google.com") and parts.path == "/url":
+        target = dict(parse_qsl(parts.query)).get("q")
+        if target and target.startswith("http"):
+            return canonicalize_url(unquote(target))
+
+    for prefix in _HOST_PREFIXES:
+        if host.startswith(prefix) and host.count(".") > 1:
+            host = host[len(prefix):]
+            break
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+
+    path = _MULTI_SLASH_RE.sub("/", parts.path or "/")
+    # "/news/amp" -> "/news", but "/amp" itself is a page of its own
+    stripped = _AMP_PATH_RE.sub("", path)
+    if stripped.strip("/"):
+        path = stripped
+    if len(path) > 1:
+        path = path.rstrip("/")
+
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in _TRACKING_PARAMS and not key.lower().startswith(_TRACKING_PREFIXES)
+    )
+
+    return urlunsplit(("https", host, path, urlencode(query), ""))
+
+
+def _shingles(text: str, size: int = 3) -> set[str]:
+    words = _WORD_RE.findall(text.casefold())[:_MAX_WORDS]
+    if len(words) < size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def simhash(text: str) -> int | None:
+    """64-bit SimHash of *text*, or ``None`` when the text is too short."""
+    shingles = _shingles(text)
+    if len(shingles) < _MIN_SHINGLES:
+        return None
+
+    values = np.array(
+        [int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big") for shingle in shingles],
+        dtype=np.uint64,
+    )
+    # A bit is set when more than half of the shingle hashes have it
+    ones = ((values[:, None] >> _BIT_SHIFTS) & np.uint64(1)).sum(axis=0)
+
+    fingerprint = 0
+    for bit in np.flatnonzero(2 * ones > len(values)):
+        fingerprint |= 1 << int(bit)
+    return fingerprint
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+class NearDuplicateIndex:
+    """Set of text fingerprints with fast near-duplicate lookup."""
+
+    def __init__(self, max_distance: int = _DEFAULT_MAX_DISTANCE):
+        """
+        Args:
+            max_distance: Maximum differing bits for two texts to count as
+                          duplicates.  Lookup splits fingerprints into
+                          ``max_distance + 1`` bands, so every match within
+                          the distance shares at least one band exactly.
+        """
+        self.max_distance = max_distance
+        self._bands = max_distance + 1
+        self._band_bits = _SIMHASH_BITS // self._bands
+        self._buckets: list[dict[int, list[tuple[int, str]]]] = [{} for _ in range(self._bands)]
+        self._urls: dict[str, str] = {}
+
+    def _band_keys(self, fingerprint: int) -> list[int]:
+        mask = (1 << self._band_bits) - 1
+        return [(fingerprint >> (band * self._band_bits)) & mask for band in range(self._bands)]
+
+    def find(self, text: str) -> str | None:
+        """Key of a stored near-duplicate of *text*, or ``None``."""
+        fingerprint = simhash(text)
+        return None if fingerprint is None else self._find(fingerprint)
+
+    def _find(self, fingerprint: int) -> str | None:
+        for band, band_key in enumerate(self._band_keys(fingerprint)):
+            for other, key in self._buckets[band].get(band_key, ()):
+                if hamming_distance(fingerprint, other) <= self.max_distance:
+                    return key
+        return None
+
+    def add(self, key: str, text: str) -> str | None:
+        """Store *text* under *key* unless it duplicates a stored text.
+
+        Returns the key of the earlier duplicate (the new text is not stored),
+        or ``None`` when *text* is new.  *key* is usually the page URL; URLs
+        that canonicalise to an already stored one count as duplicates too.
+        """
+        canonical = canonicalize_url(key)
+        if canonical in self._urls:
+            return self._urls[canonical]
+
+        fingerprint = simhash(text)
+        if fingerprint is not None:
+            duplicate = self._find(fingerprint)
+            if duplicate is not None:
+                logger.debug("Near-duplicate content: %s ~ %s", key, duplicate)
+                return duplicate
+            for band, band_key in enumerate(self._band_keys(fingerprint)):
+                self._buckets[band].setdefault(band_key, []).append((fingerprint, key))
+
+        self._urls[canonical] = key
+        return None
+
+    def __len__(self) -> int:
+        return len(self._urls)
+
+
+def dedupe_urls(items: list, url_of=lambda item: item) -> list:
+    """Drop items whose URL canonicalises to one seen earlier (order kept)."""
+    seen: set[str] = set()
+    unique = []
+    for item in items:
+        canonical = canonicalize_url(url_of(item))
+        if canonical not in seen:
+            seen.add(canonical)
+            unique.append(item)
+    return unique
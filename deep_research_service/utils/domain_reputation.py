@@ -0,0 +1,217 @@
+"""
+Domain reputation index and per-domain cache of LLM reliability scores.
+
+Known domains get an immediate reliability score from a curated list
+(``utils/data/domain_reputation.json``) instead of an LLM call.  Domains
+are stored in a trie of reversed labels (``org -> arxiv``), so
+``export.arxiv.org`` matches ``arxiv.org`` and the most specific entry
+wins (``blog.google.com`` is medium although ``google.com`` is high).
+
+For unknown domains the researchers still ask the LLM; its score is
+cached in SQLite per domain and day, so a domain is assessed at most
+once a day no matter how many of its pages come up.  Only the score is
+kept: the LLM's reasoning is about the page it was shown.  The database
+is created on first use; code on the event loop uses ``aget_llm_score`` /
+``aset_llm_score``, which run in the default executor.
+
+Usage:
+    from utils.domain_reputation import domain_reputation
+
+    known = domain_reputation.lookup("export.arxiv.org")
+    if known:
+        known.tier, known.score          # "high", 90
+    else:
+        cached = await domain_reputation.aget_llm_score(domain)
+        ...
+        await domain_reputation.aset_llm_score(domain, score)
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import time
+import logging
+from dataclasses import dataclass
+from datetime import date
+
+logger = logging.getLogger(__name__)
+
+_UTILS_DIR = os.path.dirname(os.path.abspath(__file__))
+_DEFAULT_DATA_PATH = os.path.join(_UTILS_DIR, "data", "domain_reputation.json")
+# Default DB location: next to this file, inside the service directory
+_DEFAULT_DB_PATH = os.path.join(os.path.dirname(_UTILS_DIR), "domain_reputation.db")
+
+# Key marking the end of a registered domain inside the trie
+_LEAF = ""
+# Neutral 0..1 prior for domains that are not in the index
+_UNKNOWN_PRIOR = 0.4
+# LLM scores older than this are purged
+_LLM_SCORE_MAX_AGE = 30 * 24 * 60 * 60
+
+
+@dataclass(frozen=True)
+class Reputation:
+    """Index entry for a domain."""
+
+    tier: str
+    score: int          # 0-100
+    matched: str        # index entry that matched, e.g. "arxiv.org" or "gov"
+
+
+class DomainReputation:
+    """Reversed-label trie of domains with reputation tiers."""
+
+    def __init__(self, scores: dict[str, int], domains: dict[str, list[str]],
+                 host_prefixes: dict[str, list[str]] | None = None, db_path: str | None = None):
+        """
+        Args:
+            scores:        Score (0-100) per tier name.
+            domains:       Registered domains (or suffixes like ``gov``) per tier.
+            host_prefixes: Host name prefixes (e.g. ``docs.``) per tier, used
+                           when no domain entry matches.
+            db_path:       SQLite file for cached LLM scores; ``None`` disables
+                           the cache.
+        """
+        self.scores = scores
+        self._trie: dict = {}
+        self._prefixes: list[tuple[str, str]] = []
+        self.db_path = db_path
+        self._initialised = False
+
+        for tier, entries in domains.items():
+            for entry in entries:
+                self._insert(entry.lower().strip("."), tier)
+        for tier, prefixes in (host_prefixes or {}).items():
+            self._prefixes.extend((prefix.lower(), tier) for prefix in prefixes)
+
+    @classmethod
+    def from_file(cls, path: str = _DEFAULT_DATA_PATH, db_path: str | None = None) -> "DomainReputation":
+        """Load the index from a JSON data file."""
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        index = cls(data["scores"], data["domains"], data.get("host_prefixes"), db_path=db_path)
+        logger.info("Loaded domain reputation index from %s", path)
+        return index
+
+    # ------------------------------------------------------------------
+    # Index
+    # ------------------------------------------------------------------
+
+    def _insert(self, domain: str, tier: str) -> None:
+        node = self._trie
+        for label in reversed(domain.split(".")):
+            node = node.setdefault(label, {})
+        node[_LEAF] = (tier, domain)
+
+    def lookup(self, domain: str) -> Reputation | None:
+        """Most specific index entry for *domain* (a hostname), or ``None``."""
+        domain = (domain or "").lower().strip(".")
+        if domain.startswith("www."):
+            domain = domain[4:]
+
+        match = None
+        node = self._trie
+        for label in reversed(domain.split(".")):
+            node = node.get(label)
+            if node is None:
+                break
+            if _LEAF in node:
+                match = node[_LEAF]
+
+        if match is None:
+            for prefix, tier in self._prefixes:
+                if domain.startswith(prefix):
+                    match = (tier, prefix)
+                    break
+        if match is None:
+            return None
+
+        tier, matched = match
+        return Reputation(tier=tier, score=self.scores[tier], matched=matched)
+
+    def prior(self, domain: str) -> float:
+        """Reputation as 0..1 (neutral for unknown domains), e.g. for ranking."""
+        known = self.lookup(domain)
+        return known.score / 100 if known else _UNKNOWN_PRIOR
+
+    # ------------------------------------------------------------------
+    # LLM score cache
+    # ------------------------------------------------------------------
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path)
+        if not self._initialised:
+            self._ensure_table(conn)
+        return conn
+
+    def _ensure_table(self, conn: sqlite3.Connection) -> None:
+        try:
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(llm_domain_scores)")}
+            if "reason" in columns:
+                # Rows from when page-specific reasons were cached with the score; it is only a cache
+                conn.execute("DROP TABLE llm_domain_scores")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS llm_domain_scores (
+                    domain      TEXT NOT NULL,
+                    day         TEXT NOT NULL,
+                    score       INTEGER NOT NULL,
+                    created_at  REAL NOT NULL,
+                    PRIMARY KEY (domain, day)
+                )
+                """
+            )
+            conn.execute("DELETE FROM llm_domain_scores WHERE created_at < ?", (time.time() - _LLM_SCORE_MAX_AGE,))
+            conn.commit()
+            self._initialised = True
+        except Exception as e:
+            logger.error("Failed to initialise domain score cache: %s", e)
+
+    def get_llm_score(self, domain: str) -> int | None:
+        """Today's cached LLM score (0-100) for *domain*, or ``None``."""
+        if not self.db_path:
+            return None
+        try:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT score FROM llm_domain_scores WHERE domain = ? AND day = ?",
+                (domain.lower(), date.today().isoformat()),
+            ).fetchone()
+            conn.close()
+            return row[0] if row else None
+        except Exception as e:
+            logger.error("Domain score cache get error: %s", e)
+            return None
+
+    def set_llm_score(self, domain: str, score: int) -> None:
+        """Cache today's LLM score (0-100) for *domain*."""
+        if not self.db_path:
+            return
+        try:
+            conn = self._connect()
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO llm_domain_scores (domain, day, score, created_at)
+                VALUES (?, ?, ?, ?)
+                """,
+                (domain.lower(), date.today().isoformat(), int(score), time.time()),
+            )
+            conn.commit()
+            conn.close()
+        except Exception as e:
+            logger.error("Domain score cache set error: %s", e)
+
+    async def aget_llm_score(self, domain: str) -> int | None:
+        """``get_llm_score`` run in the default executor, for callers on the event loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.get_llm_score, domain)
+
+    async def aset_llm_score(self, domain: str, score: int) -> None:
+        """``set_llm_score`` run in the default executor, for callers on the event loop."""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.set_llm_score, domain, score)
+
+
+# Module-level singleton so every module can ``from utils.domain_reputation import domain_reputation``
+domain_reputation = DomainReputation.from_file(db_path=_DEFAULT_DB_PATH)
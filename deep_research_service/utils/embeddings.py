@@ -0,0 +1,268 @@
+"""
+Batched text embeddings with a persistent vector cache.
+
+``EmbeddingService`` turns texts into L2-normalised NumPy vectors using the
+local model server the researchers already talk to:
+
+* Ollama    - one ``POST /api/embed`` per batch
+* LM Studio - one ``POST /v1/embeddings`` per batch (falls back to Ollama
+              when LM Studio is not reachable, like the chat calls)
+
+Vectors are cached in SQLite as float16 blobs keyed by a SHA-256 of
+provider, model and text, so a title, snippet or passage is embedded once
+no matter how many runs see it.  Because rows are unit length, cosine
+similarity is a dot product; ``top_k`` picks the best matches with
+``argpartition``.  The database is created on first use and read and
+written in the default executor, off the event loop.  Failures return ``None`` - embeddings are an optional
+signal for every caller.
+
+The model is set with ``EMBEDDING_MODEL`` (default ``nomic-embed-text``),
+the default provider with ``EMBEDDING_PROVIDER``; the host follows
+``OLLAMA_HOST_IP`` like the researchers' chat calls.
+
+Usage:
+    from utils.embeddings import get_embedding_service, top_k
+
+    embeddings = get_embedding_service(self.model_source)
+    vectors = await embeddings.embed([topic] + passages)
+    if vectors is not None:
+        indices, scores = top_k(vectors[0], vectors[1:], k=5)
+"""
+
+import asyncio
+import hashlib
+import os
+import socket
+import sqlite3
+import time
+import logging
+
+import aiohttp
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_MODEL = os.environ.get("EMBEDDING_MODEL", "nomic-embed-text")
+EMBEDDING_PROVIDER = os.environ.get("EMBEDDING_PROVIDER", "Ollama")
+
+# Default DB location: next to this file, inside the service directory
+_DEFAULT_DB_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "embeddings.db",
+)
+
+# Texts are cut to this many characters before embedding
+_MAX_CHARS = 2000
+_DEFAULT_BATCH_SIZE = 64
+# Cached vectors older than this are purged
+_CACHE_MAX_AGE = 30 * 24 * 60 * 60
+
+
+def model_host() -> str:
+    """Host of the local model servers (same resolution as the chat calls)."""
+    host = os.environ.get("OLLAMA_HOST_IP")
+    if host:
+        return host
+    try:
+        return socket.gethostbyname("host.docker.internal")
+    except OSError:
+        return "localhost"
+
+
+def _normalise(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def cosine_similarity(query: np.ndarray, matrix: np.ndarray) -> np.ndarray:
+    """Cosine similarity of a unit *query* vector with each unit row of *matrix*."""
+    return matrix @ query
+
+
+def top_k(query: np.ndarray, matrix: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+    """Indices and similarities of the *k* rows of *matrix* closest to *query*, best first."""
+    if matrix.shape[0] == 0 or k <= 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+    scores = cosine_similarity(query, matrix)
+    k = min(k, scores.shape[0])
+    candidates = np.argpartition(-scores, k - 1)[:k]
+    order = candidates[np.argsort(-scores[candidates])]
+    return order, scores[order]
+
+
+class EmbeddingService:
+    """Embeds texts in batches and caches the vectors by content hash."""
+
+    def __init__(
+        self,
+        provider: str = EMBEDDING_PROVIDER,
+        model: str = EMBEDDING_MODEL,
+        db_path: str | None = _DEFAULT_DB_PATH,
+        batch_size: int = _DEFAULT_BATCH_SIZE,
+        timeout: float = 60,
+    ):
+        """
+        Args:
+            provider:   "Ollama" or "LM Studio".
+            model:      Embedding model name on that server.
+            db_path:    SQLite file for the vector cache; ``None`` disables it.
+            batch_size: Texts per embedding request.
+            timeout:    Seconds allowed per request.
+        """
+        self.provider = provider
+        self.model = model
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self._initialised = False
+
+    # ------------------------------------------------------------------
+    # Vector cache
+    # ------------------------------------------------------------------
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        if not self._initialised:
+            self._ensure_table(conn)
+        return conn
+
+    def _ensure_table(self, conn: sqlite3.Connection) -> None:
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    key         TEXT PRIMARY KEY,
+                    vector      BLOB NOT NULL,
+                    created_at  REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("DELETE FROM embeddings WHERE created_at < ?", (time.time() - _CACHE_MAX_AGE,))
+            conn.commit()
+            self._initialised = True
+        except Exception as e:
+            logger.error("Failed to initialise embedding cache: %s", e)
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.provider}\0{self.model}\0{text}".encode("utf-8")).hexdigest()
+
+    def _load(self, keys: list[str]) -> dict[str, np.ndarray]:
+        if not self.db_path or not keys:
+            return {}
+        found = {}
+        try:
+            conn = self._connect()
+            # Stay well below SQLite's host-parameter limit
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                for key, blob in conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk
+                ):
+                    found[key] = np.frombuffer(blob, dtype=np.float16).astype(np.float32)
+            conn.close()
+        except Exception as e:
+            logger.error("Embedding cache read error: %s", e)
+        return found
+
+    def _store(self, items: list[tuple[str, np.ndarray]]) -> None:
+        if not self.db_path or not items:
+            return
+        try:
+            conn = self._connect()
+            now = time.time()
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, created_at) VALUES (?, ?, ?)",
+                [(key, vector.astype(np.float16).tobytes(), now) for key, vector in items],
+            )
+            conn.commit()
+            conn.close()
+        except Exception as e:
+            logger.error("Embedding cache write error: %s", e)
+
+    # ------------------------------------------------------------------
+    # Model server calls
+    # ------------------------------------------------------------------
+
+    async def _request_ollama(self, session: aiohttp.ClientSession, texts: list[str]) -> list | None:
+        url = f"http://{model_host()}:11434/api/embed"
+        async with session.post(url, json={"model": self.model, "input": texts}) as response:
+            if response.status != 200:
+                logger.warning("Ollama embedding request failed: HTTP %d %s", response.status, await response.text())
+                return None
+            data = await response.json()
+        return data.get("embeddings")
+
+    async def _request_lm_studio(self, session: aiohttp.ClientSession, texts: list[str]) -> list | None:
+        url = f"http://{model_host()}:1234/v1/embeddings"
+        async with session.post(url, json={"model": self.model, "input": texts}) as response:
+            if response.status != 200:
+                logger.warning("LM Studio embedding request failed: HTTP %d %s", response.status, await response.text())
+                return None
+            data = await response.json()
+        return [item["embedding"] for item in sorted(data.get("data", []), key=lambda item: item.get("index", 0))]
+
+    async def _request(self, session: aiohttp.ClientSession, texts: list[str]) -> list | None:
+        if self.provider == "LM Studio":
+            try:
+                return await self._request_lm_studio(session, texts)
+            except aiohttp.ClientConnectionError as e:
+                logger.warning("LM Studio unreachable for embeddings, trying Ollama: %s", e)
+        return await self._request_ollama(session, texts)
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    async def embed(self, texts: list[str]) -> np.ndarray | None:
+        """Embed *texts*; returns a ``(len(texts), dim)`` float32 matrix of unit rows or ``None``."""
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        texts = [text[:_MAX_CHARS] for text in texts]
+        keys = [self._key(text) for text in texts]
+        loop = asyncio.get_running_loop()
+        vectors = await loop.run_in_executor(None, self._load, list(set(keys)))
+
+        missing: dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in vectors:
+                missing.setdefault(key, text)
+
+        if missing:
+            missing_keys = list(missing)
+            new_items = []
+            try:
+                async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.timeout)) as session:
+                    for start in range(0, len(missing_keys), self.batch_size):
+                        batch = missing_keys[start:start + self.batch_size]
+                        embedded = await self._request(session, [missing[key] for key in batch])
+                        if not embedded or len(embedded) != len(batch):
+                            logger.warning("Embedding server returned no usable vectors for %d texts", len(batch))
+                            return None
+                        normalised = _normalise(np.asarray(embedded, dtype=np.float32))
+                        new_items.extend(zip(batch, normalised))
+            except Exception as e:
+                logger.warning("Embedding server unavailable: %s", e)
+                return None
+
+            vectors.update(new_items)
+            await loop.run_in_executor(None, self._store, new_items)
+
+        logger.debug("Embedded %d texts (%d from cache)", len(texts), len(texts) - len(missing))
+        return _normalise(np.stack([vectors[key] for key in keys]))
+
+
+_services: dict[str, EmbeddingService] = {}
+
+
+def get_embedding_service(provider: str | None = None) -> EmbeddingService:
+    """Shared service for *provider* ("Ollama" / "LM Studio"); unknown sources use the default."""
+    if provider not in ("Ollama", "LM Studio"):
+        provider = EMBEDDING_PROVIDER
+    if provider not in _services:
+        _services[provider] = EmbeddingService(provider=provider, db_path=_DEFAULT_DB_PATH)
+    return _services[provider]
+
@@ -0,0 +1,282 @@
+"""
+Process-wide aiohttp client for downloading web pages.
+
+All page downloads share one ``aiohttp.ClientSession`` whose connector is
+tuned for crawling: a global connection limit, a per-host limit, DNS
+caching and keep-alive reuse.  Every request carries the same User-Agent,
+goes through the per-domain rate limiter and is bounded in redirects.
+Response status and latency are fed back to the rate limiter so it can
+adapt each domain's delay, and every domain's robots.txt is read once for
+its ``Crawl-delay``; that read counts against the caller's timeout.
+
+Bodies are streamed in chunks and reading stops once a byte budget is
+spent, so a 10 MB page costs no more than the budget in bandwidth, memory
+and parse time.  Non-text responses (PDFs, images, archives) are rejected
+from their headers before any of the body is read.
+
+Usage:
+    from utils.fetch_client import fetch_client
+
+    result = await fetch_client.fetch(url, timeout=10)
+    if result.ok:
+        html = result.text
+
+The session is created lazily on first use, one per event loop (a session
+cannot be used from another loop); call ``await fetch_client.close()`` on
+shutdown.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+
+import aiohttp
+from multidict import CIMultiDict
+
+from utils.rate_limiter import rate_limiter, extract_domain, parse_retry_after
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = "Mozilla/5.0 (compatible; LocoDex-DeepSearch/1.0)"
+
+_CHUNK_SIZE = 16 * 1024
+_ROBOTS_MAX_BYTES = 64 * 1024
+# robots.txt gets at most this many seconds, and at most a third of the caller's timeout
+_ROBOTS_TIMEOUT = 5
+
+# Content types worth handing to the HTML/text extractor
+_TEXT_CONTENT_TYPES = (
+    "application/xhtml+xml",
+    "application/xml",
+    "application/rss+xml",
+    "application/atom+xml",
+)
+
+_DEFAULT_HEADERS = {
+    "User-Agent": USER_AGENT,
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.5,tr;q=0.3",
+}
+
+
+class FetchError(RuntimeError):
+    """Raised when a response is not worth downloading (e.g. binary content)."""
+
+
+def _is_textual(content_type: str) -> bool:
+    # Servers that omit the header usually serve HTML
+    return not content_type or content_type.startswith("text/") or content_type in _TEXT_CONTENT_TYPES
+
+
+@dataclass
+class FetchResult:
+    """A downloaded HTTP response."""
+
+    url: str
+    status: int
+    # Case-insensitive, so ``headers.get("ETag")`` matches an ``Etag`` header too
+    headers: CIMultiDict = field(default_factory=CIMultiDict)
+    body: bytes = b""
+    charset: str | None = None
+    truncated: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.status == 200
+
+    @property
+    def text(self) -> str:
+        """Body decoded with the declared charset, falling back to UTF-8."""
+        try:
+            return self.body.decode(self.charset or "utf-8", errors="replace")
+        except LookupError:
+            return self.body.decode("utf-8", errors="replace")
+
+
+class FetchClient:
+    """Shared, connection-pooling HTTP client for page downloads."""
+
+    def __init__(
+        self,
+        limit: int = 100,
+        limit_per_host: int = 6,
+        ttl_dns_cache: int = 300,
+        max_redirects: int = 5,
+        max_bytes: int = 512 * 1024,
+    ):
+        """
+        Args:
+            limit:          Maximum simultaneous connections overall.
+            limit_per_host: Maximum simultaneous connections to one host.
+            ttl_dns_cache:  Seconds to keep resolved DNS entries.
+            max_redirects:  Redirects followed before giving up.
+            max_bytes:      Default byte budget per response body.
+        """
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.ttl_dns_cache = ttl_dns_cache
+        self.max_redirects = max_redirects
+        self.max_bytes = max_bytes
+        self._sessions: dict[asyncio.AbstractEventLoop, aiohttp.ClientSession] = {}
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    async def _release(session: aiohttp.ClientSession) -> None:
+        """Close the session of a loop that has been closed; its sockets went with the loop."""
+        connector = session.connector
+        session.detach()
+        if connector is not None:
+            try:
+                await connector.close()
+            except RuntimeError as e:
+                logger.debug("Could not close connector of a closed loop: %s", e)
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        # A session is bound to the loop it was created on
+        loop = asyncio.get_running_loop()
+        session = self._sessions.get(loop)
+        if session is None or session.closed:
+            for stale_loop in [other for other in self._sessions if other.is_closed()]:
+                await self._release(self._sessions.pop(stale_loop))
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                ttl_dns_cache=self.ttl_dns_cache,
+                enable_cleanup_closed=True,
+            )
+            session = aiohttp.ClientSession(connector=connector, headers=_DEFAULT_HEADERS)
+            self._sessions[loop] = session
+            logger.debug("Created shared fetch session (limit=%d, per_host=%d)", self.limit, self.limit_per_host)
+        return session
+
+    async def _check_robots(self, url: str, domain: str, timeout: float = _ROBOTS_TIMEOUT) -> None:
+        """Read robots.txt of *domain* once and hand its Crawl-delay to the rate limiter."""
+        if not await rate_limiter.needs_robots(domain):
+            return
+        # Mark as checked right away so concurrent requests don't fetch it too
+        rate_limiter.set_crawl_delay(domain, None)
+
+        parsed = urlparse(url)
+        robots_url = f"{parsed.scheme}://{parsed.netloc}/robots.txt"
+        try:
+            session = await self._get_session()
+            async with session.get(robots_url, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                if response.status != 200:
+                    return
+                body = await response.content.read(_ROBOTS_MAX_BYTES)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.debug("robots.txt unavailable for %s: %s", domain, e)
+            return
+
+        parser = RobotFileParser()
+        parser.parse(body.decode("utf-8", errors="replace").splitlines())
+        crawl_delay = parser.crawl_delay(USER_AGENT)
+        if crawl_delay:
+            logger.info("robots.txt of %s asks for Crawl-delay %ss", domain, crawl_delay)
+            rate_limiter.set_crawl_delay(domain, float(crawl_delay))
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    async def fetch(
+        self,
+        url: str,
+        timeout: float = 15,
+        headers: dict[str, str] | None = None,
+        rate_limit: bool = True,
+        max_bytes: int | None = None,
+    ) -> FetchResult:
+        """Download *url* and return the response.
+
+        Only the first *max_bytes* of the body are read; ``truncated`` is set
+        on the result when the page was longer.  Bodies of non-200 responses
+        are not read at all.
+
+        Args:
+            url:        Page to download.
+            timeout:    Total seconds allowed for the request, including a first
+                        read of the domain's robots.txt (but not the rate
+                        limiter's wait).
+            headers:    Extra request headers.
+            rate_limit: Wait for the per-domain rate limiter first.
+            max_bytes:  Byte budget for the body; defaults to ``self.max_bytes``.
+
+        Raises:
+            FetchError: The response is not a text/HTML document.
+            aiohttp.ClientError / asyncio.TimeoutError: Network failures.
+        """
+        domain = extract_domain(url)
+        if rate_limit:
+            robots_started = time.monotonic()
+            await self._check_robots(url, domain, timeout=min(_ROBOTS_TIMEOUT, timeout / 3))
+            timeout -= time.monotonic() - robots_started
+            await rate_limiter.wait(domain)
+
+        budget = max_bytes or self.max_bytes
+        session = await self._get_session()
+        started = time.monotonic()
+        async with session.get(
+            url,
+            headers=headers,
+            timeout=aiohttp.ClientTimeout(total=timeout),
+            allow_redirects=True,
+            max_redirects=self.max_redirects,
+        ) as response:
+            rate_limiter.record_response(
+                domain,
+                response.status,
+                latency=time.monotonic() - started,
+                retry_after=parse_retry_after(response.headers.get("Retry-After")),
+            )
+            result = FetchResult(
+                url=str(response.url),
+                status=response.status,
+                headers=CIMultiDict(response.headers),
+                charset=response.charset,
+            )
+            if response.status != 200:
+                return result
+
+            # response.content_type reports octet-stream for a missing header
+            content_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+            if not _is_textual(content_type):
+                raise FetchError(f"Unsupported content type '{content_type}': {url}")
+
+            expected = response.content_length
+            if expected is not None and expected > budget:
+                logger.debug("Reading %d of %d bytes from %s", budget, expected, url)
+
+            buffer = bytearray()
+            async for chunk in response.content.iter_chunked(_CHUNK_SIZE):
+                buffer.extend(chunk)
+                if len(buffer) >= budget:
+                    break
+
+            result.truncated = len(buffer) >= budget and (expected is None or expected > budget)
+            result.body = bytes(buffer[:budget])
+            return result
+
+    async def close(self) -> None:
+        """Close the shared sessions of every loop (call on application shutdown)."""
+        current = asyncio.get_running_loop()
+        sessions, self._sessions = self._sessions, {}
+        for loop, session in sessions.items():
+            if session.closed:
+                continue
+            if loop is current:
+                await session.close()
+            elif loop.is_running():
+                await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(session.close(), loop))
+            else:
+                await self._release(session)
+
+
+# Module-level singleton so every module can ``from utils.fetch_client import fetch_client``
+fetch_client = FetchClient()
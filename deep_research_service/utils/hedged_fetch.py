@@ -0,0 +1,157 @@
+"""
+Hedged source fetching: get N usable pages without waiting on slow hosts.
+
+A research run needs a handful of usable sources, not every search hit.
+``fetch_first_n`` starts fetching the best *target* candidates in
+parallel.  Whenever a fetch fails, or runs past the current deadline (a
+high percentile of recently observed fetch latencies), the next-best
+candidate is started alongside it; whichever fetches finish first win.
+Once *target* usable pages are in, the remaining stragglers are
+cancelled.
+
+Usage:
+    from utils.hedged_fetch import fetch_first_n
+
+    fetched = await fetch_first_n(results, lambda r: download(r["url"]), target=8)
+    for result, content in fetched:
+        ...
+"""
+
+import asyncio
+import time
+import logging
+from collections import deque
+from typing import Awaitable, Callable, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Until this many latencies are known the default deadline is used
+_MIN_SAMPLES = 10
+
+
+class LatencyTracker:
+    """Rolling window of fetch latencies, used to derive a hedging deadline."""
+
+    def __init__(
+        self,
+        window: int = 200,
+        percentile: float = 0.9,
+        default_deadline: float = 5.0,
+        min_deadline: float = 1.5,
+        max_deadline: float = 12.0,
+    ):
+        """
+        Args:
+            window:           Number of recent latencies kept.
+            percentile:       Latency percentile used as the deadline.
+            default_deadline: Deadline while there are too few samples.
+            min_deadline:     Lower bound for the deadline.
+            max_deadline:     Upper bound for the deadline.
+        """
+        self.percentile = percentile
+        self.default_deadline = default_deadline
+        self.min_deadline = min_deadline
+        self.max_deadline = max_deadline
+        self._samples: deque[float] = deque(maxlen=window)
+
+    def record(self, latency: float) -> None:
+        self._samples.append(latency)
+
+    def deadline(self) -> float:
+        """Seconds after which a running fetch gets a hedge."""
+        if len(self._samples) < _MIN_SAMPLES:
+            return self.default_deadline
+        ordered = sorted(self._samples)
+        value = ordered[min(len(ordered) - 1, int(len(ordered) * self.percentile))]
+        return min(self.max_deadline, max(self.min_deadline, value))
+
+
+async def fetch_first_n(
+    candidates: list[T],
+    fetch: Callable[[T], Awaitable[R]],
+    target: int,
+    tracker: LatencyTracker | None = None,
+    max_in_flight: int | None = None,
+) -> list[tuple[T, R]]:
+    """Fetch candidates in rank order until *target* usable results are in.
+
+    Args:
+        candidates:    Items to fetch, best first.
+        fetch:         Coroutine function returning the content of an item;
+                       a falsy return value or an exception marks it unusable.
+        target:        Number of usable results wanted.
+        tracker:       Latency statistics for the hedging deadline; defaults
+                       to the shared ``latency_tracker``.
+        max_in_flight: Cap on concurrent fetches (default ``2 * target``).
+
+    Returns:
+        ``(candidate, content)`` pairs in the candidates' original order.
+    """
+    tracker = tracker or latency_tracker
+    max_in_flight = max_in_flight or 2 * target
+    deadline = tracker.deadline()
+
+    results: dict[int, tuple[T, R]] = {}
+    # task -> (candidate index, start time)
+    running: dict[asyncio.Task, tuple[int, float]] = {}
+    next_index = 0
+
+    def top_up() -> None:
+        # Keep one fetch within its deadline for every missing result;
+        # fetches past the deadline keep running and may still win
+        nonlocal next_index
+        now = time.monotonic()
+        healthy = sum(1 for _, started in running.values() if now - started < deadline)
+        while (
+            healthy < target - len(results)
+            and next_index < len(candidates)
+            and len(running) < max_in_flight
+        ):
+            task = asyncio.ensure_future(fetch(candidates[next_index]))
+            running[task] = (next_index, time.monotonic())
+            next_index += 1
+            healthy += 1
+
+    try:
+        top_up()
+        while running and len(results) < target:
+            now = time.monotonic()
+            pending_deadlines = [
+                started + deadline - now for _, started in running.values() if now - started < deadline
+            ]
+            timeout = max(0.0, min(pending_deadlines)) if pending_deadlines else None
+
+            done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+            for task in done:
+                index, started = running.pop(task)
+                try:
+                    content = task.result()
+                except Exception as e:
+                    logger.debug("Fetch of candidate %d failed: %s", index, e)
+                    content = None
+
+                if content:
+                    tracker.record(time.monotonic() - started)
+                    results[index] = (candidates[index], content)
+
+            if len(results) < target:
+                top_up()
+    finally:
+        for task in running:
+            task.cancel()
+        if running:
+            await asyncio.gather(*running, return_exceptions=True)
+
+    logger.info(
+        "Hedged fetch: %d/%d usable from %d started (deadline %.1fs, %d stragglers cancelled)",
+        len(results), target, next_index, deadline, len(running),
+    )
+    return [results[index] for index in sorted(results)][:target]
+
+
+# Shared across research runs so the deadline reflects recent network conditions
+latency_tracker = LatencyTracker()
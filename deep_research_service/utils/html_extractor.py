@@ -0,0 +1,378 @@
+"""
+Fast HTML-to-text extraction with boilerplate removal.
+
+Pages are parsed with the fastest backend that is installed
+(selectolax > lxml > BeautifulSoup's html.parser > a regex fallback).
+The main content is found jusText/readability-style: navigation, cookie
+banners, sidebars and similar containers are dropped by tag and by whole
+class/id tokens (``cookie-banner`` but not ``has-sidebar``), then every
+paragraph-like block is scored by its text length and link density.  Only
+dense, link-poor blocks (plus the headings that introduce them) are kept.
+The page's ``<main>``/``<article>`` element and its ancestors are never
+dropped.  Pages without such blocks fall back to the cleaned body text.
+
+Usage:
+    from utils.html_extractor import extract
+
+    page = extract(html)
+    page.title, page.description, page.text
+
+Run ``python -m utils.html_extractor [page.html ...]`` to benchmark the
+installed backends.
+"""
+
+import html as html_module
+import re
+import time
+import logging
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser  # type: ignore
+except ImportError:
+    HTMLParser = None  # type: ignore
+
+try:
+    import lxml.html as lxml_html  # type: ignore
+except ImportError:
+    lxml_html = None  # type: ignore
+
+try:
+    from bs4 import BeautifulSoup  # type: ignore
+except ImportError:
+    BeautifulSoup = None  # type: ignore
+
+
+# Elements that never carry visible text
+_INVISIBLE_TAGS = ("script", "style", "noscript", "template", "iframe", "object", "embed", "svg", "canvas")
+# Page furniture around the content.  Not <form>: ASP.NET pages wrap the whole body in one.
+_LAYOUT_TAGS = ("button", "select", "nav", "footer", "header", "aside")
+
+# Paragraph-like blocks scored by the main-content detector
+_BLOCK_TAGS = (
+    "p", "pre", "blockquote", "li", "td", "dd", "dt", "figcaption",
+    "h1", "h2", "h3", "h4", "h5", "h6",
+)
+_HEADING_TAGS = frozenset(("h1", "h2", "h3", "h4", "h5", "h6"))
+
+# Matched against single class/id tokens; the words must stand alone or between - / _
+_BOILERPLATE_RE = re.compile(
+    r"(?:^|[-_])(?:cookies?|consent|gdpr|banners?|sidebars?|side-bar|widgets?|menus?|navbar|breadcrumbs?|"
+    r"footer|masthead|share|sharing|social|newsletter|subscribe|signup|adverts?|advertisement|sponsors?|"
+    r"sponsored|promos?|popup|modal|related|recommended|comments?|disqus|pagination|pager|skip-link)(?:$|[-_])",
+    re.IGNORECASE,
+)
+# Class tokens describing state or JS hooks (``has-sidebar``, ``js-share-tracking``), not what the element is
+_MODIFIER_PREFIXES = ("js-", "has-", "is-", "with-", "no-")
+
+_WS_RE = re.compile(r"\s+")
+
+# A block is content when it is long enough and mostly not link text
+_MIN_BLOCK_CHARS = 60
+_MAX_LINK_DENSITY = 0.35
+# Below this much detected content the whole body text is used instead
+_MIN_MAIN_CHARS = 250
+
+
+@dataclass
+class ExtractedPage:
+    """Result of :func:`extract`."""
+
+    title: str
+    description: str
+    text: str
+    backend: str
+
+
+def _clean(text: str) -> str:
+    return _WS_RE.sub(" ", text).strip()
+
+
+def _is_boilerplate(attrs: str) -> bool:
+    """Whether a whole-word class/id token in *attrs* names page furniture."""
+    for token in attrs.lower().split():
+        if not token.startswith(_MODIFIER_PREFIXES) and _BOILERPLATE_RE.search(token):
+            return True
+    return False
+
+
+def _fallback_text(pruned: str, unpruned: str) -> str:
+    """Body text used when no content blocks were found.
+
+    The pruned body is preferred; when pruning left too little (markup the
+    boilerplate rules misjudged), the body as it was before pruning is used.
+    """
+    return pruned if len(pruned) >= _MIN_MAIN_CHARS else unpruned
+
+
+def _select_main_text(blocks: list[tuple[str, str, int]]) -> str:
+    """Pick content blocks from ``(tag, text, link_chars)`` tuples in document order."""
+    kept: list[str] = []
+    pending_heading: str | None = None
+
+    for tag, text, link_chars in blocks:
+        if not text:
+            continue
+        if tag in _HEADING_TAGS:
+            pending_heading = text
+            continue
+
+        link_density = link_chars / len(text)
+        if len(text) >= _MIN_BLOCK_CHARS and link_density <= _MAX_LINK_DENSITY:
+            if pending_heading:
+                kept.append(pending_heading)
+            kept.append(text)
+        pending_heading = None
+
+    return "\n".join(kept)
+
+
+# ----------------------------------------------------------------------
+# Backends
+# ----------------------------------------------------------------------
+
+
+def _extract_selectolax(html: str, include_text: bool) -> tuple[str, str, list, str]:
+    tree = HTMLParser(html)
+
+    title_node = tree.css_first("title")
+    title = _clean(title_node.text()) if title_node else ""
+    meta = tree.css_first('meta[name="description"]') or tree.css_first('meta[property="og:description"]')
+    description = _clean(meta.attributes.get("content") or "") if meta else ""
+    if not include_text:
+        return title, description, [], ""
+
+    tree.strip_tags(list(_INVISIBLE_TAGS))
+    body = tree.body or tree.root
+    if body is None:
+        return title, description, [], ""
+    unpruned = _clean(body.text(deep=True, separator=" "))
+
+    # The main/article element and its ancestors always stay
+    protected = set()
+    node = body.css_first("main") or body.css_first('[role="main"]') or body.css_first("article")
+    while node is not None:
+        protected.add(node.mem_id)
+        node = node.parent
+
+    # Innermost first, so no node is touched after an ancestor was freed
+    for node in reversed(body.css(", ".join(("[class]", "[id]") + _LAYOUT_TAGS))):
+        if node.mem_id in protected:
+            continue
+        attrs = f"{node.attributes.get('class') or ''} {node.attributes.get('id') or ''}"
+        if node.tag in _LAYOUT_TAGS or _is_boilerplate(attrs):
+            node.decompose()
+
+    nodes = body.css(", ".join(_BLOCK_TAGS))
+    block_ids = {node.mem_id for node in nodes}
+    # Blocks containing other blocks are skipped; the inner ones are scored individually
+    containers = set()
+    for node in nodes:
+        parent = node.parent
+        while parent is not None:
+            if parent.mem_id in block_ids:
+                containers.add(parent.mem_id)
+            parent = parent.parent
+
+    blocks = []
+    for node in nodes:
+        if node.mem_id in containers:
+            continue
+        text = _clean(node.text(deep=True, separator=" "))
+        link_chars = sum(len(_clean(a.text(deep=True, separator=" "))) for a in node.css("a"))
+        blocks.append((node.tag, text, link_chars))
+
+    return title, description, blocks, _fallback_text(_clean(body.text(deep=True, separator=" ")), unpruned)
+
+
+def _extract_lxml(html: str, include_text: bool) -> tuple[str, str, list, str]:
+    doc = lxml_html.document_fromstring(html)
+
+    title = _clean(doc.findtext(".//title") or "")
+    meta = doc.xpath('//meta[@name="description"]/@content | //meta[@property="og:description"]/@content')
+    description = _clean(meta[0]) if meta else ""
+    if not include_text:
+        return title, description, [], ""
+
+    for el in list(doc.iter(*_INVISIBLE_TAGS)):
+        el.drop_tree()
+    body = doc.find("body")
+    if body is None:
+        body = doc
+    unpruned = _clean(body.text_content())
+
+    # The main/article element and its ancestors always stay
+    protected = set()
+    main = body.find(".//main")
+    if main is None:
+        main = next(iter(body.xpath('.//*[@role="main"] | .//article')), None)
+    if main is not None:
+        protected.add(main)
+        protected.update(main.iterancestors())
+
+    for el in reversed(list(body.iter())):
+        if not isinstance(el.tag, str) or el in protected or el.getparent() is None:
+            continue
+        if el.tag in _LAYOUT_TAGS or _is_boilerplate(f"{el.get('class') or ''} {el.get('id') or ''}"):
+            el.drop_tree()
+
+    blocks = []
+    for el in body.iter(*_BLOCK_TAGS):
+        if any(True for _ in el.iterdescendants(*_BLOCK_TAGS)):
+            continue
+        text = _clean(el.text_content())
+        link_chars = sum(len(_clean(a.text_content())) for a in el.iter("a"))
+        blocks.append((el.tag, text, link_chars))
+
+    return title, description, blocks, _fallback_text(_clean(body.text_content()), unpruned)
+
+
+def _extract_html_parser(html: str, include_text: bool) -> tuple[str, str, list, str]:
+    soup = BeautifulSoup(html, "html.parser")
+
+    title = _clean(soup.title.get_text()) if soup.title else ""
+    meta = soup.find("meta", attrs={"name": "description"}) or soup.find("meta", attrs={"property": "og:description"})
+    description = _clean(meta.get("content", "")) if meta else ""
+    if not include_text:
+        return title, description, [], ""
+
+    for tag in reversed(soup(list(_INVISIBLE_TAGS))):
+        tag.decompose()
+    body = soup.body or soup
+    unpruned = _clean(body.get_text(" "))
+
+    # The main/article element and its ancestors always stay
+    protected = set()
+    main = body.find("main") or body.find(attrs={"role": "main"}) or body.find("article")
+    if main is not None:
+        protected = {id(main)} | {id(parent) for parent in main.parents}
+
+    candidates = body.find_all(lambda t: t.name in _LAYOUT_TAGS or t.has_attr("class") or t.has_attr("id"))
+    for tag in reversed(candidates):
+        if id(tag) in protected:
+            continue
+        classes = tag.get("class") or []
+        attrs = f"{' '.join(classes) if isinstance(classes, list) else classes} {tag.get('id') or ''}"
+        if tag.name in _LAYOUT_TAGS or _is_boilerplate(attrs):
+            tag.decompose()
+
+    blocks = []
+    for tag in body.find_all(list(_BLOCK_TAGS)):
+        if tag.find(list(_BLOCK_TAGS)) is not None:
+            continue
+        text = _clean(tag.get_text(" "))
+        link_chars = sum(len(_clean(a.get_text(" "))) for a in tag.find_all("a"))
+        blocks.append((tag.name, text, link_chars))
+
+    return title, description, blocks, _fallback_text(_clean(body.get_text(" ")), unpruned)
+
+
+_REGEX_DROP_RE = re.compile(
+    r"<(script|style|noscript|template|svg|nav|footer|header|aside)\b.*?</\1\s*>", re.IGNORECASE | re.DOTALL
+)
+_REGEX_TAG_RE = re.compile(r"<[^>]+>")
+_REGEX_TITLE_RE = re.compile(r"<title[^>]*>(.*?)</title\s*>", re.IGNORECASE | re.DOTALL)
+_REGEX_META_RE = re.compile(
+    r"<meta[^>]+name=[\"']description[\"'][^>]*content=[\"']([^\"']*)[\"']", re.IGNORECASE
+)
+
+
+def _extract_regex(html: str, include_text: bool) -> tuple[str, str, list, str]:
+    title_match = _REGEX_TITLE_RE.search(html)
+    title = _clean(html_module.unescape(title_match.group(1))) if title_match else ""
+    meta_match = _REGEX_META_RE.search(html)
+    description = _clean(html_module.unescape(meta_match.group(1))) if meta_match else ""
+    if not include_text:
+        return title, description, [], ""
+
+    text = _REGEX_TAG_RE.sub(" ", _REGEX_DROP_RE.sub(" ", html))
+    return title, description, [], _clean(html_module.unescape(text))
+
+
+_BACKENDS = {
+    "selectolax": (_extract_selectolax, HTMLParser is not None),
+    "lxml": (_extract_lxml, lxml_html is not None),
+    "html.parser": (_extract_html_parser, BeautifulSoup is not None),
+    "regex": (_extract_regex, True),
+}
+
+
+def available_backends() -> list[str]:
+    """Installed backends, fastest first."""
+    return [name for name, (_, available) in _BACKENDS.items() if available]
+
+
+DEFAULT_BACKEND = available_backends()[0]
+
+
+# ----------------------------------------------------------------------
+# Public API
+# ----------------------------------------------------------------------
+
+
+def extract(html: str, backend: str | None = None, include_text: bool = True) -> ExtractedPage:
+    """Extract title, meta description and main text from *html*.
+
+    Args:
+        html:         Page source.  Truncated documents are fine.
+        backend:      Force a parser backend; defaults to the fastest installed.
+        include_text: ``False`` only reads title/description (cheaper).
+    """
+    name = backend or DEFAULT_BACKEND
+    func, available = _BACKENDS[name]
+    if not available:
+        raise ValueError(f"HTML extractor backend '{name}' is not installed")
+
+    try:
+        title, description, blocks, full_text = func(html, include_text)
+    except Exception as e:
+        # Broken markup should never lose the page; the regex pass always works
+        logger.debug("Extractor backend %s failed (%s), using regex fallback", name, e)
+        name = "regex"
+        title, description, blocks, full_text = _extract_regex(html, include_text)
+
+    text = _select_main_text(blocks) if blocks else ""
+    if len(text) < _MIN_MAIN_CHARS:
+        text = full_text
+
+    return ExtractedPage(title=title, description=description, text=text, backend=name)
+
+
+# ----------------------------------------------------------------------
+# Benchmark
+# ----------------------------------------------------------------------
+
+
+def _synthetic_page(paragraphs: int = 400) -> str:
+    nav = "".join(f'<li><a href="/p{i}">Menu item {i}</a></li>' for i in range(60))
+    body = "".join(
+        f"<h2>Section {i}</h2><p>Paragraph {i} explains the topic in detail, with numbers such as "
+        f"{i * 17} GB and {i * 3}% growth, and a <a href='#r{i}'>reference</a> to another source.</p>"
+        for i in range(paragraphs)
+    )
+    return (
+        "<html><head><title>Benchmark page</title>"
+        '<meta name="description" content="Synthetic page for extractor benchmarks">'
+        "<script>var tracking = {};</script><style>body{}</style></head><body>"
+        f'<nav><ul>{nav}</ul></nav><div class="cookie-banner">We use cookies</div>'
+        f'<main><article>{body}</article></main><div id="sidebar">{nav}</div>'
+        "<footer>Copyright</footer></body></html>"
+    )
+
+
+if __name__ == "__main__":
+    import sys
+
+    pages = [open(path, encoding="utf-8", errors="replace").read() for path in sys.argv[1:]] or [_synthetic_page()]
+    rounds = 20
+
+    print(f"{'backend':<12} {'ms/page':>9} {'chars':>8}")
+    for name in available_backends():
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for page in pages:
+                result = extract(page, backend=name)
+        elapsed = (time.perf_counter() - start) / (rounds * len(pages))
+        print(f"{name:<12} {elapsed * 1000:>9.2f} {len(result.text):>8}")
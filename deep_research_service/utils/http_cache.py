@@ -0,0 +1,348 @@
+"""
+Persistent, content-addressed cache of extracted web pages.
+
+Popular pages (Wikipedia, arXiv, vendor docs) come up in many research
+runs.  Instead of downloading and parsing them every time, the extracted
+title/description/text is stored zlib-compressed in SQLite together with
+the response's ``ETag`` and ``Last-Modified`` validators.
+
+* Entries younger than ``max_age`` are served without touching the network.
+* Older entries are revalidated with a conditional GET; a ``304`` keeps
+  the stored text (see ``utils.page_fetcher``).
+* Text is stored once per SHA-256 of its content, so mirrors serving the
+  same article share one blob.
+* The blob store is kept under ``max_bytes`` by evicting the least
+  recently used URLs.  The size is tracked as a running total and reads
+  only note the access time in memory; both are written with the next
+  ``put``/``touch`` (or ``flush``), so a cache hit costs no write.
+
+The methods are blocking SQLite calls; async code runs them in a thread
+(see ``utils.page_fetcher``).  The database file is created on first use,
+so importing the module touches nothing on disk.
+
+Usage:
+    from utils.http_cache import http_cache
+
+    cached = http_cache.get(url)
+    if cached and cached.is_fresh(http_cache.max_age):
+        return cached.page
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import zlib
+import logging
+from dataclasses import dataclass
+
+from utils.html_extractor import ExtractedPage
+
+logger = logging.getLogger(__name__)
+
+# Default DB location: next to this file, inside the service directory
+_DEFAULT_DB_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "http_cache.db",
+)
+
+_DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+# Pages younger than this are used without revalidation
+_DEFAULT_MAX_AGE = 6 * 60 * 60
+# Buffered access times are written once this many reads are pending
+_ACCESS_FLUSH_SIZE = 64
+# LRU candidates read per eviction query
+_EVICT_BATCH = 50
+
+
+@dataclass
+class CachedPage:
+    """A cache entry: the extracted page plus its HTTP validators."""
+
+    page: ExtractedPage
+    etag: str | None
+    last_modified: str | None
+    fetched_at: float
+
+    def is_fresh(self, max_age: float) -> bool:
+        return time.time() - self.fetched_at <= max_age
+
+    def validators(self) -> dict[str, str]:
+        """Headers for a conditional GET."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+@dataclass
+class CacheRunStats:
+    """Per-run counters for page cache usage."""
+
+    hits: int = 0
+    revalidated: int = 0
+    misses: int = 0
+
+    @property
+    def lookups(self) -> int:
+        return self.hits + self.revalidated + self.misses
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of pages served from cache (fresh or revalidated)."""
+        return (self.hits + self.revalidated) / self.lookups if self.lookups else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.hit_rate:.0%} ({self.hits} fresh, {self.revalidated} revalidated, "
+            f"{self.misses} downloaded)"
+        )
+
+
+class HttpPageCache:
+    """SQLite store of extracted pages keyed by URL, deduplicated by content."""
+
+    def __init__(
+        self,
+        db_path: str = _DEFAULT_DB_PATH,
+        max_bytes: int = _DEFAULT_MAX_BYTES,
+        max_age: float = _DEFAULT_MAX_AGE,
+    ):
+        """
+        Args:
+            db_path:   Path to the SQLite database file.
+            max_bytes: Upper bound for the total size of compressed page text.
+            max_age:   Seconds an entry is used without revalidation.
+        """
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        # Guards the running size total and the buffered access times
+        self._lock = threading.Lock()
+        self._total_bytes = 0
+        self._pending_access: dict[str, float] = {}
+        # The database file is created on first use, not at import
+        self._initialised = False
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        if not self._initialised:
+            self._ensure_tables(conn)
+        return conn
+
+    def _ensure_tables(self, conn: sqlite3.Connection) -> None:
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS pages (
+                    url            TEXT PRIMARY KEY,
+                    content_hash   TEXT NOT NULL,
+                    title          TEXT NOT NULL,
+                    description    TEXT NOT NULL,
+                    etag           TEXT,
+                    last_modified  TEXT,
+                    fetched_at     REAL NOT NULL,
+                    accessed_at    REAL NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS contents (
+                    content_hash  TEXT PRIMARY KEY,
+                    text          BLOB NOT NULL,
+                    size          INTEGER NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_pages_accessed ON pages (accessed_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_pages_content ON pages (content_hash)")
+            conn.commit()
+            self._total_bytes = conn.execute("SELECT COALESCE(SUM(size), 0) FROM contents").fetchone()[0]
+            self._initialised = True
+            logger.info("HTTP page cache initialised at %s", self.db_path)
+        except Exception as e:
+            logger.error("Failed to initialise HTTP page cache: %s", e)
+
+    def _write_access_times(self, conn: sqlite3.Connection) -> None:
+        """Write the buffered access times (caller holds ``_lock``)."""
+        if self._pending_access:
+            conn.executemany(
+                "UPDATE pages SET accessed_at = ? WHERE url = ?",
+                [(accessed_at, url) for url, accessed_at in self._pending_access.items()],
+            )
+            self._pending_access.clear()
+
+    def _drop_orphan(self, conn: sqlite3.Connection, content_hash: str) -> int:
+        """Delete the blob *content_hash* if no page references it; returns the bytes freed."""
+        if conn.execute("SELECT 1 FROM pages WHERE content_hash = ? LIMIT 1", (content_hash,)).fetchone():
+            return 0
+        row = conn.execute("SELECT size FROM contents WHERE content_hash = ?", (content_hash,)).fetchone()
+        if row is None:
+            return 0
+        conn.execute("DELETE FROM contents WHERE content_hash = ?", (content_hash,))
+        return row[0]
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        """Drop least recently used URLs until the blobs fit ``max_bytes`` (caller holds ``_lock``)."""
+        if self._total_bytes <= self.max_bytes:
+            return
+        # Other processes share the file; resync before deleting anything
+        self._total_bytes = conn.execute("SELECT COALESCE(SUM(size), 0) FROM contents").fetchone()[0]
+        while self._total_bytes > self.max_bytes:
+            victims = conn.execute(
+                "SELECT url, content_hash FROM pages ORDER BY accessed_at LIMIT ?", (_EVICT_BATCH,)
+            ).fetchall()
+            if not victims:
+                break
+            evicted = freed = 0
+            for url, content_hash in victims:
+                if self._total_bytes <= self.max_bytes:
+                    break
+                conn.execute("DELETE FROM pages WHERE url = ?", (url,))
+                size = self._drop_orphan(conn, content_hash)
+                self._total_bytes -= size
+                evicted += 1
+                freed += size
+            logger.debug("HTTP page cache evicted %d URLs, %d bytes", evicted, freed)
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def get(self, url: str) -> CachedPage | None:
+        """Return the cached entry for *url* (fresh or stale), or ``None``."""
+        try:
+            conn = self._connect()
+            row = conn.execute(
+                """
+                SELECT p.title, p.description, p.etag, p.last_modified, p.fetched_at, c.text
+                FROM pages p JOIN contents c ON c.content_hash = p.content_hash
+                WHERE p.url = ?
+                """,
+                (url,),
+            ).fetchone()
+            conn.close()
+
+            if row is None:
+                return None
+
+            with self._lock:
+                self._pending_access[url] = time.time()
+                flush = len(self._pending_access) >= _ACCESS_FLUSH_SIZE
+            if flush:
+                self.flush()
+
+            title, description, etag, last_modified, fetched_at, blob = row
+            page = ExtractedPage(
+                title=title,
+                description=description,
+                text=zlib.decompress(blob).decode("utf-8"),
+                backend="cache",
+            )
+            return CachedPage(page=page, etag=etag, last_modified=last_modified, fetched_at=fetched_at)
+
+        except Exception as e:
+            logger.error("HTTP page cache get error: %s", e)
+            return None
+
+    def put(self, url: str, page: ExtractedPage, etag: str | None = None, last_modified: str | None = None) -> None:
+        """Store the extracted *page* for *url* with its validators."""
+        content_hash = hashlib.sha256(page.text.encode("utf-8")).hexdigest()
+        now = time.time()
+        try:
+            with self._lock:
+                conn = self._connect()
+                self._write_access_times(conn)
+                exists = conn.execute("SELECT 1 FROM contents WHERE content_hash = ?", (content_hash,)).fetchone()
+                if exists is None:
+                    blob = zlib.compress(page.text.encode("utf-8"), 6)
+                    conn.execute(
+                        "INSERT INTO contents (content_hash, text, size) VALUES (?, ?, ?)",
+                        (content_hash, blob, len(blob)),
+                    )
+                    self._total_bytes += len(blob)
+                else:
+                    logger.debug("HTTP page cache: %s shares content with an existing page", url)
+                previous = conn.execute("SELECT content_hash FROM pages WHERE url = ?", (url,)).fetchone()
+                conn.execute(
+                    """
+                    INSERT OR REPLACE INTO pages
+                        (url, content_hash, title, description, etag, last_modified, fetched_at, accessed_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (url, content_hash, page.title, page.description, etag, last_modified, now, now),
+                )
+                # Only the blob this write replaced can have become unreferenced
+                if previous is not None and previous[0] != content_hash:
+                    self._total_bytes -= self._drop_orphan(conn, previous[0])
+                self._evict(conn)
+                conn.commit()
+                conn.close()
+        except Exception as e:
+            logger.error("HTTP page cache put error: %s", e)
+
+    def touch(self, url: str) -> None:
+        """Mark *url* as freshly validated (after a ``304 Not Modified``)."""
+        try:
+            with self._lock:
+                conn = self._connect()
+                self._write_access_times(conn)
+                now = time.time()
+                conn.execute("UPDATE pages SET fetched_at = ?, accessed_at = ? WHERE url = ?", (now, now, url))
+                conn.commit()
+                conn.close()
+        except Exception as e:
+            logger.error("HTTP page cache touch error: %s", e)
+
+    def flush(self) -> None:
+        """Write access times buffered by ``get``."""
+        try:
+            with self._lock:
+                if not self._pending_access:
+                    return
+                conn = self._connect()
+                self._write_access_times(conn)
+                conn.commit()
+                conn.close()
+        except Exception as e:
+            logger.error("HTTP page cache flush error: %s", e)
+
+    def clear(self) -> None:
+        """Purge all cached pages."""
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.execute("DELETE FROM pages")
+                conn.execute("DELETE FROM contents")
+                conn.commit()
+                conn.close()
+                self._total_bytes = 0
+                self._pending_access.clear()
+            logger.info("HTTP page cache cleared")
+        except Exception as e:
+            logger.error("HTTP page cache clear error: %s", e)
+
+    def stats(self) -> dict:
+        """Return page/blob counts and the stored size."""
+        try:
+            conn = self._connect()
+            pages = conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+            blobs, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM contents").fetchone()
+            conn.close()
+            return {"pages": pages, "unique_contents": blobs, "bytes": size}
+        except Exception as e:
+            logger.error("HTTP page cache stats error: %s", e)
+            return {"pages": 0, "unique_contents": 0, "bytes": 0}
+
+
+# Module-level singleton
+http_cache = HttpPageCache()
@@ -0,0 +1,103 @@
+"""
+In-memory cache for extracted page text.
+
+The search stage of a research run already downloads Google hits to read
+their ``<title>`` and meta description; the extraction stage then needs
+the text of the very same pages.  Putting the text into a ``PageCache``
+during the first fetch lets the second stage reuse it instead of
+downloading and parsing the page again.
+
+A researcher normally owns a fresh cache per run.  Passing the
+module-level ``shared_page_cache`` instead keeps bodies across runs for
+``ttl`` seconds.  The cache is only used from the event loop and is not
+thread-safe.
+
+Usage:
+    from utils.page_cache import PageCache
+
+    cache = PageCache()
+    cache.put(url, page.text)
+    ...
+    text = cache.get(url)
+    if text is None:
+        text = (await fetch_page(url)).text
+"""
+
+import time
+import logging
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# 64 MB of page text per cache
+_DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+class PageCache:
+    """Size-capped LRU mapping of URL -> page text."""
+
+    def __init__(self, max_bytes: int = _DEFAULT_MAX_BYTES, ttl: float | None = None):
+        """
+        Args:
+            max_bytes: Approximate upper bound on the total size of cached bodies.
+            ttl:       Seconds an entry stays valid.  ``None`` keeps entries
+                       until they are evicted (fine for a single run).
+        """
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, url: str) -> str | None:
+        """Return the cached text for *url*, or ``None``."""
+        entry = self._entries.get(url)
+        if entry is None:
+            self._misses += 1
+            return None
+
+        body, stored_at = entry
+        if self.ttl is not None and time.monotonic() - stored_at > self.ttl:
+            self._remove(url)
+            self._misses += 1
+            return None
+
+        self._entries.move_to_end(url)
+        self._hits += 1
+        return body
+
+    def put(self, url: str, body: str) -> None:
+        """Store *body* for *url*, evicting the least recently used entries if needed."""
+        if not body or len(body) > self.max_bytes:
+            return
+
+        if url in self._entries:
+            self._remove(url)
+        self._entries[url] = (body, time.monotonic())
+        self._size += len(body)
+
+        while self._size > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+
+    def _remove(self, url: str) -> None:
+        body, _ = self._entries.pop(url)
+        self._size -= len(body)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._size = 0
+
+    def stats(self) -> dict:
+        """Return entry count, size and hit/miss counters."""
+        return {
+            "entries": len(self._entries),
+            "bytes": self._size,
+            "hits": self._hits,
+            "misses": self._misses,
+        }
+
+
+# Cross-run cache for callers that opt in; entries are kept for an hour
+shared_page_cache = PageCache(max_bytes=256 * 1024 * 1024, ttl=60 * 60)
@@ -0,0 +1,81 @@
+"""
+Cached page fetching: download, extract and remember web pages.
+
+``fetch_page`` is the shared path from a URL to extracted page text.  It
+looks the URL up in the persistent ``http_cache`` first; fresh entries are
+returned straight away, stale ones are revalidated with a conditional GET
+(``If-None-Match`` / ``If-Modified-Since``), and only changed or unknown
+pages are downloaded through ``fetch_client`` and parsed in the
+``parse_pool``.  Cache reads and writes run in the default thread pool so
+SQLite never blocks the event loop.
+
+Usage:
+    from utils.http_cache import CacheRunStats
+    from utils.page_fetcher import fetch_page
+
+    stats = CacheRunStats()
+    page = await fetch_page(url, timeout=10, stats=stats)
+    if page:
+        page.text
+    logger.info("Page cache hit rate: %s", stats.summary())
+"""
+
+import asyncio
+import logging
+
+from utils.fetch_client import fetch_client
+from utils.html_extractor import ExtractedPage
+from utils.http_cache import CacheRunStats, HttpPageCache, http_cache
+from utils.parse_pool import parse_pool
+
+logger = logging.getLogger(__name__)
+
+
+async def fetch_page(
+    url: str,
+    timeout: float = 15,
+    max_bytes: int | None = None,
+    stats: CacheRunStats | None = None,
+    cache: HttpPageCache | None = None,
+) -> ExtractedPage | None:
+    """Return the extracted page for *url*, or ``None`` for non-200 responses.
+
+    Args:
+        url:       Page to fetch.
+        timeout:   Total seconds allowed for the download.
+        max_bytes: Byte budget for the body (see ``FetchClient.fetch``).
+        stats:     Per-run counters to update.
+        cache:     Page cache to use; defaults to the shared ``http_cache``.
+
+    Raises:
+        The network errors and ``FetchError`` of ``FetchClient.fetch``.
+    """
+    cache = cache or http_cache
+    loop = asyncio.get_running_loop()
+    cached = await loop.run_in_executor(None, cache.get, url)
+    if cached is not None and cached.is_fresh(cache.max_age):
+        if stats is not None:
+            stats.hits += 1
+        return cached.page
+
+    headers = cached.validators() if cached is not None else {}
+    response = await fetch_client.fetch(url, timeout=timeout, headers=headers or None, max_bytes=max_bytes)
+
+    if response.status == 304 and cached is not None:
+        logger.debug("Page not modified, reusing cached text: %s", url)
+        await loop.run_in_executor(None, cache.touch, url)
+        if stats is not None:
+            stats.revalidated += 1
+        return cached.page
+
+    if stats is not None:
+        stats.misses += 1
+    if not response.ok:
+        return None
+
+    page = await parse_pool.extract(response.body, response.charset)
+    if page.text:
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        await loop.run_in_executor(None, cache.put, url, page, etag, last_modified)
+    return page
@@ -0,0 +1,109 @@
+"""
+Process pool for HTML-to-text extraction off the event loop.
+
+Parsing a large page takes tens to hundreds of milliseconds of pure CPU
+time; done inside a coroutine it stalls the uvicorn event loop and every
+other client's WebSocket frames with it.  ``ParsePool`` ships the raw
+page bytes to a shared ``ProcessPoolExecutor`` and awaits the extracted
+text.  Small pages are parsed inline, where the pickling round trip would
+cost more than the parse itself.
+
+Usage:
+    from utils.parse_pool import parse_pool
+
+    page = await parse_pool.extract(result.body, result.charset)
+    page.title, page.text
+"""
+
+import asyncio
+import multiprocessing
+import os
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from utils.html_extractor import ExtractedPage, extract
+
+logger = logging.getLogger(__name__)
+
+# Pages smaller than this are parsed on the event loop
+_DEFAULT_INLINE_THRESHOLD = 48 * 1024
+
+
+def _default_workers() -> int:
+    # Leave one core for the event loop itself
+    return max(1, min(4, (os.cpu_count() or 2) - 1))
+
+
+def _decode(body: bytes | str, charset: str | None) -> str:
+    if isinstance(body, str):
+        return body
+    try:
+        return body.decode(charset or "utf-8", errors="replace")
+    except LookupError:
+        return body.decode("utf-8", errors="replace")
+
+
+def _extract_worker(body: bytes | str, charset: str | None, include_text: bool) -> ExtractedPage:
+    """Runs in a pool process: bytes in, extracted page out."""
+    return extract(_decode(body, charset), include_text=include_text)
+
+
+class ParsePool:
+    """Shared process pool for page extraction."""
+
+    def __init__(self, max_workers: int | None = None, inline_threshold: int = _DEFAULT_INLINE_THRESHOLD):
+        """
+        Args:
+            max_workers:      Pool size; defaults to the core count minus one (max 4).
+            inline_threshold: Bodies smaller than this many bytes skip the pool.
+        """
+        self.max_workers = max_workers or _default_workers()
+        self.inline_threshold = inline_threshold
+        self._executor: ProcessPoolExecutor | None = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: forking a process that runs an event loop and threads is unsafe
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            logger.info("Started HTML parse pool with %d workers", self.max_workers)
+        return self._executor
+
+    async def extract(
+        self, body: bytes | str, charset: str | None = None, include_text: bool = True
+    ) -> ExtractedPage:
+        """Extract *body* (raw page bytes or text) without blocking the event loop.
+
+        Args:
+            body:         Page content as downloaded.
+            charset:      Declared charset of *body* when it is bytes.
+            include_text: ``False`` only reads title/description.
+        """
+        if len(body) < self.inline_threshold:
+            return _extract_worker(body, charset, include_text)
+
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        try:
+            return await loop.run_in_executor(executor, _extract_worker, body, charset, include_text)
+        except BrokenProcessPool:
+            # A crashed worker takes the pool down; release it and start a new one next time.
+            # Other calls that failed on the same pool must not shut down its replacement.
+            if self._executor is executor:
+                logger.warning("HTML parse pool broke, parsing inline and restarting the pool")
+                executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+            return _extract_worker(body, charset, include_text)
+
+    def shutdown(self) -> None:
+        """Stop the worker processes (call on application shutdown)."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Module-level singleton so every module can ``from utils.parse_pool import parse_pool``
+parse_pool = ParsePool()
@@ -0,0 +1,202 @@
+"""
+Cross-source passage retrieval for the final report prompt.
+
+Summarising every source with its own LLM call costs one request per
+source and throws away most of the page.  In retrieval mode the extracted
+pages are instead split into passages of a few sentences, embedded in one
+batched call, and the passages most relevant to the topic are picked
+across all sources with maximal marginal relevance (MMR) - relevant, but
+not repeating each other, and at most a few per source.  Each passage keeps
+its source title and URL so the report can cite it.
+
+When the embedding server is unavailable, relevance falls back to BM25
+(``utils.relevance_filter.lexical_scores``) and redundancy to word overlap.
+
+Usage:
+    from utils.passage_retrieval import retrieve_passages, format_passages
+
+    passages = await retrieve_passages(sources, topic, embeddings=embeddings, k=16)
+    prompt_block = format_passages(passages)
+"""
+
+import re
+import logging
+from dataclasses import dataclass
+from typing import Callable, Iterable
+
+import numpy as np
+
+from utils.embeddings import EmbeddingService
+from utils.relevance_filter import lexical_scores
+from utils.source_ranker import tokenize
+
+logger = logging.getLogger(__name__)
+
+# "summaries": one LLM summary per source (default); "passages": retrieval, no per-source calls
+ANALYSIS_MODES = ("summaries", "passages")
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+|\n+")
+# Passages shorter than this carry too little to be worth a slot
+_MIN_WORDS = 12
+# Only the best candidates by relevance go through the quadratic MMR step
+_CANDIDATE_FACTOR = 5
+# Passages at least this similar to a chosen one are repeats (boilerplate, quoted text)
+_DUPLICATE_SIMILARITY = 0.95
+
+
+@dataclass
+class Passage:
+    """A piece of a source page."""
+
+    text: str
+    source: str             # source title
+    url: str
+    source_index: int       # position of the source in the retrieval input
+    position: int           # passage number within the source
+    score: float = 0.0      # relevance to the query
+
+
+def chunk_text(text: str, max_words: int = 120) -> list[str]:
+    """Split *text* into passages of whole sentences, at most *max_words* each."""
+    passages = []
+    current: list[str] = []
+    length = 0
+    for sentence in _SENTENCE_RE.split(text):
+        words = sentence.split()
+        if not words:
+            continue
+        # Very long "sentences" (tables, lists without punctuation) are cut by words
+        while len(words) > max_words:
+            if current:
+                passages.append(" ".join(current))
+                current, length = [], 0
+            passages.append(" ".join(words[:max_words]))
+            words = words[max_words:]
+        if length + len(words) > max_words and current:
+            passages.append(" ".join(current))
+            current, length = [], 0
+        current.append(" ".join(words))
+        length += len(words)
+    if current:
+        passages.append(" ".join(current))
+    return [passage for passage in passages if len(passage.split()) >= _MIN_WORDS]
+
+
+def _lexical_redundancy(passages: list[Passage]) -> np.ndarray:
+    words = [tokenize(passage.text) for passage in passages]
+    n = len(passages)
+    similarity = np.zeros((n, n), dtype=np.float32)
+    for i in range(n):
+        for j in range(i + 1, n):
+            union = words[i] | words[j]
+            if union:
+                similarity[i, j] = similarity[j, i] = len(words[i] & words[j]) / len(union)
+    return similarity
+
+
+async def retrieve_passages(
+    documents: list,
+    query: str,
+    k: int = 16,
+    embeddings: EmbeddingService | None = None,
+    queries: Iterable[str] = (),
+    max_per_source: int = 4,
+    diversity: float = 0.3,
+    max_words: int = 120,
+    text_of: Callable = lambda doc: doc.get("content", ""),
+    title_of: Callable = lambda doc: doc.get("source") or doc.get("title", ""),
+    url_of: Callable = lambda doc: doc.get("url", ""),
+) -> list[Passage]:
+    """Pick the *k* most relevant, non-redundant passages across *documents*.
+
+    Args:
+        documents:      Sources with extracted text (accessors pick the fields).
+        query:          What the passages should answer, usually the topic.
+        k:              Number of passages to return.
+        embeddings:     Embedding service; lexical scoring when ``None`` or
+                        when the server is unavailable.
+        queries:        Extra phrasings (search queries) for lexical scoring.
+        max_per_source: Upper bound on passages taken from one source.
+        diversity:      Weight of the redundancy penalty in MMR (0 = pure relevance).
+        max_words:      Passage length in words.
+
+    Returns the passages ordered best-first.
+    """
+    passages = [
+        Passage(text=chunk, source=title_of(doc), url=url_of(doc), source_index=index, position=position)
+        for index, doc in enumerate(documents)
+        for position, chunk in enumerate(chunk_text(text_of(doc) or "", max_words))
+    ]
+    if not passages or k <= 0:
+        return []
+
+    vectors = None
+    if embeddings is not None:
+        vectors = await embeddings.embed([query] + [passage.text for passage in passages])
+
+    if vectors is not None:
+        relevance = vectors[1:] @ vectors[0]
+    else:
+        relevance = np.asarray(lexical_scores([passage.text for passage in passages], [query, *queries]), dtype=np.float32)
+
+    # Passages that share nothing with the query never make the prompt
+    candidates = np.argsort(-relevance)[:k * _CANDIDATE_FACTOR]
+    candidates = candidates[relevance[candidates] > 0]
+    if len(candidates) == 0:
+        return []
+    if vectors is not None:
+        candidate_vectors = vectors[1:][candidates]
+        redundancy = candidate_vectors @ candidate_vectors.T
+    else:
+        redundancy = _lexical_redundancy([passages[i] for i in candidates])
+
+    # MMR over the candidates, with a per-source cap
+    chosen: list[int] = []
+    per_source: dict[int, int] = {}
+    max_similarity = np.zeros(len(candidates), dtype=np.float32)
+    available = np.ones(len(candidates), dtype=bool)
+    while len(chosen) < k and available.any():
+        values = (1 - diversity) * relevance[candidates] - diversity * max_similarity
+        values[~available] = -np.inf
+        best = int(np.argmax(values))
+        available[best] = False
+        source_index = passages[candidates[best]].source_index
+        if per_source.get(source_index, 0) >= max_per_source or max_similarity[best] >= _DUPLICATE_SIMILARITY:
+            continue
+        per_source[source_index] = per_source.get(source_index, 0) + 1
+        chosen.append(best)
+        max_similarity = np.maximum(max_similarity, redundancy[best])
+
+    selected = []
+    for best in chosen:
+        passage = passages[candidates[best]]
+        passage.score = float(relevance[candidates[best]])
+        selected.append(passage)
+
+    logger.info(
+        "Selected %d of %d passages from %d sources (%s scoring)",
+        len(selected), len(passages), len(per_source), "embedding" if vectors is not None else "lexical",
+    )
+    return selected
+
+
+def format_passages(passages: list[Passage], note_of: Callable[[Passage], str] | None = None) -> str:
+    """Numbered passages with their source title and URL for a report prompt.
+
+    *note_of* may add a line per passage, e.g. the source's reliability score.
+    """
+    blocks = []
+    for number, passage in enumerate(passages, 1):
+        header = f"[{number}] {passage.source} - {passage.url}"
+        if note_of:
+            header += f"\n{note_of(passage)}"
+        blocks.append(f"{header}\n{passage.text}")
+    return "\n\n".join(blocks)
+
+
+def passages_by_source(passages: list[Passage]) -> dict[int, list[Passage]]:
+    """Selected passages grouped by source index, in document order."""
+    grouped: dict[int, list[Passage]] = {}
+    for passage in sorted(passages, key=lambda p: (p.source_index, p.position)):
+        grouped.setdefault(passage.source_index, []).append(passage)
+    return grouped
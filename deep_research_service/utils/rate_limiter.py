@@ -4,73 +4,535 @@ Async per-domain rate limiter for web requests.
 Prevents hammering the same domain by enforcing a minimum delay
 between consecutive requests to each host.
 
+Each domain is a token bucket scheduled GCRA-style: a caller reserves the
+next free send slot for its domain in a short critical section and then
+sleeps until that slot *outside* of any lock.  Waiting for ``arxiv.org``
+therefore never delays a request to ``github.com``, and concurrent callers
+for the same domain are spaced out instead of stampeding together.
+
+The delay of each domain adapts to server feedback (AIMD): fast 2xx
+responses raise the request rate additively, ``429``/``503`` halve it and
+honour ``Retry-After``.  A robots.txt ``Crawl-delay`` is a floor for the
+domain's delay.  Learned delays are persisted in SQLite so a restart does
+not have to re-learn them.
+
+With several uvicorn workers every process would otherwise keep its own
+budget for the same hosts.  Setting ``RATE_LIMITER_BACKEND=sqlite`` makes
+the slot reservations go through a table in the same SQLite file instead
+(``BEGIN IMMEDIATE`` makes each reservation atomic across processes), so
+all workers on a node share one per-domain budget, Retry-After back-offs
+and robots.txt state.  The database is opened on first use, not at
+import.  The in-process backend stays the default.  Database work never
+runs on the event loop: shared reservations and saves go through the
+default thread pool, over one connection with a short busy timeout; a
+reservation that cannot get the lock in time falls back to the local
+bucket.
+
 Usage:
     from utils.rate_limiter import rate_limiter
 
     await rate_limiter.wait("arxiv.org")
     async with session.get(url) as resp:
-        ...
+        rate_limiter.record_response("arxiv.org", resp.status, latency,
+                                     parse_retry_after(resp.headers.get("Retry-After")))
 """
 
 import asyncio
+import os
+import sqlite3
+import threading
 import time
 import logging
+from email.utils import parsedate_to_datetime
 from urllib.parse import urlparse
 
 logger = logging.getLogger(__name__)
 
+# Default DB location: next to this file, inside the service directory
+_DEFAULT_DB_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "rate_limits.db",
+)
+
+# AIMD tuning
+_MIN_DELAY = 0.2            # never more than 5 requests/s to one domain
+_MAX_DELAY = 60.0
+_RATE_STEP = 0.2            # additive increase, requests/s per fast response
+_FAST_LATENCY = 1.0         # responses faster than this count as "healthy"
+_BACKOFF_STATUSES = frozenset((429, 503))
+
+# Persisted state older than this is ignored on load
+_STATE_MAX_AGE = 7 * 24 * 60 * 60
+# robots.txt is re-read after a day
+_ROBOTS_TTL = 24 * 60 * 60
+# Seconds between writes of learned delays
+_SAVE_INTERVAL = 30.0
+# Seconds a shared reservation waits for another worker's write lock
+_BUSY_TIMEOUT = 2.0
+
+# "memory" (per process, default) or "sqlite" (shared by all workers on the node)
+_BACKEND = os.getenv("RATE_LIMITER_BACKEND", "memory").lower()
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Parse a ``Retry-After`` header (seconds or HTTP date) into seconds."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class SharedSlots:
+    """Per-domain send slots in SQLite, shared by every process using the file.
+
+    Slots are stored as wall-clock times, since ``time.monotonic()`` is not
+    comparable across processes.
+    """
+
+    def __init__(self, db_path: str):
+        """
+        Args:
+            db_path: SQLite file shared by the workers (the learned-rates DB).
+        """
+        self.db_path = db_path
+        self._conn: sqlite3.Connection | None = None
+        # One connection, used from the thread pool one call at a time
+        self._lock = threading.Lock()
+        self._ensure_table()
+
+    def _connection(self) -> sqlite3.Connection:
+        """The persistent connection (caller holds ``_lock``)."""
+        if self._conn is None:
+            # Autocommit mode so transactions are started explicitly
+            self._conn = sqlite3.connect(
+                self.db_path, timeout=_BUSY_TIMEOUT, isolation_level=None, check_same_thread=False
+            )
+        return self._conn
+
+    def _discard(self) -> None:
+        """Drop the connection after an error; the next call reconnects (caller holds ``_lock``)."""
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except sqlite3.Error:
+                pass
+            self._conn = None
+
+    def _ensure_table(self) -> None:
+        try:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS domain_slots (
+                    domain     TEXT PRIMARY KEY,
+                    next_slot  REAL NOT NULL
+                )
+                """
+            )
+            conn.close()
+        except Exception as e:
+            logger.error("Failed to initialise shared rate limit table: %s", e)
+
+    def reserve(self, domain: str, delay: float, tolerance: float) -> float | None:
+        """Atomically reserve the next slot; returns seconds to wait, ``None`` on DB errors.
+
+        Blocks for up to ``_BUSY_TIMEOUT``; async callers run it in a thread.
+        """
+        with self._lock:
+            try:
+                conn = self._connection()
+                # Take the write lock up front so no other worker reads the same slot
+                conn.execute("BEGIN IMMEDIATE")
+                row = conn.execute("SELECT next_slot FROM domain_slots WHERE domain = ?", (domain,)).fetchone()
+                # Another worker may have read a stricter Crawl-delay
+                crawl = conn.execute(
+                    "SELECT crawl_delay FROM domain_rates WHERE domain = ?", (domain,)
+                ).fetchone()
+                if crawl and crawl[0]:
+                    delay = max(delay, crawl[0])
+
+                now = time.time()
+                next_slot = max(row[0] if row else now, now)
+                send_at = max(now, next_slot - tolerance)
+                conn.execute(
+                    "INSERT OR REPLACE INTO domain_slots (domain, next_slot) VALUES (?, ?)",
+                    (domain, max(next_slot, send_at) + delay),
+                )
+                conn.execute("COMMIT")
+                return send_at - now
+            except Exception as e:
+                logger.error("Shared rate limiter reserve error for %s: %s", domain, e)
+                self._discard()
+                return None
+
+    def push_back(self, domain: str, seconds: float) -> None:
+        """Keep every worker away from *domain* for *seconds* (Retry-After)."""
+        with self._lock:
+            try:
+                # A single statement is atomic on its own
+                self._connection().execute(
+                    """
+                    INSERT INTO domain_slots (domain, next_slot) VALUES (?, ?)
+                    ON CONFLICT(domain) DO UPDATE SET next_slot = MAX(next_slot, excluded.next_slot)
+                    """,
+                    (domain, time.time() + seconds),
+                )
+            except Exception as e:
+                logger.error("Shared rate limiter push back error for %s: %s", domain, e)
+                self._discard()
+
+    def reset(self, domain: str | None = None) -> None:
+        with self._lock:
+            try:
+                conn = self._connection()
+                if domain is None:
+                    conn.execute("DELETE FROM domain_slots")
+                else:
+                    conn.execute("DELETE FROM domain_slots WHERE domain = ?", (domain,))
+            except Exception as e:
+                logger.error("Shared rate limiter reset error: %s", e)
+                self._discard()
+
 
 class DomainRateLimiter:
-    """Track last request time per domain and sleep if needed."""
+    """Per-domain token buckets with non-blocking slot reservation."""
 
-    def __init__(self, default_delay: float = 2.0):
+    def __init__(
+        self,
+        default_delay: float = 2.0,
+        burst: int = 1,
+        db_path: str | None = None,
+        min_delay: float = _MIN_DELAY,
+        max_delay: float = _MAX_DELAY,
+        shared: bool = False,
+    ):
         """
         Args:
-            default_delay: Minimum seconds between requests to the same domain.
+            default_delay: Starting delay between requests to the same domain.
+            burst:         Requests a domain may receive back to back before
+                           the delay applies (1 = strict spacing).
+            db_path:       SQLite file for learned delays; ``None`` keeps them
+                           in memory only.
+            min_delay:     Lower bound for adapted delays.
+            max_delay:     Upper bound for adapted delays.
+            shared:        Reserve slots in *db_path* so that all processes
+                           using the same file share one budget per domain.
         """
         self.default_delay = default_delay
-        self._last_request: dict[str, float] = {}
-        self._lock = asyncio.Lock()
+        self.burst = max(1, burst)
+        self.db_path = db_path
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        # Theoretical arrival time of the next request per domain (GCRA)
+        self._next_slot: dict[str, float] = {}
+        # Learned delay and robots.txt Crawl-delay per domain
+        self._delays: dict[str, float] = {}
+        self._crawl_delays: dict[str, float] = {}
+        self._robots_checked: dict[str, float] = {}
+        self._dirty: set[str] = set()
+        self._last_save = time.monotonic()
+        # Guards only the slot arithmetic, never a sleep
+        self._lock = threading.Lock()
+
+        self._shared: SharedSlots | None = None
+        self._share = shared
+        # The database is opened on first use, not at import
+        self._loaded = False
+        self._load_lock = threading.Lock()
+
+    def _ensure_loaded(self) -> None:
+        """Create the tables and read learned delays once; blocking (async callers use the thread pool)."""
+        if self._loaded:
+            return
+        with self._load_lock:
+            if self._loaded:
+                return
+            if self.db_path:
+                self._ensure_table()
+                self._load()
+                if self._share:
+                    self._shared = SharedSlots(self.db_path)
+                    logger.info("Rate limiter slots shared through %s", self.db_path)
+            self._loaded = True
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _ensure_table(self) -> None:
+        try:
+            conn = self._connect()
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS domain_rates (
+                    domain             TEXT PRIMARY KEY,
+                    delay              REAL NOT NULL,
+                    crawl_delay        REAL,
+                    robots_checked_at  REAL,
+                    updated_at         REAL NOT NULL
+                )
+                """
+            )
+            conn.commit()
+            conn.close()
+        except Exception as e:
+            logger.error("Failed to initialise rate limit table: %s", e)
+
+    def _load(self, domain: str | None = None) -> None:
+        query = "SELECT domain, delay, crawl_delay, robots_checked_at FROM domain_rates WHERE updated_at > ?"
+        params: tuple = (time.time() - _STATE_MAX_AGE,)
+        if domain is not None:
+            query += " AND domain = ?"
+            params += (domain,)
+        try:
+            conn = self._connect()
+            rows = conn.execute(query, params).fetchall()
+            conn.close()
+        except Exception as e:
+            logger.error("Failed to load learned rate limits: %s", e)
+            return
+
+        # May run in the thread pool (see needs_robots)
+        with self._lock:
+            for row_domain, delay, crawl_delay, robots_checked_at in rows:
+                self._delays[row_domain] = delay
+                if crawl_delay:
+                    self._crawl_delays[row_domain] = crawl_delay
+                if robots_checked_at:
+                    self._robots_checked[row_domain] = robots_checked_at
+        if domain is None:
+            logger.info("Loaded learned rate limits for %d domains", len(rows))
+
+    def save(self) -> None:
+        """Write learned delays of changed domains to the database."""
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+            rows = [
+                (
+                    domain,
+                    self._delays.get(domain, self.default_delay),
+                    self._crawl_delays.get(domain),
+                    self._robots_checked.get(domain),
+                    time.time(),
+                )
+                for domain in dirty
+            ]
+            self._last_save = time.monotonic()
+
+        if not self.db_path or not rows:
+            return
+        self._ensure_loaded()
+        try:
+            conn = self._connect()
+            # Merge with what other workers wrote: a Crawl-delay read within the
+            # robots.txt TTL is kept unless this worker saw a stricter one
+            conn.executemany(
+                """
+                INSERT INTO domain_rates
+                    (domain, delay, crawl_delay, robots_checked_at, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(domain) DO UPDATE SET
+                    delay = excluded.delay,
+                    crawl_delay = CASE
+                        WHEN COALESCE(domain_rates.robots_checked_at, 0) > COALESCE(excluded.robots_checked_at, 0) - ?
+                        THEN NULLIF(MAX(COALESCE(domain_rates.crawl_delay, 0), COALESCE(excluded.crawl_delay, 0)), 0)
+                        ELSE excluded.crawl_delay
+                    END,
+                    robots_checked_at = MAX(
+                        COALESCE(domain_rates.robots_checked_at, 0), COALESCE(excluded.robots_checked_at, 0)
+                    ),
+                    updated_at = excluded.updated_at
+                """,
+                [row + (_ROBOTS_TTL,) for row in rows],
+            )
+            conn.commit()
+            conn.close()
+        except Exception as e:
+            logger.error("Failed to save learned rate limits: %s", e)
+
+    def _maybe_save(self) -> None:
+        if self.db_path and self._dirty and time.monotonic() - self._last_save > _SAVE_INTERVAL:
+            self._off_loop(self.save)
+
+    @staticmethod
+    def _off_loop(func, *args) -> None:
+        """Run a blocking DB call in the default thread pool when on the event loop, else inline."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            func(*args)
+            return
+        loop.run_in_executor(None, func, *args)
+
+    # ------------------------------------------------------------------
+    # Scheduling
+    # ------------------------------------------------------------------
+
+    def delay_for(self, domain: str) -> float:
+        """Current delay for *domain*: the learned delay, floored by Crawl-delay."""
+        self._ensure_loaded()
+        delay = self._delays.get(domain, self.default_delay)
+        return max(delay, self._crawl_delays.get(domain, 0.0))
+
+    def reserve(self, domain: str, delay: float | None = None) -> float:
+        """Reserve the next send slot for *domain*.
+
+        Returns the number of seconds the caller must wait before sending
+        (0.0 when it may go immediately).  The slot is taken either way.
+
+        Args:
+            domain: The target hostname (e.g. "arxiv.org").
+            delay:  Per-call override; falls back to the domain's adapted delay.
+        """
+        self._ensure_loaded()
+        with self._lock:
+            if delay is None:
+                delay = self.delay_for(domain)
+            tolerance = (self.burst - 1) * delay
+
+        if self._shared is not None:
+            wait_time = self._shared.reserve(domain, delay, tolerance)
+            if wait_time is not None:
+                return wait_time
+            # Fall back to the local bucket while the shared DB is unavailable
+
+        with self._lock:
+            now = time.monotonic()
+            next_slot = max(self._next_slot.get(domain, now), now)
+            send_at = max(now, next_slot - tolerance)
+            self._next_slot[domain] = max(next_slot, send_at) + delay
+
+        return send_at - now
 
     async def wait(self, domain: str, delay: float | None = None) -> None:
         """Wait until it is safe to make a request to *domain*.
 
-        If the last request to this domain was less than *delay* seconds ago,
-        sleep the remaining time.  Otherwise return immediately.
+        If the domain's bucket is empty, sleep until the reserved slot.
+        Otherwise return immediately.  Requests to other domains are never
+        blocked by this sleep.
 
         Args:
             domain: The target hostname (e.g. "arxiv.org").
-            delay:  Per-call override; falls back to ``self.default_delay``.
+            delay:  Per-call override; falls back to the domain's adapted delay.
         """
-        if delay is None:
-            delay = self.default_delay
+        loop = asyncio.get_running_loop()
+        if not self._loaded:
+            await loop.run_in_executor(None, self._ensure_loaded)
+        if self._shared is not None:
+            # The shared reservation is a SQLite write transaction
+            wait_time = await loop.run_in_executor(None, self.reserve, domain, delay)
+        else:
+            wait_time = self.reserve(domain, delay)
+        if wait_time > 0:
+            logger.debug(
+                "Rate limiter: sleeping %.2fs before hitting %s",
+                wait_time,
+                domain,
+            )
+            await asyncio.sleep(wait_time)
 
-        async with self._lock:
-            now = time.monotonic()
-            last = self._last_request.get(domain, 0.0)
-            elapsed = now - last
-
-            if elapsed < delay:
-                wait_time = delay - elapsed
-                logger.debug(
-                    "Rate limiter: sleeping %.2fs before hitting %s",
-                    wait_time,
-                    domain,
-                )
-                await asyncio.sleep(wait_time)
+    # ------------------------------------------------------------------
+    # Feedback
+    # ------------------------------------------------------------------
+
+    def record_response(
+        self,
+        domain: str,
+        status: int,
+        latency: float | None = None,
+        retry_after: float | None = None,
+    ) -> None:
+        """Adapt the delay of *domain* to a response.
+
+        Args:
+            domain:      The host that answered.
+            status:      HTTP status code.
+            latency:     Seconds until the response headers arrived.
+            retry_after: Parsed ``Retry-After`` header, if any.
+        """
+        self._ensure_loaded()
+        with self._lock:
+            delay = self._delays.get(domain, self.default_delay)
+
+            if status in _BACKOFF_STATUSES:
+                # Multiplicative decrease of the rate
+                new_delay = min(self.max_delay, delay * 2)
+                if retry_after:
+                    retry_after = min(retry_after, self.max_delay)
+                    new_delay = max(new_delay, retry_after)
+                    self._next_slot[domain] = max(
+                        self._next_slot.get(domain, 0.0), time.monotonic() + retry_after
+                    )
+                if retry_after and self._shared is not None:
+                    self._off_loop(self._shared.push_back, domain, retry_after)
+                logger.info("Rate limiter: %s answered %d, delay %.2fs -> %.2fs", domain, status, delay, new_delay)
+            elif 200 <= status < 300 and latency is not None and latency < _FAST_LATENCY:
+                # Additive increase of the rate
+                new_delay = max(self.min_delay, 1.0 / (1.0 / delay + _RATE_STEP))
+            else:
+                return
+
+            if new_delay != delay:
+                self._delays[domain] = new_delay
+                self._dirty.add(domain)
+
+        self._maybe_save()
+
+    async def needs_robots(self, domain: str) -> bool:
+        """Whether robots.txt of *domain* should be (re)read."""
+        loop = asyncio.get_running_loop()
+        if not self._loaded:
+            await loop.run_in_executor(None, self._ensure_loaded)
+        checked_at = self._robots_checked.get(domain)
+        if self._shared is not None and (checked_at is None or time.time() - checked_at > _ROBOTS_TTL):
+            # Another worker may have read it already; the SQLite read runs in the thread pool
+            await loop.run_in_executor(None, self._load, domain)
+            checked_at = self._robots_checked.get(domain)
+        return checked_at is None or time.time() - checked_at > _ROBOTS_TTL
 
-            self._last_request[domain] = time.monotonic()
+    def set_crawl_delay(self, domain: str, crawl_delay: float | None) -> None:
+        """Record the robots.txt ``Crawl-delay`` of *domain* (``None`` if absent)."""
+        self._ensure_loaded()
+        with self._lock:
+            self._robots_checked[domain] = time.time()
+            if crawl_delay:
+                self._crawl_delays[domain] = min(float(crawl_delay), self.max_delay)
+            else:
+                self._crawl_delays.pop(domain, None)
+            self._dirty.add(domain)
+
+        if self._shared is not None:
+            # Publish right away so other workers neither re-read robots.txt nor ignore the delay
+            self._off_loop(self.save)
 
     def reset(self, domain: str | None = None) -> None:
-        """Clear tracked timestamps.
+        """Clear tracked slots and learned delays.
 
         Args:
             domain: Reset a single domain.  ``None`` resets all.
         """
-        if domain is None:
-            self._last_request.clear()
-        else:
-            self._last_request.pop(domain, None)
+        self._ensure_loaded()
+        with self._lock:
+            if domain is None:
+                self._next_slot.clear()
+                self._dirty.update(self._delays)
+                self._delays.clear()
+            else:
+                self._next_slot.pop(domain, None)
+                if self._delays.pop(domain, None) is not None:
+                    self._dirty.add(domain)
+
+        if self._shared is not None:
+            self._shared.reset(domain)
 
 
 def extract_domain(url: str) -> str:
@@ -83,4 +545,8 @@ def extract_domain(url: str) -> str:
 
 
 # Module-level singleton so every module can ``from utils.rate_limiter import rate_limiter``
-rate_limiter = DomainRateLimiter(default_delay=2.0)
+rate_limiter = DomainRateLimiter(
+    default_delay=2.0,
+    db_path=_DEFAULT_DB_PATH,
+    shared=_BACKEND == "sqlite",
+)
@@ -0,0 +1,209 @@
+"""
+Tiered relevance filter for search results.
+
+Asking the LLM "is this result relevant?" for every hit of every query is
+the slowest part of the search stage.  ``RelevanceFilter`` answers most of
+these questions with cheaper signals and only escalates the unclear ones:
+
+1. Lexical   - BM25 of the result's title/snippet/URL against the topic and
+               each generated query, normalised to 0..1 (roughly the
+               IDF-weighted share of a query's words the result contains).
+               Strong matches are accepted outright.  Only queries of at
+               least ``min_lexical_terms`` words count here: against a
+               one-word query any result containing that word scores ~1.
+2. Embedding - cosine similarity between the topic and the remaining
+               results, embedded in one batched call.  Clear matches are
+               accepted, clear misses rejected.
+3. LLM       - only results whose embedding score lands between the two
+               thresholds (or all remaining ones when embeddings are
+               unavailable) go to the caller's LLM check, at most
+               ``max_concurrent_llm`` at a time.
+
+Every decision is logged with its scores so the thresholds can be tuned.
+
+Usage:
+    from utils.relevance_filter import RelevanceFilter
+
+    relevance = RelevanceFilter()
+    relevant = await relevance.filter(results, topic, queries,
+                                      llm_check=lambda r: self.check_relevance(topic, r))
+"""
+
+import asyncio
+import math
+import logging
+from collections import Counter
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Iterable
+
+from utils.embeddings import EmbeddingService, cosine_similarity, get_embedding_service
+from utils.source_ranker import terms
+
+logger = logging.getLogger(__name__)
+
+# BM25 parameters
+_K1 = 1.2
+_B = 0.75
+
+
+@dataclass
+class RelevanceDecision:
+    """Outcome of the cascade for one result."""
+
+    relevant: bool
+    stage: str                  # "lexical", "embedding", "llm" or "default"
+    lexical: float
+    embedding: float | None = None
+
+
+def _default_text(item: dict) -> str:
+    return f"{item.get('title', '')} {item.get('body', '') or item.get('snippet', '')} {item.get('url', '') or item.get('href', '')}"
+
+
+def lexical_scores(documents: list[str], queries: list[str]) -> list[float]:
+    """Normalised BM25 score (0..1) of each document against its best-matching query."""
+    doc_terms = [terms(document) for document in documents]
+    if not doc_terms:
+        return []
+
+    n_docs = len(doc_terms)
+    avg_len = sum(len(words) for words in doc_terms) / n_docs or 1.0
+    doc_freq = Counter(word for words in doc_terms for word in set(words))
+
+    def idf(word: str) -> float:
+        n = doc_freq.get(word, 0)
+        return math.log(1 + (n_docs - n + 0.5) / (n + 0.5))
+
+    query_terms = [set(terms(query)) for query in queries]
+    query_terms = [words for words in query_terms if words]
+
+    scores = []
+    for words in doc_terms:
+        counts = Counter(words)
+        length_norm = 1 - _B + _B * len(words) / avg_len
+        best = 0.0
+        for query in query_terms:
+            # Upper bound: every query word present once in an average-length document
+            upper = sum(idf(word) for word in query)
+            score = sum(
+                idf(word) * counts[word] * (_K1 + 1) / (counts[word] + _K1 * length_norm)
+                for word in query if counts[word]
+            )
+            if upper > 0:
+                best = max(best, min(1.0, score / upper))
+        scores.append(best)
+    return scores
+
+
+class RelevanceFilter:
+    """Lexical -> embedding -> LLM cascade for search result relevance."""
+
+    def __init__(
+        self,
+        lexical_accept: float = 0.6,
+        embedding_accept: float = 0.62,
+        embedding_reject: float = 0.38,
+        embeddings: EmbeddingService | None = None,
+        min_lexical_terms: int = 2,
+        max_concurrent_llm: int = 4,
+    ):
+        """
+        Args:
+            lexical_accept:     Normalised BM25 score at or above which a result is
+                                accepted without further checks.
+            embedding_accept:   Cosine similarity at or above which a result is accepted.
+            embedding_reject:   Cosine similarity at or below which a result is rejected.
+            embeddings:         Embedding service; defaults to the shared default one.
+            min_lexical_terms:  Fewest distinct words a query needs to count for the
+                                lexical stage.
+            max_concurrent_llm: LLM checks run at the same time.
+        """
+        self.lexical_accept = lexical_accept
+        self.embedding_accept = embedding_accept
+        self.embedding_reject = embedding_reject
+        self.embeddings = embeddings or get_embedding_service()
+        self.min_lexical_terms = min_lexical_terms
+        self.max_concurrent_llm = max_concurrent_llm
+        self.stats: Counter = Counter()
+
+    async def decide(
+        self,
+        results: list,
+        topic: str,
+        queries: Iterable[str] = (),
+        llm_check: Callable[[object], Awaitable[bool]] | None = None,
+        text_of: Callable[[object], str] = _default_text,
+    ) -> list[RelevanceDecision]:
+        """Run the cascade and return one decision per result."""
+        texts = [text_of(result) for result in results]
+        lexical_queries = [query for query in [topic, *queries] if len(set(terms(query))) >= self.min_lexical_terms]
+        lexical = lexical_scores(texts, lexical_queries) if lexical_queries else [0.0] * len(texts)
+        decisions: list[RelevanceDecision | None] = [None] * len(results)
+
+        # 1. Lexical: strong matches need nothing else
+        pending = []
+        for i, score in enumerate(lexical):
+            if score >= self.lexical_accept:
+                decisions[i] = RelevanceDecision(True, "lexical", score)
+            else:
+                pending.append(i)
+
+        # 2. Embeddings: one batch for the topic and all undecided results
+        uncertain = pending
+        if pending:
+            vectors = await self.embeddings.embed([topic] + [texts[i] for i in pending])
+            if vectors is not None:
+                similarities = cosine_similarity(vectors[0], vectors[1:])
+                uncertain = []
+                for i, similarity in zip(pending, similarities.tolist()):
+                    if similarity >= self.embedding_accept:
+                        decisions[i] = RelevanceDecision(True, "embedding", lexical[i], similarity)
+                    elif similarity <= self.embedding_reject:
+                        decisions[i] = RelevanceDecision(False, "embedding", lexical[i], similarity)
+                    else:
+                        decisions[i] = RelevanceDecision(True, "llm", lexical[i], similarity)
+                        uncertain.append(i)
+            else:
+                for i in pending:
+                    decisions[i] = RelevanceDecision(True, "llm", lexical[i])
+
+        # 3. LLM only for the uncertain band, checked concurrently
+        if llm_check is None:
+            for i in uncertain:
+                decisions[i].stage = "default"
+        elif uncertain:
+            semaphore = asyncio.Semaphore(self.max_concurrent_llm)
+
+            async def check(i: int) -> None:
+                async with semaphore:
+                    decisions[i].relevant = await llm_check(results[i])
+
+            await asyncio.gather(*(check(i) for i in uncertain))
+
+        for text, decision in zip(texts, decisions):
+            self.stats[f"{decision.stage}_{'accept' if decision.relevant else 'reject'}"] += 1
+            logger.info(
+                "Relevance %s via %s (lexical=%.2f, embedding=%s): %s",
+                "accept" if decision.relevant else "reject",
+                decision.stage,
+                decision.lexical,
+                "-" if decision.embedding is None else f"{decision.embedding:.2f}",
+                text[:120],
+            )
+        return decisions
+
+    async def filter(
+        self,
+        results: list,
+        topic: str,
+        queries: Iterable[str] = (),
+        llm_check: Callable[[object], Awaitable[bool]] | None = None,
+        text_of: Callable[[object], str] = _default_text,
+    ) -> list:
+        """Return the results judged relevant, in their original order."""
+        decisions = await self.decide(results, topic, queries, llm_check, text_of)
+        return [result for result, decision in zip(results, decisions) if decision.relevant]
+
+    def llm_calls(self) -> int:
+        """LLM relevance checks made so far."""
+        return self.stats["llm_accept"] + self.stats["llm_reject"]
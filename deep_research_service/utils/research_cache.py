@@ -2,17 +2,20 @@
 SQLite-based cache for research results.
 
 Stores completed research results keyed by a SHA-256 hash of the topic
-string.  Entries expire after a configurable TTL (default 24 hours).
+string and the options that shape the result (analysis mode, number of
+sources), so a run with other options is not answered from the cache.
+Entries expire after a configurable TTL (default 24 hours).
 
 Usage:
     from utils.research_cache import research_cache
 
-    cached = research_cache.get("quantum computing")
+    options = {"analysis_mode": "summaries", "max_sources": 8}
+    cached = research_cache.get("quantum computing", options)
     if cached:
         return cached
 
     result = await do_expensive_research(...)
-    research_cache.set("quantum computing", result)
+    research_cache.set("quantum computing", result, options)
 """
 
 import hashlib
@@ -74,16 +77,19 @@ class ResearchCache:
             logger.error("Failed to initialise research cache: %s", e)
 
     @staticmethod
-    def _hash_topic(topic: str) -> str:
-        return hashlib.sha256(topic.strip().lower().encode("utf-8")).hexdigest()
+    def _hash_topic(topic: str, options: dict | None = None) -> str:
+        raw = topic.strip().lower()
+        if options:
+            raw += "\0" + json.dumps(options, sort_keys=True)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
 
     # ------------------------------------------------------------------
     # Public API
     # ------------------------------------------------------------------
 
-    def get(self, topic: str) -> dict | None:
-        """Return the cached result dict for *topic*, or ``None`` if missing / expired."""
-        topic_hash = self._hash_topic(topic)
+    def get(self, topic: str, options: dict | None = None) -> dict | None:
+        """Return the cached result dict for *topic* run with *options*, or ``None`` if missing / expired."""
+        topic_hash = self._hash_topic(topic, options)
         try:
             conn = self._connect()
             row = conn.execute(
@@ -99,7 +105,7 @@ class ResearchCache:
             age = time.time() - created_at
             if age > self.ttl:
                 logger.debug("Cache entry for '%s' expired (%.0fs old)", topic, age)
-                self.delete(topic)
+                self.delete(topic, options)
                 return None
 
             logger.info("Cache HIT for '%s' (%.0fs old)", topic, age)
@@ -109,9 +115,9 @@ class ResearchCache:
             logger.error("Cache get error: %s", e)
             return None
 
-    def set(self, topic: str, result: dict) -> None:
-        """Store *result* (a JSON-serialisable dict) under *topic*."""
-        topic_hash = self._hash_topic(topic)
+    def set(self, topic: str, result: dict, options: dict | None = None) -> None:
+        """Store *result* (a JSON-serialisable dict) under *topic* and *options*."""
+        topic_hash = self._hash_topic(topic, options)
         try:
             conn = self._connect()
             conn.execute(
@@ -127,9 +133,9 @@ class ResearchCache:
         except Exception as e:
             logger.error("Cache set error: %s", e)
 
-    def delete(self, topic: str) -> None:
+    def delete(self, topic: str, options: dict | None = None) -> None:
         """Remove a single cached entry."""
-        topic_hash = self._hash_topic(topic)
+        topic_hash = self._hash_topic(topic, options)
         try:
             conn = self._connect()
             conn.execute("DELETE FROM cache WHERE topic_hash = ?", (topic_hash,))
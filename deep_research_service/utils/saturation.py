@@ -0,0 +1,116 @@
+"""
+Information-saturation tracking for the source analysis loop.
+
+Sources are analysed best-first (see ``utils.source_ranker``), so the last
+ones often repeat what the first ones already said.  ``NoveltyTracker``
+measures how much of each new source is new: the share of its key terms -
+content words the source repeats, and all numbers - that no earlier source
+contained.  Words a page uses only once (bylines, framing, asides) are not
+key terms.  When the share stays below a threshold for ``patience``
+sources in a row, the topic is considered saturated and the researcher
+stops analysing, saving the LLM calls the remaining sources would have
+cost.
+
+Novelty is measured on the extracted page text before the LLM sees it, so
+a skipped source costs no LLM call.  It does not save downloads: the
+researchers fetch all of their sources with ``hedged_fetch.fetch_first_n``
+before the first one is analysed, so every page is already in when
+saturation is detected.
+
+Usage:
+    from utils.saturation import NoveltyTracker
+
+    novelty = NoveltyTracker()
+    for result, content in fetched:
+        if novelty.saturated:
+            break
+        novelty.observe(content)
+        ...
+    logger.info(novelty.summary())
+"""
+
+import re
+import logging
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+# Function words that say nothing about novelty (EN + TR)
+_STOPWORDS = frozenset((
+    "the", "and", "for", "with", "that", "this", "are", "was", "were", "from", "have", "has", "not",
+    "but", "can", "will", "which", "their", "they", "its", "also", "more", "than", "been", "such",
+    "bir", "ve", "ile", "için", "bu", "da", "de", "olarak", "gibi", "daha", "çok", "olan", "ise",
+))
+
+
+# Sources with fewer key terms than this are measured on all their terms
+_MIN_KEY_TERMS = 10
+
+
+def _term_counts(text: str) -> Counter:
+    return Counter(
+        word for word in _WORD_RE.findall(text.casefold())
+        if (len(word) > 2 or word.isdigit()) and word not in _STOPWORDS
+    )
+
+
+def key_terms(counts: Counter) -> set[str]:
+    """Terms a source is about: repeated content words and every number."""
+    key = {term for term, count in counts.items() if count > 1 or term.isdigit()}
+    return key if len(key) >= _MIN_KEY_TERMS else set(counts)
+
+
+class NoveltyTracker:
+    """Stops a research loop once new sources stop adding new information."""
+
+    def __init__(self, threshold: float = 0.2, patience: int = 3, min_sources: int = 4):
+        """
+        Args:
+            threshold:   Share of new key terms below which a source counts
+                         as adding nothing new.
+            patience:    Consecutive low-novelty sources that mean saturation.
+            min_sources: Sources always analysed before stopping is considered.
+        """
+        self.threshold = threshold
+        self.patience = patience
+        self.min_sources = min_sources
+        self.history: list[float] = []
+        self.stop_reason: str | None = None
+        self._seen: set[str] = set()
+
+    @property
+    def saturated(self) -> bool:
+        return self.stop_reason is not None
+
+    def observe(self, text: str) -> float | None:
+        """Record a source and return its novelty (0..1), or ``None`` for empty text."""
+        counts = _term_counts(text or "")
+        if not counts:
+            return None
+
+        terms = key_terms(counts)
+        novelty = len(terms - self._seen) / len(terms)
+        # Every term mentioned, even once, counts as known for later sources
+        self._seen.update(counts)
+        self.history.append(novelty)
+
+        recent = self.history[-self.patience:]
+        if (
+            not self.saturated
+            and len(self.history) >= max(self.min_sources, self.patience)
+            and all(value < self.threshold for value in recent)
+        ):
+            self.stop_reason = (
+                f"last {self.patience} sources added less than {self.threshold:.0%} new key terms "
+                f"({', '.join(f'{value:.0%}' for value in recent)})"
+            )
+            logger.info("Information saturation after %d sources: %s", len(self.history), self.stop_reason)
+        return novelty
+
+    def summary(self) -> str:
+        """One-line account of the novelty seen so far."""
+        novelty = ", ".join(f"{value:.0%}" for value in self.history)
+        state = f"saturated: {self.stop_reason}" if self.saturated else "not saturated"
+        return f"{len(self.history)} sources observed, novelty [{novelty}], {state}"
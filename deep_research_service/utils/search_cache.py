@@ -0,0 +1,294 @@
+"""
+SQLite-based cache for search-engine result lists.
+
+Every research engine (``RealDeepResearcher``, ``SmartMultilingualResearcher``,
+``DeepResearcher`` and the Tavily/Google helpers) looks up its queries here
+before hitting Google, DuckDuckGo or Tavily.  Entries are keyed by the
+normalised query, the provider, the search language and the requested
+result count, so near-repeat topics ("Python asyncio tutorial" vs
+"python  asyncio tutorial?") share a single entry while a five-result
+search never answers a later twenty-result one.
+
+Freshness depends on the kind of query: news-like queries expire after a
+few hours, definitional ones are kept for a week.
+
+The database is created on first use.  Code running on the event loop
+should use ``aget`` / ``aset``, which do the SQLite work in the default
+executor.
+
+Usage:
+    from utils.search_cache import search_cache
+
+    results = await search_cache.aget(query, provider="google", lang="en", max_results=10)
+    if results is None:
+        results = run_search(query)
+        await search_cache.aset(query, results, provider="google", lang="en", max_results=10)
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+import unicodedata
+import logging
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# Default DB location: next to this file, inside the service directory
+_DEFAULT_DB_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "search_cache.db",
+)
+
+# Time-to-live per query kind, in seconds
+_DEFAULT_TTLS = {
+    "news": 3 * 60 * 60,
+    "general": 24 * 60 * 60,
+    "definitional": 7 * 24 * 60 * 60,
+}
+
+# Hints are matched as whole words against the normalised query (lower case,
+# no punctuation).  Only unambiguous time references: words like "update",
+# "current" or "release" also occur in evergreen queries ("update SQL
+# statement", "current density", "release engineering").
+_NEWS_HINTS = (
+    "news", "latest", "today", "breaking", "this week", "stock price", "share price",
+    "release date", "announced",
+    "haber", "haberleri", "güncel", "son dakika", "bugün", "son gelişmeler",
+    "actualité", "aujourd hui", "nachrichten", "heute",
+)
+_DEFINITIONAL_HINTS = (
+    "what is", "what are", "definition", "meaning", "define", "history of",
+    "how does", "explained", "introduction to", "overview",
+    "nedir", "ne demek", "tanımı", "anlamı", "tarihi", "nasıl çalışır",
+    "qu est ce", "définition", "was ist", "bedeutung",
+)
+
+_PUNCT_RE = re.compile(r"[^\w\s]", re.UNICODE)
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> str:
+    """Return a canonical form of *query* for cache keys.
+
+    Unicode is NFKC-normalised, case-folded, punctuation is dropped and
+    whitespace collapsed.  Word order and repeated words are kept: "rust vs
+    python" and "python vs rust" are different searches.
+    """
+    text = unicodedata.normalize("NFKC", query).casefold()
+    text = _PUNCT_RE.sub(" ", text)
+    return _SPACE_RE.sub(" ", text).strip()
+
+
+def classify_query(query: str) -> str:
+    """Classify *query* as ``"news"``, ``"definitional"`` or ``"general"``.
+
+    A query mentioning the current or previous year counts as news-like.
+    """
+    text = " " + _SPACE_RE.sub(" ", _PUNCT_RE.sub(" ", query.casefold())).strip() + " "
+
+    year = datetime.now().year
+    if any(f" {y} " in text for y in (year, year - 1)):
+        return "news"
+    if any(f" {hint} " in text for hint in _NEWS_HINTS):
+        return "news"
+    if any(f" {hint} " in text for hint in _DEFINITIONAL_HINTS):
+        return "definitional"
+    return "general"
+
+
+class SearchCache:
+    """Thin SQLite wrapper for caching search result lists."""
+
+    def __init__(self, db_path: str = _DEFAULT_DB_PATH, ttls: dict[str, float] | None = None):
+        """
+        Args:
+            db_path: Path to the SQLite database file.
+            ttls:    Time-to-live in seconds per query kind
+                     (``news`` / ``general`` / ``definitional``).
+        """
+        self.db_path = db_path
+        self.ttls = {**_DEFAULT_TTLS, **(ttls or {})}
+        self._initialised = False
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path)
+        if not self._initialised:
+            self._ensure_table(conn)
+        return conn
+
+    def _ensure_table(self, conn: sqlite3.Connection) -> None:
+        try:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS search_cache (
+                    cache_key   TEXT PRIMARY KEY,
+                    provider    TEXT NOT NULL,
+                    lang        TEXT NOT NULL,
+                    query       TEXT NOT NULL,
+                    kind        TEXT NOT NULL,
+                    results     TEXT NOT NULL,
+                    created_at  REAL NOT NULL,
+                    expires_at  REAL NOT NULL
+                )
+                """
+            )
+            conn.commit()
+            self._initialised = True
+            logger.info("Search cache initialised at %s", self.db_path)
+        except Exception as e:
+            logger.error("Failed to initialise search cache: %s", e)
+
+    @staticmethod
+    def _make_key(query: str, provider: str, lang: str, max_results: int | None = None) -> str:
+        raw = f"{provider.lower()}|{lang.lower()}|{normalize_query(query)}"
+        if max_results is not None:
+            raw += f"|{int(max_results)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def get(self, query: str, provider: str, lang: str = "en",
+            max_results: int | None = None) -> list | None:
+        """Return the cached result list for *query*, or ``None`` if missing / expired.
+
+        *max_results* must match the value the entry was stored with.
+        """
+        cache_key = self._make_key(query, provider, lang, max_results)
+        try:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT results, expires_at FROM search_cache WHERE cache_key = ?",
+                (cache_key,),
+            ).fetchone()
+            conn.close()
+
+            if row is None:
+                return None
+
+            results_json, expires_at = row
+            if time.time() > expires_at:
+                logger.debug("Search cache entry for '%s' (%s) expired", query, provider)
+                self.delete(query, provider, lang, max_results)
+                return None
+
+            logger.info("Search cache HIT for '%s' (%s/%s)", query, provider, lang)
+            return json.loads(results_json)
+
+        except Exception as e:
+            logger.error("Search cache get error: %s", e)
+            return None
+
+    def set(self, query: str, results: list, provider: str, lang: str = "en",
+            max_results: int | None = None) -> None:
+        """Store *results* (a JSON-serialisable list) for *query*.
+
+        Empty result lists are not cached so a transient search failure
+        does not stick for the whole TTL.
+        """
+        if not results:
+            return
+
+        cache_key = self._make_key(query, provider, lang, max_results)
+        kind = classify_query(query)
+        now = time.time()
+        try:
+            conn = self._connect()
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO search_cache
+                    (cache_key, provider, lang, query, kind, results, created_at, expires_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    cache_key,
+                    provider,
+                    lang,
+                    query.strip(),
+                    kind,
+                    json.dumps(results, ensure_ascii=False),
+                    now,
+                    now + self.ttls[kind],
+                ),
+            )
+            conn.commit()
+            conn.close()
+            logger.debug("Cached %d %s results for '%s' (%s)", len(results), provider, query, kind)
+        except Exception as e:
+            logger.error("Search cache set error: %s", e)
+
+    def delete(self, query: str, provider: str, lang: str = "en",
+               max_results: int | None = None) -> None:
+        """Remove a single cached entry."""
+        cache_key = self._make_key(query, provider, lang, max_results)
+        try:
+            conn = self._connect()
+            conn.execute("DELETE FROM search_cache WHERE cache_key = ?", (cache_key,))
+            conn.commit()
+            conn.close()
+        except Exception as e:
+            logger.error("Search cache delete error: %s", e)
+
+    async def aget(self, query: str, provider: str, lang: str = "en",
+                   max_results: int | None = None) -> list | None:
+        """``get`` run in the default executor, for callers on the event loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.get, query, provider, lang, max_results)
+
+    async def aset(self, query: str, results: list, provider: str, lang: str = "en",
+                   max_results: int | None = None) -> None:
+        """``set`` run in the default executor, for callers on the event loop."""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.set, query, results, provider, lang, max_results)
+
+    def purge_expired(self) -> int:
+        """Delete all expired entries and return how many were removed."""
+        try:
+            conn = self._connect()
+            cur = conn.execute("DELETE FROM search_cache WHERE expires_at < ?", (time.time(),))
+            conn.commit()
+            conn.close()
+            return cur.rowcount
+        except Exception as e:
+            logger.error("Search cache purge error: %s", e)
+            return 0
+
+    def clear(self) -> None:
+        """Purge all cached entries."""
+        try:
+            conn = self._connect()
+            conn.execute("DELETE FROM search_cache")
+            conn.commit()
+            conn.close()
+            logger.info("Search cache cleared")
+        except Exception as e:
+            logger.error("Search cache clear error: %s", e)
+
+    def stats(self) -> dict:
+        """Return basic cache statistics."""
+        try:
+            conn = self._connect()
+            total = conn.execute("SELECT COUNT(*) FROM search_cache").fetchone()[0]
+            valid = conn.execute(
+                "SELECT COUNT(*) FROM search_cache WHERE expires_at >= ?",
+                (time.time(),),
+            ).fetchone()[0]
+            conn.close()
+            return {"total_entries": total, "valid_entries": valid, "expired_entries": total - valid}
+        except Exception as e:
+            logger.error("Search cache stats error: %s", e)
+            return {"total_entries": 0, "valid_entries": 0, "expired_entries": 0}
+
+
+# Module-level singleton
+search_cache = SearchCache()